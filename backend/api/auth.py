@@ -17,6 +17,8 @@ from services.jwt_service import jwt_service
 from services.google_oauth_service import google_oauth_service
 from services.email_service import email_service
 from services.database import get_users_collection
+from services.auth_cache import write_user
+from utils.email_utils import email_query
 from middleware.auth_middleware import get_current_user, get_current_user_id, get_optional_user
 from models.schemas import ApiResponse
 
@@ -105,9 +107,12 @@ async def test_remove_user(request: dict):
         users_collection = get_users_collection()
         
         # Find and remove user by email
-        result = await users_collection.delete_one({"email": email})
+        user_doc = await users_collection.find_one(email_query(email), projection={"_id": 1})
+        result = None
+        if user_doc:
+            result = await write_user(user_doc["_id"], users_collection.delete_one({"_id": user_doc["_id"]}))
         
-        if result.deleted_count == 0:
+        if result is None or result.deleted_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -140,7 +145,7 @@ async def test_verify_email(request: dict):
         users_collection = get_users_collection()
         
         # Find user by email
-        user_doc = await users_collection.find_one({"email": email})
+        user_doc = await users_collection.find_one(email_query(email))
         if not user_doc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -148,10 +153,10 @@ async def test_verify_email(request: dict):
             )
         
         # Update email verification status
-        await users_collection.update_one(
+        await write_user(user_doc["_id"], users_collection.update_one(
             {"_id": user_doc["_id"]},
             {"$set": {"is_email_verified": True, "updated_at": datetime.utcnow()}}
-        )
+        ))
         
         return ApiResponse(
             success=True,
@@ -553,10 +558,6 @@ async def update_user_profile(
 ):
     """Update current user profile"""
     try:
-        # Update user in database
-        from services.database import get_users_collection
-        users_collection = get_users_collection()
-        
         update_dict = update_data.dict(exclude_unset=True)
         if not update_dict:
             raise HTTPException(
@@ -564,12 +565,8 @@ async def update_user_profile(
                 detail="No fields to update"
             )
         
-        update_dict["updated_at"] = datetime.utcnow()
-        
-        await users_collection.update_one(
-            {"_id": current_user.id},
-            {"$set": update_dict}
-        )
+        # Update user in database (also drops the cached user document)
+        await auth_service.update_user(current_user.id, update_dict)
         
         # Get updated user
         updated_user = await auth_service.get_user_by_id(current_user.id)
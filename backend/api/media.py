@@ -6,11 +6,18 @@ from datetime import datetime
 
 from models.schemas import (
     UploadResponse, TranscribeResponse, RemoveFillersRequest, 
-    RemoveFillersResponse, ApiResponse, TrimVideoRequest, TrimVideoResponse
+    RemoveFillersResponse, ApiResponse, TrimVideoRequest, TrimVideoResponse,
+    DetectFillersRequest, DisfluencyReport, FillerLexicon, TranscriptionUpdate, MediaJob
 )
 from services.media_service import media_service
+from services.media_pool import media_pool
+from services.job_queue import job_queue
 from services.project_service import project_service
+from services.transcription_service import transcription_service
+from services.auth_service import auth_service
+from services.disfluency_detector import lexicon_from_preferences
 from utils.error_handlers import handle_database_error, get_user_friendly_message
+from utils.responses import fast_api_response
 from middleware.auth_middleware import get_current_user_id
 
 router = APIRouter()
@@ -43,12 +50,12 @@ async def upload_media(
         file_path = media_service.save_uploaded_file(file, project_id)
         
         # Get video duration
-        duration = media_service.get_video_duration(file_path)
+        duration = await media_pool.run("get_video_duration", file_path, user_id=user_id, project_id=project_id)
         print(f"DEBUG: Video duration from FFmpeg: {duration} (type: {type(duration)})")
         
         # Generate thumbnail
         try:
-            thumbnail_path = media_service.generate_thumbnail(file_path)
+            thumbnail_path = await media_pool.run("generate_thumbnail", file_path, user_id=user_id, project_id=project_id)
         except Exception as e:
             thumbnail_path = None
         
@@ -105,9 +112,14 @@ async def upload_media(
 @router.post("/transcribe", response_model=ApiResponse[TranscribeResponse])
 async def transcribe_audio(
     project_id: str = Form(...),
+    wait: bool = Form(True),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Transcribe video audio"""
+    """Transcribe video audio.
+
+    With MEDIA_EXECUTION=queue and wait=false the job is only queued: the response is 202 with the
+    job (and a Location header), and GET /media/jobs/{job_id} returns the transcript once it succeeds.
+    """
     try:
         # Get project from database
         project = await project_service.get_project(project_id, user_id)
@@ -125,29 +137,38 @@ async def transcribe_audio(
                 detail="Video file not found"
             )
         
-        # Extract audio
-        audio_path = media_service.extract_audio(video_path)
+        # Fillers are flagged with the user's saved lexicon
+        user = await auth_service.get_user_by_id(user_id)
+        lexicon = lexicon_from_preferences(user.preferences if user else None)
         
-        try:
-            # Transcribe audio
-            transcript = media_service.transcribe_audio(audio_path)
-            
-            # Clean up audio file
-            media_service.cleanup_temp_files([audio_path])
-            
-            return ApiResponse(
-                success=True,
-                data=TranscribeResponse(
-                    transcript=transcript,
-                    duration=project.duration or 0
-                ),
-                message="Transcription completed successfully"
+        if not wait and media_pool.mode == "queue":
+            job_id = await media_pool.submit(
+                "transcribe_video", video_path, user_id=user_id, project_id=project_id,
+                media_seconds=project.duration, lexicon=lexicon
             )
-            
-        except Exception as e:
-            # Clean up audio file on error
-            media_service.cleanup_temp_files([audio_path])
-            raise
+            job = await job_queue.get(job_id, user_id=user_id)
+            response = fast_api_response(
+                data=job_queue.to_schema(job, await job_queue.estimate_position(job)),
+                message="Transcription queued",
+                status_code=202
+            )
+            response.headers["Location"] = f"/media/jobs/{job_id}"
+            return response
+        
+        # Extract, transcribe and clean up the audio as one media job
+        transcript = await media_pool.run(
+            "transcribe_video", video_path, user_id=user_id, project_id=project_id,
+            media_seconds=project.duration, lexicon=lexicon
+        )
+        
+        return ApiResponse(
+            success=True,
+            data=TranscribeResponse(
+                transcript=transcript,
+                duration=project.duration or 0
+            ),
+            message="Transcription completed successfully"
+        )
             
     except HTTPException:
         raise
@@ -199,6 +220,121 @@ async def remove_fillers(request: RemoveFillersRequest, user_id: str = Depends(g
             detail="Failed to remove filler words"
         )
 
+@router.post("/detect-fillers", response_model=ApiResponse[DisfluencyReport])
+async def detect_fillers(request: DetectFillersRequest, user_id: str = Depends(get_current_user_id)):
+    """Re-run filler/disfluency detection on a stored transcription without re-transcribing"""
+    try:
+        transcription = await transcription_service.get_transcription(request.project_id, user_id)
+        if not transcription:
+            raise HTTPException(
+                status_code=404,
+                detail="Transcription not found for this project"
+            )
+        
+        lexicon = request.lexicon
+        if lexicon is None:
+            user = await auth_service.get_user_by_id(user_id)
+            lexicon = lexicon_from_preferences(user.preferences if user else None)
+        
+        words = [word for segment in transcription.segments for word in segment.words]
+        report = media_service.detect_disfluencies(words, lexicon)
+        
+        if request.persist:
+            # Words come back in segment order, so they can be split back by segment length
+            flagged = iter(report.words)
+            segments = []
+            for segment in transcription.segments:
+                segment_data = segment.dict()
+                segment_data["words"] = [next(flagged) for _ in segment.words]
+                segments.append(segment_data)
+            await transcription_service.update_transcription(
+                request.project_id, TranscriptionUpdate(segments=segments), user_id
+            )
+        
+        return ApiResponse(
+            success=True,
+            data=report,
+            message=f"Detected {len(report.events)} disfluencies"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "detect_fillers")
+        raise HTTPException(
+            status_code=500,
+            detail=get_user_friendly_message(e)
+        )
+
+@router.get("/filler-lexicon", response_model=ApiResponse[FillerLexicon])
+async def get_filler_lexicon(user_id: str = Depends(get_current_user_id)):
+    """Get the user's filler lexicon (defaults if none is saved)"""
+    try:
+        user = await auth_service.get_user_by_id(user_id)
+        return ApiResponse(
+            success=True,
+            data=lexicon_from_preferences(user.preferences if user else None),
+            message="Filler lexicon retrieved successfully"
+        )
+        
+    except Exception as e:
+        error = handle_database_error(e, "get_filler_lexicon")
+        raise HTTPException(
+            status_code=500,
+            detail=get_user_friendly_message(e)
+        )
+
+@router.put("/filler-lexicon", response_model=ApiResponse[FillerLexicon])
+async def update_filler_lexicon(lexicon: FillerLexicon, user_id: str = Depends(get_current_user_id)):
+    """Save the user's filler lexicon"""
+    try:
+        updated_user = await auth_service.update_user(user_id, {"preferences.filler_lexicon": lexicon.dict()})
+        if not updated_user:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to save filler lexicon"
+            )
+        
+        return ApiResponse(
+            success=True,
+            data=lexicon,
+            message="Filler lexicon saved successfully"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "update_filler_lexicon")
+        raise HTTPException(
+            status_code=500,
+            detail=get_user_friendly_message(e)
+        )
+
+@router.get("/jobs/{job_id}", response_model=ApiResponse[MediaJob])
+async def get_media_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get the status of a media job (queue position while it waits, result once it succeeded)"""
+    try:
+        job = await job_queue.get(job_id, user_id=user_id, include_result=True)
+        if not job:
+            raise HTTPException(
+                status_code=404,
+                detail="Job not found"
+            )
+        
+        return ApiResponse(
+            success=True,
+            data=job_queue.to_schema(job, await job_queue.estimate_position(job)),
+            message="Job retrieved successfully"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=get_user_friendly_message(e)
+        )
+
 @router.get("/{project_id}/video")
 async def get_video(
     project_id: str,
@@ -306,10 +442,15 @@ async def trim_video(request: TrimVideoRequest, user_id: str = Depends(get_curre
         print(f"🎬 TRIM VIDEO: Original video path: {video_path}")
         
         # Process video segments
-        trimmed_path = media_service.trim_video_segments(video_path, segments)
+        trimmed_path = await media_pool.run(
+            "trim_video_segments", video_path, segments, user_id=user_id, project_id=request.project_id,
+            media_seconds=sum(segment["duration"] for segment in segments)
+        )
         
         # Get new duration
-        new_duration = media_service.get_video_duration(trimmed_path)
+        new_duration = await media_pool.run(
+            "get_video_duration", trimmed_path, user_id=user_id, project_id=request.project_id
+        )
         
         # Update project with trimmed video using project service
         from models.schemas import ProjectUpdate
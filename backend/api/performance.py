@@ -1,14 +1,25 @@
 """
 Performance Monitoring API endpoints
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from services.performance_monitor import (
     performance_monitor, database_performance_monitor, performance_optimizer
 )
+from services.system_sampler import system_sampler
+from services.loop_watchdog import loop_watchdog
+from services.media_pool import media_pool
+from services.job_queue import job_queue
+from services.profiler import sampling_profiler, memory_profiler, ProfilerBusyError
+from middleware.auth_middleware import get_current_admin_user
+from models.user_schemas import UserDocument
+from services.password_hasher import password_hasher
+from services.email_service import email_service
 from utils.error_handlers import handle_database_error, get_user_friendly_message
+from utils.tracing import tracer
 
 router = APIRouter()
 
@@ -47,6 +58,114 @@ async def get_detailed_metrics():
         )
 
 
+@router.get("/system")
+async def get_system_history(window_seconds: float = 3600, points: int = 120):
+    """Get process resource history (RSS, fds, threads, CPU, loop lag, GC) downsampled to min/max/avg"""
+    try:
+        return {
+            "success": True,
+            "data": {
+                "history": system_sampler.get_history(
+                    window_seconds=min(max(window_seconds, 1.0), 7 * 24 * 3600), points=min(max(points, 1), 1000)
+                ),
+                "sampler": system_sampler.get_stats()
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/loop-blocks")
+async def get_loop_blocks(limit: int = 20):
+    """Get event-loop stalls grouped by the call site that caused them"""
+    try:
+        return {
+            "success": True,
+            "data": loop_watchdog.get_report(limit=limit),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/media-pool")
+async def get_media_pool_stats():
+    """Get media job pool size, pending jobs and per-operation timings for this worker"""
+    try:
+        stats = media_pool.get_stats()
+        if media_pool.mode == "queue":
+            # Shared across all API and media workers
+            stats["queue"] = await job_queue.get_stats()
+        return {
+            "success": True,
+            "data": stats,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/profile/cpu")
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    include_idle: bool = False,
+    admin_user: UserDocument = Depends(get_current_admin_user)
+):
+    """Sample all thread stacks of this worker for N seconds (admin only).
+
+    Returns a speedscope file (open at speedscope.app) or collapsed stacks for flamegraph.pl.
+    """
+    try:
+        profile = await sampling_profiler.profile(seconds, interval=interval_ms / 1000, include_idle=include_idle)
+        headers = {"X-Profile-Samples": str(profile["samples"])}
+        if format == "collapsed":
+            return PlainTextResponse(sampling_profiler.to_collapsed(profile), headers=headers)
+        headers["Content-Disposition"] = f'attachment; filename="profile-{int(datetime.now().timestamp())}.speedscope.json"'
+        return JSONResponse(sampling_profiler.to_speedscope(profile), headers=headers)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/profile/memory")
+async def profile_memory(
+    seconds: float = Query(30.0, gt=0, le=600),
+    limit: int = Query(25, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin_user: UserDocument = Depends(get_current_admin_user)
+):
+    """Diff tracemalloc snapshots taken N seconds apart to find growing allocations (admin only)"""
+    try:
+        return {
+            "success": True,
+            "data": await memory_profiler.diff(seconds, limit=limit, group_by=group_by),
+            "timestamp": datetime.now().isoformat()
+        }
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
 @router.get("/database")
 async def get_database_performance():
     """Get database performance metrics"""
@@ -137,6 +256,85 @@ async def reset_performance_metrics():
         )
 
 
+@router.get("/password-hashing")
+async def get_password_hashing_stats():
+    """Get bcrypt pool size, queue depth and timings"""
+    try:
+        return {
+            "success": True,
+            "data": password_hasher.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/email-outbox")
+async def get_email_outbox_stats():
+    """Get email outbox queue depth and SMTP connection reuse"""
+    try:
+        return {
+            "success": True,
+            "data": await email_service.outbox.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = 50,
+    min_duration_ms: float = 0.0,
+    admin_user: UserDocument = Depends(get_current_admin_user)
+):
+    """Get kept request traces (slow or failed), slowest first (admin only)"""
+    try:
+        return {
+            "success": True,
+            "data": {
+                "traces": tracer.get_traces(limit=limit, min_duration_ms=min_duration_ms),
+                "stats": tracer.get_stats()
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, admin_user: UserDocument = Depends(get_current_admin_user)):
+    """Get the span breakdown of one kept trace (admin only)"""
+    try:
+        trace = tracer.get_trace(trace_id)
+        if trace is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Trace not found (it was fast, or has been evicted from the buffer)"
+            )
+        return {
+            "success": True,
+            "data": trace,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
 @router.get("/status")
 async def get_monitoring_status():
     """Get monitoring status"""
@@ -146,10 +344,9 @@ async def get_monitoring_status():
             "start_time": performance_monitor.start_time.isoformat(),
             "uptime": str(datetime.now() - performance_monitor.start_time),
             "metrics_count": {
-                "api_calls": sum(performance_monitor.metrics["api_calls"].values()),
+                "api_calls": sum(counts["calls"] for counts in performance_monitor.get_api_call_counts().values()),
                 "database_operations": sum(performance_monitor.metrics["database_operations"].values()),
-                "memory_samples": len(performance_monitor.metrics["memory_usage"]),
-                "cpu_samples": len(performance_monitor.metrics["cpu_usage"])
+                "system_samples": len(system_sampler.ring)
             }
         }
         
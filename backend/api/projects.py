@@ -1,19 +1,31 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query
 from typing import List, Optional
 from datetime import datetime
 
-from models.schemas import Project, ProjectCreate, ProjectUpdate, ApiResponse
+from models.schemas import Project, ProjectCreate, ProjectUpdate, ProjectListPage, ApiResponse
 from services.project_service import project_service
+from utils.pagination import InvalidCursorError, decode_cursor
 from utils.error_handlers import handle_database_error, get_user_friendly_message
+from utils.conditional import etag_matches, not_modified, set_etag
 from middleware.auth_middleware import get_current_user_id
 
 router = APIRouter()
 
 @router.get("/", response_model=ApiResponse[List[Project]])
-async def get_projects(user_id: str = Depends(get_current_user_id)):
+async def get_projects(request: Request, response: Response, user_id: str = Depends(get_current_user_id)):
     """Get all projects for current user"""
     try:
+        # Revalidation only needs the projected (_id, updated_at) list
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            etag = await project_service.get_projects_etag(user_id)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
         projects = await project_service.get_projects(user_id)
+        set_etag(response, project_service.projects_etag(
+            user_id, [(project.id, project.updated_at) for project in projects]
+        ))
         
         return ApiResponse(
             success=True,
@@ -28,6 +40,38 @@ async def get_projects(user_id: str = Depends(get_current_user_id)):
             detail=get_user_friendly_message(e)
         )
 
+@router.get("/page", response_model=ApiResponse[ProjectListPage])
+async def get_projects_page(
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Get a page of projects for current user (cursor-based)"""
+    try:
+        # Reject malformed cursors up front (service errors are re-classified as database errors)
+        if cursor:
+            decode_cursor(cursor)
+        
+        page = await project_service.get_projects_page(user_id, limit, cursor)
+        
+        return ApiResponse(
+            success=True,
+            data=page,
+            message=f"Found {len(page.items)} projects"
+        )
+        
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        error = handle_database_error(e, "get_projects_page")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
 @router.post("/", response_model=ApiResponse[Project])
 async def create_project(project_data: ProjectCreate, user_id: str = Depends(get_current_user_id)):
     """Create new project"""
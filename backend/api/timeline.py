@@ -1,16 +1,18 @@
 """
 Timeline API endpoints for MongoDB Integration
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query
 from typing import List, Optional
 from datetime import datetime
 
 from models.schemas import (
     TimelineStateDocument, TimelineStateCreate, TimelineStateUpdate, 
-    ApiResponse
+    TimelineOperationsRequest, TimelineOperationsResult, TimelineHistoryPage, ApiResponse
 )
 from services.timeline_service import timeline_service
 from utils.error_handlers import handle_database_error, get_user_friendly_message
+from utils.responses import fast_api_response
+from utils.conditional import etag_matches, not_modified, set_etag
 from middleware.auth_middleware import get_current_user_id
 
 router = APIRouter()
@@ -42,11 +44,19 @@ async def save_timeline_state(
 @router.get("/{project_id}", response_model=ApiResponse[TimelineStateDocument])
 async def get_timeline_state(
     project_id: str, 
+    request: Request,
     user_id: str = Depends(get_current_user_id)
 ):
     """Get timeline state for a project (returns empty state if none exists)"""
     try:
-        timeline_state = await timeline_service.get_current_timeline_state(project_id, user_id)
+        # Revalidation only needs the projected version/updated_at, not the layer/clip tree
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            etag = await timeline_service.get_timeline_state_etag(project_id, user_id)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
+        timeline_state = await timeline_service.get_current_timeline_state_data(project_id, user_id)
         
         if not timeline_state:
             # Return empty timeline state for new projects
@@ -75,10 +85,9 @@ async def get_timeline_state(
                 message="Empty timeline state created for new project"
             )
         
-        return ApiResponse(
-            success=True,
-            data=timeline_state,
-            message="Timeline state retrieved successfully"
+        return set_etag(
+            fast_api_response(timeline_state, "Timeline state retrieved successfully"),
+            timeline_service.timeline_etag(timeline_state)
         )
         
     except HTTPException:
@@ -178,6 +187,31 @@ async def get_timeline_history(
         )
 
 
+@router.get("/{project_id}/history/summary", response_model=ApiResponse[TimelineHistoryPage])
+async def get_timeline_history_summary(
+    project_id: str, 
+    user_id: str = Depends(get_current_user_id),
+    limit: int = Query(20, ge=1, le=100),
+    before_version: Optional[int] = None
+):
+    """Get lightweight timeline history (no layer/clip tree), paginated by version"""
+    try:
+        page = await timeline_service.get_timeline_history_summary(project_id, user_id, limit, before_version)
+        
+        return ApiResponse(
+            success=True,
+            data=page,
+            message=f"Retrieved {len(page.items)} timeline history entries"
+        )
+        
+    except Exception as e:
+        error = handle_database_error(e, "get_timeline_history_summary")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
 @router.put("/{timeline_id}", response_model=ApiResponse[TimelineStateDocument])
 async def update_timeline_state(
     timeline_id: str, 
@@ -210,6 +244,38 @@ async def update_timeline_state(
         )
 
 
+@router.patch("/{timeline_id}", response_model=ApiResponse[TimelineOperationsResult])
+async def apply_timeline_operations(
+    timeline_id: str, 
+    operations_data: TimelineOperationsRequest, 
+    user_id: str = Depends(get_current_user_id)
+):
+    """Apply targeted operations (move/trim clip, add/remove layer, set playhead) to a timeline state"""
+    try:
+        result = await timeline_service.apply_timeline_operations(timeline_id, operations_data, user_id)
+        
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Timeline state not found"
+            )
+        
+        return ApiResponse(
+            success=True,
+            data=result,
+            message=f"Applied {len(result.changes)} timeline operations"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "apply_timeline_operations")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
 @router.post("/{project_id}/restore/{version}", response_model=ApiResponse[TimelineStateDocument])
 async def restore_timeline_state(
     project_id: str, 
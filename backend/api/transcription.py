@@ -1,15 +1,19 @@
 """
 Transcription API endpoints for MongoDB Integration
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from bson import ObjectId
 from typing import List, Optional, Dict, Any
 
 from models.schemas import (
     TranscriptionDocument, TranscriptionCreate, TranscriptionUpdate,
-    TranscriptSegment, ApiResponse
+    TranscriptSegment, TranscriptWord, TranscriptWordLookupRequest,
+    TranscriptSearchResults, ApiResponse
 )
 from services.transcription_service import transcription_service
 from utils.error_handlers import handle_database_error, get_user_friendly_message
+from utils.responses import fast_api_response
+from utils.conditional import etag_matches, not_modified, set_etag
 from middleware.auth_middleware import get_current_user_id
 
 router = APIRouter()
@@ -38,14 +42,55 @@ async def create_transcription(
         )
 
 
+@router.get("/search", response_model=ApiResponse[TranscriptSearchResults])
+async def search_transcripts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    project_id: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Search transcript text across the user's projects"""
+    try:
+        if project_id and not ObjectId.is_valid(project_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid project id"
+            )
+        
+        results = await transcription_service.search_transcripts(user_id, q, limit, project_id)
+        
+        return ApiResponse(
+            success=True,
+            data=results,
+            message=f"Found {len(results.hits)} matching segments"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "search_transcripts")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
 @router.get("/{project_id}", response_model=ApiResponse[TranscriptionDocument])
 async def get_transcription(
     project_id: str, 
+    request: Request,
     user_id: str = Depends(get_current_user_id)
 ):
     """Get transcription for a project"""
     try:
-        transcription = await transcription_service.get_transcription(project_id, user_id)
+        # Revalidation only needs the projected updated_at, not the segments
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            etag = await transcription_service.get_transcription_etag(project_id, user_id)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
+        transcription = await transcription_service.get_transcription_data(project_id, user_id)
         
         if not transcription:
             raise HTTPException(
@@ -53,10 +98,9 @@ async def get_transcription(
                 detail="Transcription not found for this project"
             )
         
-        return ApiResponse(
-            success=True,
-            data=transcription,
-            message="Transcription retrieved successfully"
+        return set_etag(
+            fast_api_response(transcription, "Transcription retrieved successfully"),
+            transcription_service.transcription_etag(transcription)
         )
         
     except HTTPException:
@@ -125,7 +169,93 @@ async def add_transcription_segments(
         )
 
 
-@router.put("/{project_id}/segments/{segment_id}", response_model=ApiResponse[TranscriptionDocument])
+@router.get("/{project_id}/segments", response_model=ApiResponse[List[TranscriptSegment]])
+async def get_transcription_segments(
+    project_id: str, 
+    start: float = 0.0,
+    end: Optional[float] = None,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get the transcription segments overlapping a time window (e.g. the editor viewport)"""
+    try:
+        segments = await transcription_service.get_transcription_segments(project_id, user_id, start, end)
+        
+        if segments is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transcription not found for this project"
+            )
+        
+        return fast_api_response(segments, f"Retrieved {len(segments)} transcription segments")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "get_transcription_segments")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.get("/{project_id}/range", response_model=ApiResponse[List[TranscriptWord]])
+async def get_transcript_words_in_range(
+    project_id: str, 
+    start: float = 0.0,
+    end: Optional[float] = None,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get the transcript words overlapping a time window"""
+    try:
+        words = await transcription_service.get_transcript_words_in_range(project_id, user_id, start, end)
+        
+        if words is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transcription not found for this project"
+            )
+        
+        return fast_api_response(words, f"Retrieved {len(words)} words")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "get_transcript_words_in_range")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.post("/{project_id}/words/lookup", response_model=ApiResponse[List[TranscriptWord]])
+async def lookup_transcript_words(
+    project_id: str, 
+    lookup: TranscriptWordLookupRequest, 
+    user_id: str = Depends(get_current_user_id)
+):
+    """Resolve selected word ids to transcript words"""
+    try:
+        words = await transcription_service.get_transcript_words_by_id(project_id, lookup.word_ids, user_id)
+        
+        if words is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transcription not found for this project"
+            )
+        
+        return fast_api_response(words, f"Resolved {len(words)} of {len(lookup.word_ids)} words")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = handle_database_error(e, "lookup_transcript_words")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=get_user_friendly_message(e)
+        )
+
+
+@router.put("/{project_id}/segments/{segment_id}", response_model=ApiResponse[TranscriptSegment])
 async def update_transcription_segment(
     project_id: str, 
     segment_id: str, 
@@ -134,11 +264,11 @@ async def update_transcription_segment(
 ):
     """Update a specific transcription segment"""
     try:
-        transcription = await transcription_service.update_transcription_segment(
+        segment = await transcription_service.update_transcription_segment(
             project_id, segment_id, updated_segment, user_id
         )
         
-        if not transcription:
+        if not segment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Transcription or segment not found"
@@ -146,7 +276,7 @@ async def update_transcription_segment(
         
         return ApiResponse(
             success=True,
-            data=transcription,
+            data=segment,
             message="Transcription segment updated successfully"
         )
         
@@ -160,7 +290,7 @@ async def update_transcription_segment(
         )
 
 
-@router.delete("/{project_id}/segments/{segment_id}", response_model=ApiResponse[TranscriptionDocument])
+@router.delete("/{project_id}/segments/{segment_id}", response_model=ApiResponse[TranscriptSegment])
 async def delete_transcription_segment(
     project_id: str, 
     segment_id: str, 
@@ -168,9 +298,9 @@ async def delete_transcription_segment(
 ):
     """Delete a specific transcription segment"""
     try:
-        transcription = await transcription_service.delete_transcription_segment(project_id, segment_id, user_id)
+        segment = await transcription_service.delete_transcription_segment(project_id, segment_id, user_id)
         
-        if not transcription:
+        if not segment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Transcription or segment not found"
@@ -178,7 +308,7 @@ async def delete_transcription_segment(
         
         return ApiResponse(
             success=True,
-            data=transcription,
+            data=segment,
             message="Transcription segment deleted successfully"
         )
         
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+End-to-end API benchmark: runs the FastAPI app in-process against a local mongod (or an in-memory
+mongomock database) and times the hot endpoints with realistic payloads.
+
+    python -m benchmarks.api_benchmark                       # local mongod, compare to the stored baseline
+    python -m benchmarks.api_benchmark --in-memory           # no mongod needed (mongomock, as in the test scripts)
+    python -m benchmarks.api_benchmark --save-baseline       # record the current numbers as the baseline
+
+Exits with status 1 when a scenario's p50 or p95 regresses past --threshold, so it can gate CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "baselines", "api_benchmark.json")
+SAMPLE_VIDEO = os.path.join(BACKEND_DIR, "test_video.mp4")
+PASSWORD = "Bench#Mark-2580"
+
+# Differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 1.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017", help="local mongod to run against")
+    parser.add_argument("--database", default="snipix_benchmark",
+                        help="scratch database (dropped before and after the run)")
+    parser.add_argument("--in-memory", action="store_true", help="use an in-memory mongomock database instead of mongod")
+    parser.add_argument("--scenarios", default="all", help="comma-separated scenario names")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent clients per scenario")
+    parser.add_argument("--projects", type=int, default=50, help="projects owned by the benchmark user")
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--clips", type=int, default=100, help="clips per layer")
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args()
+
+
+def configure_environment(args, media_dir: str):
+    """Settings are read at import time, so point them at the scratch database and media dir first"""
+    if args.database == "snipix":
+        raise SystemExit("❌ Refusing to benchmark against the application database; pick a scratch --database")
+    os.environ.update({
+        "MONGODB_URL": args.mongo_uri,
+        "MONGODB_DATABASE": args.database,
+        "MONGODB_SSL": "false",
+        "MEDIA_DIR": media_dir,
+        "LOOP_WATCHDOG_ENABLED": "false"
+    })
+    for subdir in ("videos", "processed", "thumbnails"):
+        os.makedirs(os.path.join(media_dir, subdir), exist_ok=True)
+
+
+async def connect_database(args):
+    """Initialise services.database against mongod or mongomock and start from an empty database"""
+    from services import database
+
+    if args.in_memory:
+        import mongomock
+        from mongomock_async import AsyncDatabase
+
+        # The same motor-style wrapper the test scripts use; both handles share one in-memory database
+        database.async_client = None
+        database.sync_client = mongomock.MongoClient()
+        database.sync_db = database.sync_client[args.database]
+        database.async_db = AsyncDatabase(database.sync_db)
+        database.db_available = True
+        try:
+            await database.create_indexes()
+        except Exception as e:
+            # Index options mongomock doesn't implement only change performance, not results
+            print(f"⚠️  Some indexes were not created in memory: {e}")
+        return database
+
+    await database.init_db()
+    if not database.is_db_available():
+        raise SystemExit(f"❌ Could not reach mongod at {args.mongo_uri} (start one, or use --in-memory)")
+    await database.async_client.drop_database(args.database)
+    await database.create_indexes()
+    return database
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def measure(request: Callable[[], Awaitable[Any]], iterations: int, warmup: int,
+                  concurrency: int) -> Dict[str, Any]:
+    """Run request() `iterations` times across `concurrency` clients; latencies in ms"""
+    for _ in range(warmup):
+        await request()
+
+    timings: List[float] = []
+    errors = 0
+    response_bytes = 0
+    remaining = iterations
+
+    async def client():
+        nonlocal remaining, errors, response_bytes
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request()
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+            response_bytes = len(response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "iterations": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / wall, 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p50_ms": round(percentile(timings, 0.50), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "max_ms": round(timings[-1], 2),
+        "response_bytes": response_bytes
+    }
+
+
+class ApiBenchmark:
+    """Seeds a user, projects, a large timeline and transcript, then times each scenario"""
+
+    def __init__(self, client, args, media_dir: str):
+        self.client = client
+        self.args = args
+        self.media_dir = media_dir
+        self.email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        self.headers: Dict[str, str] = {}
+        self.project_id: Optional[str] = None
+
+    async def _check(self, response, action: str):
+        if response.status_code >= 400:
+            raise SystemExit(f"❌ {action} failed ({response.status_code}): {response.text[:300]}")
+        return response.json()
+
+    async def setup(self):
+        from benchmarks.fixtures import timeline_state, transcript_segments
+
+        await self._check(await self.client.post("/auth/register", json={
+            "email": self.email, "name": "Benchmark", "password": PASSWORD, "confirm_password": PASSWORD
+        }), "register")
+        await self._check(await self.client.post("/auth/test-verify-email", json={"email": self.email}), "verify email")
+        login = await self._check(await self.client.post("/auth/login", json={
+            "email": self.email, "password": PASSWORD
+        }), "login")
+        self.headers = {"Authorization": f"Bearer {login['data']['access_token']}"}
+
+        for i in range(self.args.projects):
+            project = await self._check(await self.client.post(
+                "/projects/", json={"name": f"Benchmark project {i}"}, headers=self.headers
+            ), "create project")
+        self.project_id = project["data"]["_id"]
+
+        video_path = os.path.join(self.media_dir, "videos", "benchmark.mp4")
+        shutil.copyfile(SAMPLE_VIDEO, video_path)
+        await self._check(await self.client.put(
+            f"/projects/{self.project_id}", json={"video_path": video_path, "duration": 10.0}, headers=self.headers
+        ), "attach video")
+
+        self.timeline_payload = {
+            "project_id": self.project_id,
+            "timeline_state": timeline_state(self.args.layers, self.args.clips, source_path=video_path).model_dump(mode="json"),
+            "change_summary": "benchmark"
+        }
+        await self._check(await self.client.post("/timeline/", json=self.timeline_payload, headers=self.headers),
+                          "seed timeline")
+
+        self.transcript_payload = {
+            "segments": [segment.model_dump(mode="json") for segment in transcript_segments(self.args.words)],
+            "is_edited": True
+        }
+        await self._check(await self.client.post("/transcriptions/", json={"project_id": self.project_id},
+                                                 headers=self.headers), "create transcription")
+        await self._check(await self.client.put(f"/transcriptions/{self.project_id}", json=self.transcript_payload,
+                                                headers=self.headers), "seed transcript")
+
+    def scenarios(self) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        client, headers, project_id = self.client, self.headers, self.project_id
+        return {
+            "login": lambda: client.post("/auth/login", json={"email": self.email, "password": PASSWORD}),
+            "get_projects": lambda: client.get("/projects/", headers=headers),
+            "timeline_save": lambda: client.post("/timeline/", json=self.timeline_payload, headers=headers),
+            "timeline_load": lambda: client.get(f"/timeline/{project_id}", headers=headers),
+            "transcript_get": lambda: client.get(f"/transcriptions/{project_id}", headers=headers),
+            "transcript_update": lambda: client.put(f"/transcriptions/{project_id}", json=self.transcript_payload,
+                                                    headers=headers),
+            "trim_video": lambda: client.post("/media/trim-video", headers=headers, json={
+                "project_id": project_id,
+                "segments": [{"startTime": 0.0, "duration": 2.0}, {"startTime": 4.0, "duration": 2.0}]
+            })
+        }
+
+    async def run(self, selected: List[str]) -> Dict[str, Any]:
+        results = {}
+        for name, request in self.scenarios().items():
+            if selected and name not in selected:
+                continue
+            if name == "trim_video" and not shutil.which("ffmpeg"):
+                results[name] = {"skipped": "ffmpeg not found on PATH"}
+                continue
+            # Trims share MediaService's concat list file, so they must not overlap
+            concurrency = 1 if name == "trim_video" else self.args.concurrency
+            results[name] = await measure(request, self.args.iterations, self.args.warmup, concurrency)
+            if not self.args.json:
+                print(f"⏱️  {name}: p50 {results[name]['p50_ms']}ms, p95 {results[name]['p95_ms']}ms")
+        return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Dict[str, Any]]:
+    """Per-scenario change against the baseline; regressed when p50 or p95 grew past the threshold"""
+    comparison = {}
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "p50_ms" not in current or "p50_ms" not in previous:
+            continue
+        entry = {"regressed": False}
+        for key in ("p50_ms", "p95_ms", "throughput_rps"):
+            entry[key] = {"baseline": previous[key], "current": current[key],
+                          "change": round(current[key] / previous[key] - 1, 3) if previous[key] else None}
+        for key in ("p50_ms", "p95_ms"):
+            if (current[key] > previous[key] * (1 + threshold)
+                    and current[key] - previous[key] > NOISE_FLOOR_MS):
+                entry["regressed"] = True
+        comparison[name] = entry
+    return comparison
+
+
+def print_table(results: Dict[str, Any], comparison: Dict[str, Any]):
+    print(f"\n{'scenario':<19}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'bytes':>11}  vs baseline (p50/p95)")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<19}{'skipped: ' + result['skipped']:>49}")
+            continue
+        versus = ""
+        if name in comparison:
+            entry = comparison[name]
+            versus = f"{entry['p50_ms']['change']:+.0%} / {entry['p95_ms']['change']:+.0%}"
+            versus += "  ❌ REGRESSION" if entry["regressed"] else ""
+        errors = f"  ({result['errors']} errors)" if result["errors"] else ""
+        print(f"{name:<19}{result['throughput_rps']:>9.1f}{result['p50_ms']:>8.1f}ms{result['p95_ms']:>8.1f}ms"
+              f"{result['p99_ms']:>8.1f}ms{result['response_bytes']:>11}  {versus}{errors}")
+
+
+async def run_benchmark(args, media_dir: str) -> Dict[str, Any]:
+    import httpx
+
+    database = await connect_database(args)
+    from main import app
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+            benchmark = ApiBenchmark(client, args, media_dir)
+            await benchmark.setup()
+            selected = [] if args.scenarios == "all" else [name.strip() for name in args.scenarios.split(",")]
+            return await benchmark.run(selected)
+    finally:
+        if not args.in_memory and database.async_client is not None:
+            await database.async_client.drop_database(args.database)
+        await database.close_db()
+
+
+def main():
+    args = parse_args()
+    media_dir = tempfile.mkdtemp(prefix="snipix-benchmark-")
+    configure_environment(args, media_dir)
+    try:
+        results = asyncio.run(run_benchmark(args, media_dir))
+    finally:
+        shutil.rmtree(media_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "database": "mongomock" if args.in_memory else "mongod",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "fixtures": {"projects": args.projects, "layers": args.layers, "clips_per_layer": args.clips,
+                         "words": args.words}
+        },
+        "results": results
+    }
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    comparison = compare(results, baseline, args.threshold) if baseline else {}
+    if baseline and baseline.get("meta", {}).get("database") != report["meta"]["database"]:
+        print(f"⚠️  Baseline was recorded against {baseline['meta'].get('database')}; comparison is indicative only")
+    report["comparison"] = comparison
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results, comparison)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"meta": report["meta"], "results": results}, baseline_file, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+
+    regressions = [name for name, entry in comparison.items() if entry["regressed"]]
+    if regressions:
+        print(f"❌ Regressed past {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Realistic payload fixtures shared by the benchmarks
+"""
+from typing import List
+
+from models.schemas import (
+    TimelineState, Layer, Clip, ClipType, LayerType, TranscriptSegment, TranscriptWord
+)
+
+
+def timeline_state(layer_count: int = 50, clips_per_layer: int = 100,
+                   source_path: str = "/media/videos/benchmark.mp4") -> TimelineState:
+    """Timeline with layer_count x clips_per_layer back-to-back video clips"""
+    layers = [
+        Layer(id=f"layer_{l}", name=f"Layer {l}", type=LayerType.VIDEO, order=l, clips=[
+            Clip(id=f"clip_{l}_{c}", type=ClipType.VIDEO, start_time=c * 2.0, end_time=c * 2.0 + 1.5,
+                 duration=1.5, source_path=source_path)
+            for c in range(clips_per_layer)
+        ])
+        for l in range(layer_count)
+    ]
+    return TimelineState(layers=layers, duration=clips_per_layer * 2.0)
+
+
+def transcript_segments(word_count: int = 20000, words_per_segment: int = 20) -> List[TranscriptSegment]:
+    """Transcript of word_count words split into fixed-size segments"""
+    segments, t = [], 0.0
+    for segment_index in range(word_count // words_per_segment):
+        words = []
+        for _ in range(words_per_segment):
+            words.append(TranscriptWord(text="word", start=round(t, 2), end=round(t + 0.2, 2),
+                                        confidence=0.91, speaker_id="speaker_1"))
+            t += 0.3
+        segments.append(TranscriptSegment(id=f"segment_{segment_index}", start_time=words[0].start,
+                                          end_time=words[-1].end, text=" ".join(w.text for w in words),
+                                          words=words, confidence=0.9))
+    return segments
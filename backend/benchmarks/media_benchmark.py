@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Media pipeline benchmark: times MediaService stages on synthetic videos to size render capacity.
+
+Generates testsrc2 + sine test videos with ffmpeg at each resolution/length, then times probe,
+thumbnail, audio extraction, single and multi-segment trims (stream copy as MediaService does, and
+a libx264 re-encode for comparison) and transcription per Whisper model size.
+
+    python -m benchmarks.media_benchmark --resolutions 720p,1080p --durations 30,120 --models tiny.en,small.en
+    python -m benchmarks.media_benchmark --json results.json
+
+Realtime factor = seconds of media processed per wall-clock second (above 1 is faster than realtime).
+Peak RSS covers this process plus its ffmpeg children, sampled every 20ms during the stage; RSS growth
+is that peak minus the RSS at the start of the stage. Each Whisper model is loaded just before its
+transcription stage and freed after it, so no stage's RSS includes a model it does not use.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ffmpeg
+import psutil
+
+RESOLUTIONS = {
+    "360p": (640, 360),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "2160p": (3840, 2160)
+}
+
+# Cut list used for the multi-segment trims, as fractions of the video length
+SEGMENT_FRACTIONS = ((0.05, 0.15), (0.30, 0.20), (0.60, 0.25))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolutions", default="480p,720p,1080p", help=f"from {', '.join(RESOLUTIONS)}")
+    parser.add_argument("--durations", default="10,60", help="video lengths in seconds")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--models", default="tiny.en,base.en,small.en",
+                        help="Whisper model sizes to time (empty to skip transcription)")
+    parser.add_argument("--transcribe-max-duration", type=float, default=60.0,
+                        help="only transcribe videos up to this length")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage (the fastest is reported)")
+    parser.add_argument("--workdir", help="where to write generated media (default: a temp dir, removed after)")
+    parser.add_argument("--json", dest="json_path", help="also write results to this JSON file")
+    return parser.parse_args()
+
+
+class PeakRSSSampler:
+    """Tracks the peak combined RSS of this process and its children while a stage runs"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self.baseline = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _total_rss(self) -> int:
+        total = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+
+    def _run(self):
+        while True:
+            self.peak = max(self.peak, self._total_rss())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.baseline = self.peak = self._total_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def generate_video(path: str, width: int, height: int, duration: float, fps: int):
+    """H.264/AAC test video: moving test pattern plus a sine tone"""
+    video = ffmpeg.input(f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}", f="lavfi")
+    audio = ffmpeg.input(f"sine=frequency=440:sample_rate=48000:duration={duration}", f="lavfi")
+    ffmpeg.output(
+        video, audio, path, vcodec="libx264", preset="veryfast", pix_fmt="yuv420p", acodec="aac",
+        audio_bitrate="128k", g=fps * 2, shortest=None
+    ).overwrite_output().run(quiet=True)
+
+
+def time_stage(run: Callable[[], Any], media_seconds: float, repeat: int) -> Dict[str, Any]:
+    """Fastest of `repeat` runs, with the peak RSS and largest RSS growth seen across them"""
+    best, peak_rss, rss_growth = None, 0, 0
+    for _ in range(max(1, repeat)):
+        with PeakRSSSampler() as sampler:
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        peak_rss = max(peak_rss, sampler.peak)
+        rss_growth = max(rss_growth, sampler.peak - sampler.baseline)
+    return {
+        "seconds": round(best, 3),
+        "realtime_factor": round(media_seconds / best, 2) if best > 0 else None,
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1),
+        "rss_growth_mb": round(rss_growth / 1024 / 1024, 1)
+    }
+
+
+def reencode_segments(media_service, video_path: str, segments: List[Dict[str, float]], output_path: str):
+    """Frame-accurate alternative to MediaService's stream-copy trim: decode, cut and re-encode once"""
+    source = ffmpeg.input(video_path)
+    parts = []
+    for segment in segments:
+        start, end = segment["startTime"], segment["startTime"] + segment["duration"]
+        parts.append(source.video.trim(start=start, end=end).setpts("PTS-STARTPTS"))
+        parts.append(source.audio.filter("atrim", start=start, end=end).filter("asetpts", "PTS-STARTPTS"))
+    joined = ffmpeg.concat(*parts, v=1, a=1).node
+    media_service._run_ffmpeg("benchmark_reencode", ffmpeg.output(
+        joined[0], joined[1], output_path, vcodec="libx264", preset="veryfast", acodec="aac"
+    ))
+
+
+def benchmark_video(media_service, video_path: str, label: str, duration: float, args,
+                    model_sizes: List[str], model_load: Dict[str, Any]) -> Dict[str, Any]:
+    stages: Dict[str, Dict[str, Any]] = {}
+    repeat = args.repeat
+    processed_dir = media_service.processed_dir
+
+    stages["probe"] = time_stage(lambda: media_service.get_video_info(video_path), duration, repeat)
+    stages["thumbnail"] = time_stage(lambda: media_service.generate_thumbnail(video_path, duration / 2), duration, repeat)
+    audio_path = None
+
+    def extract():
+        nonlocal audio_path
+        audio_path = media_service.extract_audio(video_path)
+    stages["extract_audio"] = time_stage(extract, duration, repeat)
+
+    # Trims are measured against the length of media they output
+    single = {"startTime": duration * 0.25, "duration": duration * 0.5}
+    multi = [{"startTime": duration * start, "duration": duration * length} for start, length in SEGMENT_FRACTIONS]
+    multi_seconds = sum(segment["duration"] for segment in multi)
+
+    stages["trim_single_copy"] = time_stage(
+        lambda: media_service.trim_video(video_path, single["startTime"], single["startTime"] + single["duration"]),
+        single["duration"], repeat
+    )
+    stages["trim_single_reencode"] = time_stage(
+        lambda: reencode_segments(media_service, video_path, [single], os.path.join(processed_dir, f"reencode_single_{label}.mp4")),
+        single["duration"], repeat
+    )
+    stages["trim_multi_copy"] = time_stage(
+        lambda: media_service.trim_video_segments(video_path, [dict(segment) for segment in multi]),
+        multi_seconds, repeat
+    )
+    stages["trim_multi_reencode"] = time_stage(
+        lambda: reencode_segments(media_service, video_path, multi, os.path.join(processed_dir, f"reencode_multi_{label}.mp4")),
+        multi_seconds, repeat
+    )
+
+    if audio_path and duration <= args.transcribe_max_duration:
+        for size in model_sizes:
+            model, load_stats = load_whisper_model(size)
+            # The first load is reported; later ones read the weights from the page cache
+            model_load.setdefault(size, load_stats)
+            media_service.whisper_model = model
+            try:
+                stages[f"transcribe_{size}"] = time_stage(lambda: media_service.transcribe_audio(audio_path), duration, repeat)
+            finally:
+                media_service.whisper_model = None
+                del model
+                gc.collect()
+    return stages
+
+
+def load_whisper_model(size: str) -> Tuple[Any, Dict[str, Any]]:
+    """Load one model for a transcription stage; returns (model, load stats)"""
+    from faster_whisper import WhisperModel
+
+    with PeakRSSSampler() as sampler:
+        started = time.perf_counter()
+        model = WhisperModel(size, device="cpu", compute_type="int8")
+        elapsed = time.perf_counter() - started
+    print(f"🧠 Loaded Whisper {size} in {elapsed:.1f}s")
+    return model, {
+        "load_seconds": round(elapsed, 2),
+        "peak_rss_mb": round(sampler.peak / 1024 / 1024, 1),
+        "rss_growth_mb": round((sampler.peak - sampler.baseline) / 1024 / 1024, 1)
+    }
+
+
+def print_table(results: List[Dict[str, Any]]):
+    print(f"\n{'video':<14}{'stage':<24}{'seconds':>10}{'x realtime':>12}{'peak RSS':>12}{'RSS growth':>12}")
+    for video in results:
+        for stage, stats in video["stages"].items():
+            realtime = f"{stats['realtime_factor']:.1f}x" if stats["realtime_factor"] is not None else "-"
+            print(f"{video['label']:<14}{stage:<24}{stats['seconds']:>10.3f}{realtime:>12}"
+                  f"{stats['peak_rss_mb']:>9.0f} MB{stats['rss_growth_mb']:>9.0f} MB")
+
+
+def main():
+    args = parse_args()
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        raise SystemExit("❌ ffmpeg and ffprobe must be on PATH")
+
+    resolutions = [name.strip() for name in args.resolutions.split(",") if name.strip()]
+    unknown = [name for name in resolutions if name not in RESOLUTIONS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown resolutions {unknown}; choose from {', '.join(RESOLUTIONS)}")
+    durations = [float(value) for value in args.durations.split(",") if value.strip()]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="snipix-media-benchmark-")
+    for subdir in ("videos", "processed", "thumbnails"):
+        os.makedirs(os.path.join(workdir, subdir), exist_ok=True)
+    # MediaService reads MEDIA_DIR when the module-level instance is constructed
+    os.environ["MEDIA_DIR"] = workdir
+    from services.media_service import media_service, WHISPER_AVAILABLE
+    # Keep the module-level instance from lazily loading small.en; each transcription stage sets its own model
+    media_service.whisper_model = None
+    gc.collect()
+
+    model_sizes = [size.strip() for size in args.models.split(",") if size.strip()]
+    if model_sizes and not WHISPER_AVAILABLE:
+        print("⚠️  faster-whisper is not installed; skipping transcription stages")
+        model_sizes = []
+    model_load: Dict[str, Any] = {}
+
+    try:
+
+        results = []
+        for resolution in resolutions:
+            width, height = RESOLUTIONS[resolution]
+            for duration in durations:
+                label = f"{resolution}-{duration:g}s"
+                video_path = os.path.join(workdir, "videos", f"{label}.mp4")
+                print(f"🎞️  Generating {label}...")
+                generate_video(video_path, width, height, duration, args.fps)
+                stages = benchmark_video(media_service, video_path, label, duration, args, model_sizes, model_load)
+                results.append({
+                    "label": label,
+                    "resolution": resolution,
+                    "width": width,
+                    "height": height,
+                    "duration": duration,
+                    "file_mb": round(os.path.getsize(video_path) / 1024 / 1024, 2),
+                    "stages": stages
+                })
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "ffmpeg": shutil.which("ffmpeg"),
+            "fps": args.fps,
+            "repeat": args.repeat
+        },
+        "whisper_models": model_load,
+        "results": results
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+        print(f"✅ Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Response serialization benchmark: response_model + jsonable_encoder vs the orjson fast path
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.fixtures import timeline_state, transcript_segments
+from models.schemas import ApiResponse, TranscriptionDocument, TimelineStateDocument
+from services.columnar_words import ColumnarWords, encode_words
+from utils.responses import fast_api_response, trusted_document
+
+
+def stored_transcription(word_count: int, words_per_segment: int = 20) -> dict:
+    """Transcription document as read back from Mongo, with columnar segment words"""
+    segments = []
+    for segment in transcript_segments(word_count, words_per_segment):
+        segment_doc = segment.model_dump(exclude={"words"})
+        segment_doc["words_columnar"] = encode_words(segment.words)
+        segments.append(segment_doc)
+    return {
+        "_id": ObjectId(), "project_id": "benchmark", "segments": segments, "language": "en",
+        "segment_storage": True, "created_at": datetime.now(), "updated_at": datetime.now()
+    }
+
+
+def stored_timeline(layer_count: int, clips_per_layer: int) -> dict:
+    """Timeline state document as read back from Mongo"""
+    document = TimelineStateDocument(project_id="benchmark", created_by="benchmark",
+                                     timeline_state=timeline_state(layer_count, clips_per_layer)).model_dump(by_alias=True)
+    document["_id"] = ObjectId()
+    return document
+
+
+def expand_segments(document: dict) -> dict:
+    """What the service does after reading: expand columnar words to plain dicts"""
+    document = dict(document)
+    document["segments"] = [
+        {**{k: v for k, v in segment.items() if k != "words_columnar"},
+         "words": ColumnarWords.from_document(segment["words_columnar"]).to_dicts()}
+        for segment in document["segments"]
+    ]
+    document["_id"] = str(document["_id"])
+    return document
+
+
+def build_app(transcription_doc: dict, timeline_doc: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before/transcription", response_model=ApiResponse[TranscriptionDocument])
+    async def transcription_before():
+        return ApiResponse(success=True, data=TranscriptionDocument(**expand_segments(transcription_doc)), message="ok")
+
+    @app.get("/after/transcription", response_model=ApiResponse[TranscriptionDocument])
+    async def transcription_after():
+        return fast_api_response(trusted_document(TranscriptionDocument, expand_segments(transcription_doc)), "ok")
+
+    @app.get("/before/timeline", response_model=ApiResponse[TimelineStateDocument])
+    async def timeline_before():
+        return ApiResponse(success=True, data=TimelineStateDocument(**{**timeline_doc, "_id": str(timeline_doc["_id"])}), message="ok")
+
+    @app.get("/after/timeline", response_model=ApiResponse[TimelineStateDocument])
+    async def timeline_after():
+        return fast_api_response(trusted_document(TimelineStateDocument, {**timeline_doc, "_id": str(timeline_doc["_id"])}), "ok")
+
+    return app
+
+
+def measure(client: TestClient, path: str, iterations: int) -> dict:
+    client.get(path)  # warm up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "bytes": len(response.content)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--layers", type=int, default=50)
+    parser.add_argument("--clips", type=int, default=100, help="clips per layer")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    client = TestClient(build_app(stored_transcription(args.words), stored_timeline(args.layers, args.clips)))
+
+    # Both paths must produce the same body
+    for name in ("transcription", "timeline"):
+        before, after = client.get(f"/before/{name}").json(), client.get(f"/after/{name}").json()
+        if before != after:
+            raise SystemExit(f"❌ {name}: fast path response differs from response_model output")
+
+    results = {
+        name: {
+            "before": measure(client, f"/before/{name}", args.iterations),
+            "after": measure(client, f"/after/{name}", args.iterations)
+        }
+        for name in ("transcription", "timeline")
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'endpoint':<15}{'before p50':>12}{'after p50':>12}{'speedup':>10}{'bytes':>12}")
+    for name, result in results.items():
+        speedup = result["before"]["p50_ms"] / max(result["after"]["p50_ms"], 1e-6)
+        print(f"{name:<15}{result['before']['p50_ms']:>10.1f}ms{result['after']['p50_ms']:>10.1f}ms"
+              f"{speedup:>9.1f}x{result['after']['bytes']:>12}")
+
+
+if __name__ == "__main__":
+    main()
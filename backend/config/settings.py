@@ -35,6 +35,9 @@ class Settings(BaseSettings):
     mongodb_retry_reads: bool = Field(default=True, env="MONGODB_RETRY_READS")
     mongodb_max_retry_time: int = Field(default=30, env="MONGODB_MAX_RETRY_TIME")
     
+    # Command monitoring settings
+    mongodb_slow_query_ms: float = Field(default=100.0, env="MONGODB_SLOW_QUERY_MS")
+    
     # Security settings
     mongodb_ssl: bool = Field(default=True, env="MONGODB_SSL")
     mongodb_tls_insecure: bool = Field(default=False, env="MONGODB_TLS_INSECURE")
@@ -49,11 +52,48 @@ class Settings(BaseSettings):
     algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     
+    # Password hashing settings
+    password_bcrypt_rounds: int = Field(default=12, env="PASSWORD_BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=0, env="PASSWORD_HASH_WORKERS")  # 0 = cores - 1
+    
     # Media settings
     media_upload_path: str = Field(default="./media", env="MEDIA_UPLOAD_PATH")
     max_file_size: int = Field(default=500 * 1024 * 1024, env="MAX_FILE_SIZE")  # 500MB
     allowed_file_types: list = Field(default=["video/mp4", "video/avi", "video/mov"], env="ALLOWED_FILE_TYPES")
     
+    # Response compression settings
+    compression_minimum_size: int = Field(default=1024, env="COMPRESSION_MINIMUM_SIZE")  # bytes
+    compression_gzip_level: int = Field(default=6, env="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(default=4, env="COMPRESSION_BROTLI_QUALITY")
+    
+    # Tracing settings
+    tracing_slow_request_ms: float = Field(default=500.0, env="TRACING_SLOW_REQUEST_MS")
+    tracing_buffer_size: int = Field(default=100, env="TRACING_BUFFER_SIZE")
+    tracing_export_path: Optional[str] = Field(default=None, env="TRACING_EXPORT_PATH")  # OTLP JSON lines
+    
+    # Process resource sampler settings
+    system_sample_interval_seconds: float = Field(default=5.0, env="SYSTEM_SAMPLE_INTERVAL_SECONDS")
+    system_sample_history_hours: float = Field(default=24.0, env="SYSTEM_SAMPLE_HISTORY_HOURS")
+    
+    # Event-loop watchdog settings
+    loop_watchdog_enabled: bool = Field(default=True, env="LOOP_WATCHDOG_ENABLED")
+    loop_block_threshold_ms: float = Field(default=100.0, env="LOOP_BLOCK_THRESHOLD_MS")
+    
+    # Multi-worker settings
+    prometheus_multiproc_dir: Optional[str] = Field(default=None, env="PROMETHEUS_MULTIPROC_DIR")  # set by gunicorn.conf.py
+    metrics_flush_interval_seconds: float = Field(default=5.0, env="METRICS_FLUSH_INTERVAL_SECONDS")
+    media_execution: str = Field(default="thread", env="MEDIA_EXECUTION")  # thread | process | queue
+    media_workers: int = Field(default=0, env="MEDIA_WORKERS")  # total media jobs at once; 0 = sum of the per-class caps
+    
+    # Media job queue settings (MEDIA_EXECUTION=queue hands media work to `python -m workers.media`)
+    media_job_lease_seconds: float = Field(default=60.0, env="MEDIA_JOB_LEASE_SECONDS")
+    media_job_heartbeat_seconds: float = Field(default=15.0, env="MEDIA_JOB_HEARTBEAT_SECONDS")
+    media_job_max_attempts: int = Field(default=3, env="MEDIA_JOB_MAX_ATTEMPTS")
+    media_job_poll_interval_seconds: float = Field(default=1.0, env="MEDIA_JOB_POLL_INTERVAL_SECONDS")
+    media_job_wait_timeout_seconds: float = Field(default=3600.0, env="MEDIA_JOB_WAIT_TIMEOUT_SECONDS")
+    media_scheduler_cpus: int = Field(default=0, env="MEDIA_SCHEDULER_CPUS")  # per-class caps scale with this; 0 = all cores
+    media_scheduler_quantum_seconds: float = Field(default=60.0, env="MEDIA_SCHEDULER_QUANTUM_SECONDS")
+    
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_file: str = Field(default="./logs/application.log", env="LOG_FILE")
@@ -0,0 +1,45 @@
+"""
+Gunicorn settings for running the API with several uvicorn workers:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+With preload_app the master imports the app once before forking, so workers share the imported
+code and module state copy-on-write. The Whisper model is deliberately not part of that: it is
+loaded lazily by whichever process transcribes (an API worker in thread mode, a spawned pool
+child in process mode), because CTranslate2 does not survive a fork. Database clients and
+background tasks are created per worker in the FastAPI startup hook, after the fork.
+"""
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("BIND", "0.0.0.0:8001")
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers now and then to cap slow leaks; jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# Workers write metrics snapshots here and /metrics merges them (read by config.settings)
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"snipix-metrics-{os.getpid()}")
+)
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be summed into the new one
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from services.metrics_multiprocess import mark_process_dead
+    mark_process_dead(metrics_dir, worker.pid)
+
+
+def on_exit(server):
+    shutil.rmtree(metrics_dir, ignore_errors=True)
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 import os
 import uuid
 from typing import List, Optional
@@ -22,7 +22,16 @@ from services.database import init_db
 from services.media_service import MediaService
 from models.schemas import *
 from middleware.error_handling import setup_error_handlers, setup_request_logging
+from middleware.compression import setup_compression
+from middleware.metrics import setup_metrics
+from middleware.tracing import setup_tracing
+from config.settings import settings
 from services.performance_monitor import performance_monitor
+from services.loop_watchdog import loop_watchdog
+from services.email_service import email_service
+from services.metrics import PROMETHEUS_CONTENT_TYPE
+from services.metrics_multiprocess import multiprocess_metrics
+from services.media_pool import media_pool
 
 app = FastAPI(
     title="Snipix API",
@@ -43,6 +52,20 @@ app.add_middleware(
 setup_error_handlers(app)
 setup_request_logging(app)
 
+# Compress JSON responses (timeline/transcript payloads are hundreds of KB)
+setup_compression(
+    app,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality
+)
+
+# Per-request trace spans (added before metrics so metrics stays the outermost layer)
+setup_tracing(app)
+
+# Request latency histograms and in-flight gauges (outermost, so it times everything above)
+setup_metrics(app)
+
 # Mount static files for media
 media_dir = os.getenv("MEDIA_DIR", "./media")
 os.makedirs(media_dir, exist_ok=True)
@@ -60,6 +83,9 @@ app.include_router(performance_router, prefix="/performance", tags=["Performance
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and create necessary directories"""
+    # Media pool first: in process mode it forks, which must happen before other threads start
+    media_pool.start()
+    
     await init_db()
     
     # Create media directories
@@ -72,6 +98,25 @@ async def startup_event():
         performance_monitor.start_monitoring()
     except Exception as e:
         print(f"Warning: Could not start performance monitoring: {e}")
+    
+    # Report sync work that stalls the event loop
+    if settings.loop_watchdog_enabled:
+        loop_watchdog.start()
+    
+    # Deliver queued emails in the background
+    email_service.start_outbox()
+    
+    # Share this worker's metrics with the others (no-op outside gunicorn)
+    multiprocess_metrics.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    performance_monitor.stop_monitoring()
+    loop_watchdog.stop()
+    await email_service.stop_outbox()
+    await multiprocess_metrics.stop()
+    media_pool.shutdown()
 
 @app.get("/")
 async def root():
@@ -87,6 +132,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics in Prometheus text exposition format (summed across workers under gunicorn)"""
+    return Response(content=multiprocess_metrics.render(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
 @app.get("/test")
 async def test_endpoint():
     """Test endpoint without authentication"""
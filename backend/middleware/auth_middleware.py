@@ -9,6 +9,7 @@ from bson import ObjectId
 
 from services.jwt_service import jwt_service
 from services.database import get_users_collection
+from services.auth_cache import user_cache
 from models.user_schemas import UserDocument, UserRole
 from utils.error_handlers import handle_database_error, get_user_friendly_message
 
@@ -43,23 +44,17 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Get user from database
+        # Get user from cache or database
         try:
-            users_collection = get_users_collection()
-            # Convert string ID to ObjectId for database query
-            user_doc = await users_collection.find_one({"_id": ObjectId(user_id)})
+            user = await AuthMiddleware._load_user(user_id)
             
-            if not user_doc:
+            if not user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="User not found",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
             
-            # Convert to UserDocument
-            user_doc["_id"] = str(user_doc["_id"])
-            user = UserDocument(**user_doc)
-            
             # Check if user is active
             if user.status != "active":
                 raise HTTPException(
@@ -79,6 +74,26 @@ class AuthMiddleware:
                 detail="Failed to authenticate user"
             )
     
+    @staticmethod
+    async def _load_user(user_id: str) -> Optional[UserDocument]:
+        """Load a user, served from the short-TTL user cache when possible"""
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        users_collection = get_users_collection()
+        # Convert string ID to ObjectId for database query
+        user_doc = await users_collection.find_one({"_id": ObjectId(user_id)})
+        if not user_doc:
+            return None
+        
+        # Convert to UserDocument
+        user_doc["_id"] = str(user_doc["_id"])
+        user_doc.pop("password_hash", None)
+        user = UserDocument(**user_doc)
+        user_cache.put(user_id, user)
+        return user
+    
     @staticmethod
     async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
         """Get current user ID from JWT token (lightweight version)"""
@@ -138,18 +153,12 @@ class AuthMiddleware:
             if not user_id:
                 return None
             
-            # Get user from database
-            users_collection = get_users_collection()
-            # Convert string ID to ObjectId for database query
-            user_doc = await users_collection.find_one({"_id": ObjectId(user_id)})
+            # Get user from cache or database
+            user = await AuthMiddleware._load_user(user_id)
             
-            if not user_doc:
+            if not user:
                 return None
             
-            # Convert to UserDocument
-            user_doc["_id"] = str(user_doc["_id"])
-            user = UserDocument(**user_doc)
-            
             # Check if user is active
             if user.status != "active":
                 return None
@@ -0,0 +1,150 @@
+"""
+Response compression middleware (Brotli when available, otherwise gzip)
+"""
+import gzip
+import logging
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.conditional import etag_variant
+
+# Try to import brotli, but don't fail if not available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings from Accept-Encoding, ignoring any with q=0"""
+    encodings = []
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.append(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """Compresses single-body responses above a size threshold.
+
+    Streamed responses (FileResponse for video, StreamingResponse) are passed through untouched:
+    media is already compressed and buffering it would defeat streaming.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = self._choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if not start_message:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = Headers(raw=start_message["headers"])
+            if start_message["status"] == 304:
+                # Revalidation of an encoded representation answers with the ETag the client holds for it
+                self._restore_variant_etag(start_message, request_headers.get("if-none-match", ""), encoding)
+                passthrough = True
+                await send(start_message)
+                start_message = {}
+                await send(message)
+                return
+
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                # Send as-is; later chunks of a streamed body follow untouched
+                passthrough = True
+                await send(start_message)
+                start_message = {}
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            mutable = MutableHeaders(raw=start_message["headers"])
+            mutable["Content-Encoding"] = encoding
+            mutable["Content-Length"] = str(len(compressed))
+            mutable.add_vary_header("Accept-Encoding")
+            etag = mutable.get("etag")
+            if etag and not etag.startswith("W/"):
+                # A strong validator must differ per content-coding
+                mutable["ETag"] = etag_variant(etag, encoding)
+
+            await send(start_message)
+            start_message = {}
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _restore_variant_etag(self, start_message: Message, if_none_match: str, encoding: str):
+        mutable = MutableHeaders(raw=start_message["headers"])
+        etag = mutable.get("etag")
+        if not etag or etag.startswith("W/"):
+            return
+        mutable.add_vary_header("Accept-Encoding")
+        variant = etag_variant(etag, encoding)
+        # Small bodies are sent uncompressed, so only echo the variant if that is what the client validated
+        if variant in (candidate.strip() for candidate in if_none_match.split(",")):
+            mutable["ETag"] = variant
+
+    def _choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        encodings = _accepted_encodings(accept_encoding)
+        if BROTLI_AVAILABLE and "br" in encodings:
+            return "br"
+        if "gzip" in encodings:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+def setup_compression(app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+    """Install response compression"""
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=minimum_size,
+        gzip_level=gzip_level,
+        brotli_quality=brotli_quality
+    )
+    logger.info(f"Response compression enabled ({'br, ' if BROTLI_AVAILABLE else ''}gzip; min {minimum_size} bytes)")
@@ -0,0 +1,80 @@
+"""
+Request metrics middleware (latency histograms, status codes, in-flight requests)
+"""
+import logging
+import time
+from typing import Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.performance_monitor import performance_monitor
+from services.metrics import http_requests_in_progress
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests no route matched (404s, scanners); keeps raw paths out of label values
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+def resolve_route_template(scope: Scope, cache: Dict[object, str]) -> str:
+    """Path template of the route that handled a request (call after the app has run)"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        # Mounted apps (static media) only set root_path
+        root_path = scope.get("root_path", "")
+        return f"{root_path}/*" if root_path else UNMATCHED_ROUTE
+
+    template = cache.get(endpoint)
+    if template is None:
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            if getattr(route, "endpoint", None) is endpoint:
+                template = route.path
+                break
+        else:
+            template = getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+        cache[endpoint] = template
+    return template
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and records it under its route template (/projects/{project_id}).
+
+    The router stores the matched endpoint in the shared scope, which is mapped back to the route's
+    path template after the response; the real status code is read from http.response.start.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_templates: Dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "UNKNOWN")
+        status_code = 500
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            performance_monitor.record_api_call(
+                resolve_route_template(scope, self._route_templates), method, time.perf_counter() - start_time, status_code
+            )
+
+
+def setup_metrics(app):
+    """Install request metrics (add last so it wraps the other middleware)"""
+    app.add_middleware(MetricsMiddleware)
+    logger.info("Request metrics enabled")
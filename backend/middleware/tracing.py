@@ -0,0 +1,73 @@
+"""
+Request tracing middleware
+"""
+import logging
+import re
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from middleware.metrics import resolve_route_template
+from utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+def parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(trace_id, parent_span_id) from a traceparent header, if valid"""
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+class TracingMiddleware:
+    """Starts a trace per HTTP request; spans opened anywhere below attach to it through contextvars.
+
+    An incoming traceparent header continues the caller's trace; the trace id is echoed in X-Trace-Id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_templates: Dict[object, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "UNKNOWN")
+        trace_id, parent_id = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        trace, tokens = tracer.start_trace(
+            f"{method} {scope.get('path', '/')}", trace_id, parent_id,
+            **{"http.method": method, "http.target": scope.get("path", "/")}
+        )
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                trace.root.set_attribute("http.status_code", message["status"])
+                MutableHeaders(scope=message)["X-Trace-Id"] = trace.trace_id
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            trace.root.set_attribute("http.status_code", 500)
+            raise
+        finally:
+            route = resolve_route_template(scope, self._route_templates)
+            trace.root.name = f"{method} {route}"
+            trace.root.set_attribute("http.route", route)
+            tracer.finish_trace(trace, tokens, error)
+
+
+def setup_tracing(app):
+    """Install request tracing"""
+    app.add_middleware(TracingMiddleware)
+    logger.info(f"Request tracing enabled (keeping traces slower than {tracer.slow_request_ms:.0f}ms)")
@@ -10,6 +10,9 @@ from bson import ObjectId
 from services.database import get_async_db, get_projects_collection, get_users_collection
 from models.user_schemas import UserDocument, UserRole, UserStatus, AuthProvider
 from utils.password_utils import password_utils
+from utils.email_utils import normalize_email
+from services.timeline_service import build_timeline_stats
+from services.transcription_service import TranscriptionService
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +40,7 @@ class DataMigration:
             
             admin_user_data = {
                 "email": "admin@snipix.com",
+                "email_lower": normalize_email("admin@snipix.com"),
                 "name": "System Administrator",
                 "username": "admin",
                 "role": UserRole.ADMIN.value,
@@ -218,11 +222,127 @@ class DataMigration:
             logger.error(f"Transcription migration failed: {e}")
             return {"migrated": 0, "errors": 1}
     
+    async def backfill_email_lower(self) -> Dict[str, Any]:
+        """Backfill the normalized email_lower field used for case-insensitive login lookups"""
+        try:
+            users_without_email_lower = await self.users_collection.find(
+                {"email_lower": {"$exists": False}, "email": {"$type": "string"}},
+                {"email": 1}
+            ).to_list(length=None)
+            
+            if not users_without_email_lower:
+                logger.info("No users need email_lower backfill")
+                return {"migrated": 0, "errors": 0}
+            
+            migrated_count = 0
+            error_count = 0
+            
+            for user in users_without_email_lower:
+                try:
+                    await self.users_collection.update_one(
+                        {"_id": user["_id"]},
+                        {"$set": {"email_lower": normalize_email(user["email"])}}
+                    )
+                    migrated_count += 1
+                    
+                except Exception as e:
+                    # Most likely two accounts whose emails differ only by case; needs a manual merge
+                    error_count += 1
+                    logger.error(f"Failed to backfill email_lower for user {user.get('_id')} ({user.get('email')}): {e}")
+            
+            logger.info(f"email_lower backfill completed: {migrated_count} migrated, {error_count} errors")
+            return {"migrated": migrated_count, "errors": error_count}
+            
+        except Exception as e:
+            logger.error(f"email_lower backfill failed: {e}")
+            return {"migrated": 0, "errors": 1}
+    
+    async def backfill_timeline_stats(self) -> Dict[str, Any]:
+        """Backfill the stats summary read by timeline history listings and kept up to date by operations"""
+        try:
+            timeline_states_collection = self.db.timeline_states
+            
+            # Only the fields the stats are computed from
+            timeline_states_without_stats = await timeline_states_collection.find(
+                {"stats": {"$exists": False}},
+                {"timeline_state.duration": 1, "timeline_state.layers.clips.end_time": 1}
+            ).to_list(length=None)
+            
+            if not timeline_states_without_stats:
+                logger.info("No timeline states need stats backfill")
+                return {"migrated": 0, "errors": 0}
+            
+            migrated_count = 0
+            error_count = 0
+            
+            for timeline_state in timeline_states_without_stats:
+                try:
+                    state = timeline_state.get("timeline_state") or {}
+                    stats = build_timeline_stats(
+                        [
+                            [clip.get("end_time") or 0.0 for clip in layer.get("clips") or []]
+                            for layer in state.get("layers") or []
+                        ],
+                        state.get("duration")
+                    )
+                    await timeline_states_collection.update_one(
+                        {"_id": timeline_state["_id"], "stats": {"$exists": False}},
+                        {"$set": {"stats": stats}}
+                    )
+                    migrated_count += 1
+                    
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f"Failed to backfill stats for timeline state {timeline_state.get('_id')}: {e}")
+            
+            logger.info(f"Timeline stats backfill completed: {migrated_count} migrated, {error_count} errors")
+            return {"migrated": migrated_count, "errors": error_count}
+            
+        except Exception as e:
+            logger.error(f"Timeline stats backfill failed: {e}")
+            return {"migrated": 0, "errors": 1}
+    
+    async def migrate_segment_storage(self) -> Dict[str, Any]:
+        """Move embedded segments of legacy transcriptions into transcription_segments, where search indexes them"""
+        try:
+            transcriptions_collection = self.db.transcriptions
+            
+            legacy_transcriptions = await transcriptions_collection.find(
+                {"segment_storage": {"$ne": True}},
+                {"project_id": 1, "segments": 1}
+            ).to_list(length=None)
+            
+            if not legacy_transcriptions:
+                logger.info("No transcriptions need segment storage migration")
+                return {"migrated": 0, "errors": 0}
+            
+            transcription_service = TranscriptionService()
+            await transcription_service._ensure_collections_async()
+            migrated_count = 0
+            error_count = 0
+            
+            for transcription in legacy_transcriptions:
+                try:
+                    await transcription_service._migrate_to_segment_storage(transcription)
+                    migrated_count += 1
+                    
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f"Failed to migrate segments of transcription {transcription.get('_id')}: {e}")
+            
+            logger.info(f"Segment storage migration completed: {migrated_count} migrated, {error_count} errors")
+            return {"migrated": migrated_count, "errors": error_count}
+            
+        except Exception as e:
+            logger.error(f"Segment storage migration failed: {e}")
+            return {"migrated": 0, "errors": 1}
+    
     async def create_database_indexes(self) -> bool:
         """Create necessary database indexes for authentication"""
         try:
             # Create indexes for users collection
             await self.users_collection.create_index("email", unique=True)
+            await self.users_collection.create_index("email_lower", unique=True, sparse=True)
             await self.users_collection.create_index("username", unique=True, sparse=True)
             await self.users_collection.create_index("google_id", unique=True, sparse=True)
             await self.users_collection.create_index("email_verification_token")
@@ -261,6 +381,9 @@ class DataMigration:
             "projects_migrated": {"migrated": 0, "errors": 0},
             "timeline_states_migrated": {"migrated": 0, "errors": 0},
             "transcriptions_migrated": {"migrated": 0, "errors": 0},
+            "email_lower_backfilled": {"migrated": 0, "errors": 0},
+            "timeline_stats_backfilled": {"migrated": 0, "errors": 0},
+            "segment_storage_migrated": {"migrated": 0, "errors": 0},
             "indexes_created": False,
             "overall_success": False
         }
@@ -277,12 +400,18 @@ class DataMigration:
             results["projects_migrated"] = await self.migrate_existing_projects()
             results["timeline_states_migrated"] = await self.migrate_timeline_states()
             results["transcriptions_migrated"] = await self.migrate_transcriptions()
+            results["email_lower_backfilled"] = await self.backfill_email_lower()
+            results["timeline_stats_backfilled"] = await self.backfill_timeline_stats()
+            results["segment_storage_migrated"] = await self.migrate_segment_storage()
             
             # Check overall success
             total_errors = (
                 results["projects_migrated"]["errors"] +
                 results["timeline_states_migrated"]["errors"] +
-                results["transcriptions_migrated"]["errors"]
+                results["transcriptions_migrated"]["errors"] +
+                results["email_lower_backfilled"]["errors"] +
+                results["timeline_stats_backfilled"]["errors"] +
+                results["segment_storage_migrated"]["errors"]
             )
             
             results["overall_success"] = (
@@ -315,6 +444,9 @@ async def main():
     print(f"Projects Migrated: {results['projects_migrated']['migrated']} (Errors: {results['projects_migrated']['errors']})")
     print(f"Timeline States Migrated: {results['timeline_states_migrated']['migrated']} (Errors: {results['timeline_states_migrated']['errors']})")
     print(f"Transcriptions Migrated: {results['transcriptions_migrated']['migrated']} (Errors: {results['transcriptions_migrated']['errors']})")
+    print(f"Emails Normalized: {results['email_lower_backfilled']['migrated']} (Errors: {results['email_lower_backfilled']['errors']})")
+    print(f"Timeline Stats Backfilled: {results['timeline_stats_backfilled']['migrated']} (Errors: {results['timeline_stats_backfilled']['errors']})")
+    print(f"Segment Storage Migrated: {results['segment_storage_migrated']['migrated']} (Errors: {results['segment_storage_migrated']['errors']})")
     print(f"Indexes Created: {results['indexes_created']}")
     print(f"Overall Success: {results['overall_success']}")
     print("="*50)
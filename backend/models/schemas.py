@@ -138,6 +138,24 @@ class Project(SoftDeleteSchema):
     collaborators: List[str] = Field(default_factory=list)  # user_ids
     permissions: Dict[str, List[str]] = Field(default_factory=dict)  # user_id -> permissions
 
+class ProjectListItem(BaseSchema):
+    """List-view projection of a project (no metadata or permissions)"""
+    id: str = Field(alias="_id")
+    name: str
+    description: Optional[str] = None
+    user_id: str
+    thumbnail: Optional[str] = None
+    duration: Optional[float] = None
+    trimmed_duration: Optional[float] = None
+    status: str = Field(default="active")
+    tags: List[str] = Field(default_factory=list)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class ProjectListPage(BaseSchema):
+    items: List[ProjectListItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = None  # opaque (updated_at, _id) cursor for the next page
+
 # Clip models
 class ClipProperties(BaseSchema):
     opacity: Optional[float] = 1.0
@@ -194,6 +212,11 @@ class TimelineState(BaseSchema):
     is_snapping: bool = True
 
 # MongoDB Timeline State models
+class TimelineStats(BaseSchema):
+    clip_count: int = 0
+    layer_count: int = 0
+    duration: float = 0.0
+
 class TimelineStateDocument(VersionedSchema):
     project_id: str
     timeline_state: TimelineState
@@ -201,6 +224,22 @@ class TimelineStateDocument(VersionedSchema):
     description: Optional[str] = None
     created_by: str  # user_id
     change_summary: Optional[str] = None
+    stats: Optional[TimelineStats] = None
+
+class TimelineStateSummary(BaseSchema):
+    """Lightweight history entry without the layer/clip tree"""
+    id: str = Field(alias="_id")
+    version: int
+    is_current: bool = False
+    description: Optional[str] = None
+    change_summary: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    stats: Optional[TimelineStats] = None
+
+class TimelineHistoryPage(BaseSchema):
+    items: List[TimelineStateSummary] = Field(default_factory=list)
+    next_before_version: Optional[int] = None  # pass back to fetch the next (older) page
 
 class TimelineStateCreate(BaseSchema):
     project_id: str
@@ -213,6 +252,37 @@ class TimelineStateUpdate(BaseSchema):
     description: Optional[str] = None
     change_summary: Optional[str] = None
 
+# Timeline operation models (partial updates)
+class TimelineOperationType(str, Enum):
+    MOVE_CLIP = "move_clip"
+    TRIM_CLIP = "trim_clip"
+    ADD_LAYER = "add_layer"
+    REMOVE_LAYER = "remove_layer"
+    SET_PLAYHEAD = "set_playhead"
+
+class TimelineOperation(BaseSchema):
+    type: TimelineOperationType
+    layer_id: Optional[str] = None
+    clip_id: Optional[str] = None
+    target_layer_id: Optional[str] = None  # move_clip across layers
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    original_start_time: Optional[float] = None
+    layer: Optional[Layer] = None  # add_layer
+    playhead_time: Optional[float] = None  # set_playhead
+
+class TimelineOperationsRequest(BaseSchema):
+    operations: List[TimelineOperation]
+    description: Optional[str] = None
+    change_summary: Optional[str] = None
+
+class TimelineOperationsResult(BaseSchema):
+    timeline_id: str
+    project_id: str
+    version: int
+    changes: List[Dict[str, Any]] = Field(default_factory=list)
+    updated_at: datetime
+
 # Transcript models
 class TranscriptWord(BaseSchema):
     text: str
@@ -237,6 +307,23 @@ class TranscriptState(BaseSchema):
     words: List[TranscriptWord] = Field(default_factory=list)
     selected_words: List[str] = Field(default_factory=list)
 
+class TranscriptWordLookupRequest(BaseSchema):
+    word_ids: List[str]  # "<start>-<end>", as used by selected_words
+
+class TranscriptSearchHit(BaseSchema):
+    project_id: str
+    project_name: Optional[str] = None
+    segment_id: str
+    start_time: float
+    end_time: float
+    snippet: str
+    highlights: List[List[int]] = Field(default_factory=list)  # [start, end) offsets into snippet
+    score: float
+
+class TranscriptSearchResults(BaseSchema):
+    query: str
+    hits: List[TranscriptSearchHit] = Field(default_factory=list)
+
 # MongoDB Transcription models
 class TranscriptionDocument(MongoDBBaseSchema):
     project_id: str
@@ -279,6 +366,38 @@ class RemoveFillersResponse(BaseSchema):
     processed_video_path: str
     removed_segments: List[Dict[str, Any]]
 
+class DisfluencyType(str, Enum):
+    FILLER = "filler"
+    REPETITION = "repetition"
+    STUTTER = "stutter"
+    PAUSE = "pause"
+
+class FillerLexicon(BaseSchema):
+    fillers: List[str] = Field(default_factory=list)  # single words or phrases, always fillers
+    contextual_fillers: List[str] = Field(default_factory=list)  # fillers only next to a pause or at low confidence
+    pause_threshold: float = Field(default=1.0, gt=0)  # seconds of silence reported as a pause
+    context_pause: float = Field(default=0.3, ge=0)  # gap that makes a contextual filler count
+    repeat_gap: float = Field(default=0.5, ge=0)  # max gap between repeated words
+    min_confidence: float = Field(default=0.5, ge=0, le=1)
+
+class DisfluencyEvent(BaseSchema):
+    type: DisfluencyType
+    start: float
+    end: float
+    start_index: int  # word index range [start_index, end_index); empty for pauses
+    end_index: int
+    text: str = ""
+
+class DisfluencyReport(BaseSchema):
+    words: List[TranscriptWord] = Field(default_factory=list)
+    events: List[DisfluencyEvent] = Field(default_factory=list)
+    counts: Dict[str, int] = Field(default_factory=dict)
+
+class DetectFillersRequest(BaseSchema):
+    project_id: str
+    lexicon: Optional[FillerLexicon] = None  # defaults to the user's saved lexicon
+    persist: bool = False  # write the new is_filler flags back to the stored transcription
+
 # API Response models
 class ApiResponse(BaseSchema, Generic[T]):
     success: bool = True
@@ -320,6 +439,32 @@ class TrimVideoResponse(BaseSchema):
     trimmed_video_path: str
     new_duration: float
 
+# Media job queue models
+class MediaJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    ABANDONED = "abandoned"  # the caller stopped waiting before it finished
+
+class MediaJob(BaseSchema):
+    id: str
+    operation: str
+    status: MediaJobStatus
+    project_id: Optional[str] = None
+    job_class: Optional[str] = None  # preview > trim > transcription > proxy
+    estimated_seconds: Optional[float] = None
+    queue_position: Optional[int] = None  # 1 = next in its class; only while queued
+    jobs_ahead: Optional[int] = None
+    estimated_start_seconds: Optional[float] = None
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Any] = None  # the operation's return value, once succeeded
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 # User Session models
 class UserSession(MongoDBBaseSchema):
     user_id: str
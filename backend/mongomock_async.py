@@ -0,0 +1,61 @@
+"""
+Minimal async (motor-style) wrapper over mongomock collections for the test scripts
+"""
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        return AsyncCursor(self.cursor.sort(*args, **kwargs))
+
+    def skip(self, *args, **kwargs):
+        return AsyncCursor(self.cursor.skip(*args, **kwargs))
+
+    def limit(self, *args, **kwargs):
+        return AsyncCursor(self.cursor.limit(*args, **kwargs))
+
+    async def to_list(self, length=None):
+        items = list(self.cursor)
+        return items if length is None else items[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self.cursor:
+            yield item
+
+
+class AsyncCollection:
+    """Just enough of motor's collection API over a mongomock collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline):
+        return AsyncCursor(self.collection.aggregate(pipeline))
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncDatabase:
+    """Stands in for services.database.async_db; collections are created on first access"""
+
+    def __init__(self, database):
+        self.database = database
+
+    def __getattr__(self, name):
+        return AsyncCollection(self.database[name])
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.database[name])
@@ -0,0 +1,136 @@
+"""
+In-process caches for verified access tokens and authenticated users
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+from models.user_schemas import UserDocument
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenCache:
+    """LRU of verified token digests -> payloads; an entry never outlives its token's exp claim"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        # Raw tokens are never kept in memory
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for a token that has already been verified and has not expired"""
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Remember a verified payload until its exp claim"""
+        exp = payload.get("exp")
+        if not exp:
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (float(exp), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached tokens"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size and hit counters"""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class UserCache:
+    """Short-TTL cache of user documents, invalidated when a user is updated"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, UserDocument]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[UserDocument]:
+        """Cached user if it was loaded within the TTL"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: str, user: UserDocument):
+        """Cache a freshly loaded user"""
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Drop a user after it changes"""
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        """Drop all cached users"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size and hit counters"""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global auth cache instances
+token_cache = TokenCache()
+user_cache = UserCache()
+
+
+async def write_user(user_id: Any, write: Awaitable[T]) -> T:
+    """Await a write to one user document, then drop that user from the user cache.
+
+    Every write to the users collection goes through here, so authenticated requests never keep
+    seeing an old role, status or password for the rest of the cache TTL.
+    """
+    try:
+        return await write
+    finally:
+        user_cache.invalidate(str(user_id))
@@ -4,11 +4,15 @@ import bcrypt
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
+from bson import ObjectId
 
 from services.database import get_users_collection
 from models.user_schemas import UserDocument, UserCreate, UserRole, UserStatus, AuthProvider
 from services.jwt_service import jwt_service
 from utils.password_utils import password_utils
+from services.auth_cache import write_user
+from services.password_hasher import password_hasher
+from utils.email_utils import normalize_email, email_query
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +22,17 @@ class AuthService:
         self.access_token_expire_minutes = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
         self.refresh_token_expire_days = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
-    def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
-        return password_utils.hash_password(password)
+    async def hash_password(self, password: str) -> str:
+        """Hash password using bcrypt (on the hashing pool, off the event loop)"""
+        return await password_hasher.hash_password(password)
 
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        return password_utils.verify_password(password, hashed_password)
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify password against hash (on the hashing pool, off the event loop)"""
+        return await password_hasher.verify_password(password, hashed_password)
+
+    def _user_filter(self, user_id: str) -> dict:
+        """Query for a user by id; users are stored with ObjectId keys"""
+        return {"_id": ObjectId(user_id) if ObjectId.is_valid(user_id) else user_id}
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
@@ -45,7 +53,7 @@ class AuthService:
             users_collection = get_users_collection()
             
             # Check if user already exists by email (case-insensitive)
-            existing_user = await users_collection.find_one({"email": {"$regex": f"^{user_data.email}$", "$options": "i"}})
+            existing_user = await users_collection.find_one(email_query(user_data.email))
             if existing_user:
                 logger.warning(f"User with email {user_data.email} already exists")
                 return None, "Email already exists. Please use a different email address."
@@ -64,11 +72,12 @@ class AuthService:
                 return None, f"Password validation failed: {', '.join(errors)}"
             
             # Hash password
-            password_hash = self.hash_password(user_data.password)
+            password_hash = await self.hash_password(user_data.password)
             
             # Create user document
             user_doc = {
                 "email": user_data.email,
+                "email_lower": normalize_email(user_data.email),
                 "name": user_data.name,
                 "username": user_data.username,
                 "avatar_url": user_data.avatar_url,
@@ -109,7 +118,7 @@ class AuthService:
             users_collection = get_users_collection()
             
             # Find user by email (case-insensitive)
-            user_doc = await users_collection.find_one({"email": {"$regex": f"^{email}$", "$options": "i"}})
+            user_doc = await users_collection.find_one(email_query(email))
             if not user_doc:
                 logger.warning(f"User not found: {email}")
                 return None
@@ -121,21 +130,28 @@ class AuthService:
             
             # Verify password
             password_hash = user_doc.get("password_hash")
-            if not password_hash or not self.verify_password(password, password_hash):
+            if not password_hash:
+                logger.warning(f"Invalid password for user: {email}")
+                return None
+            is_valid, upgraded_hash = await password_hasher.verify_and_upgrade(password, password_hash)
+            if not is_valid:
                 logger.warning(f"Invalid password for user: {email}")
                 return None
             
             # Update last login
-            await users_collection.update_one(
+            login_update = {
+                "last_login": datetime.utcnow(),
+                "login_count": user_doc.get("login_count", 0) + 1,
+                "updated_at": datetime.utcnow()
+            }
+            if upgraded_hash:
+                # Stored hash used an older cost factor; replace it while we have the plaintext
+                login_update["password_hash"] = upgraded_hash
+                logger.info(f"Upgraded password hash cost for user: {email}")
+            await write_user(user_doc["_id"], users_collection.update_one(
                 {"_id": user_doc["_id"]},
-                {
-                    "$set": {
-                        "last_login": datetime.utcnow(),
-                        "login_count": user_doc.get("login_count", 0) + 1,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
+                {"$set": login_update}
+            ))
             
             # Return user without password
             user_doc["_id"] = str(user_doc["_id"])
@@ -157,7 +173,7 @@ class AuthService:
             
             users_collection = get_users_collection()
             
-            user_doc = await users_collection.find_one({"_id": user_id})
+            user_doc = await users_collection.find_one(self._user_filter(user_id))
             if not user_doc:
                 return None
             
@@ -181,7 +197,7 @@ class AuthService:
             
             users_collection = get_users_collection()
             
-            user_doc = await users_collection.find_one({"email": email})
+            user_doc = await users_collection.find_one(email_query(email))
             if not user_doc:
                 return None
             
@@ -207,12 +223,14 @@ class AuthService:
             
             # Add updated_at timestamp
             update_data["updated_at"] = datetime.utcnow()
+            if update_data.get("email"):
+                update_data["email_lower"] = normalize_email(update_data["email"])
             
             # Update user
-            result = await users_collection.update_one(
-                {"_id": user_id},
+            result = await write_user(user_id, users_collection.update_one(
+                self._user_filter(user_id),
                 {"$set": update_data}
-            )
+            ))
             
             if result.modified_count == 0:
                 return None
@@ -230,27 +248,28 @@ class AuthService:
             users_collection = get_users_collection()
             
             # Get user with password
-            user_doc = await users_collection.find_one({"_id": user_id})
+            user_doc = await users_collection.find_one(self._user_filter(user_id))
             if not user_doc:
                 return False
             
             # Verify old password
-            if not self.verify_password(old_password, user_doc["password"]):
+            password_hash = user_doc.get("password_hash")
+            if not password_hash or not await self.verify_password(old_password, password_hash):
                 return False
             
             # Hash new password
-            hashed_new_password = self.hash_password(new_password)
+            hashed_new_password = await self.hash_password(new_password)
             
             # Update password
-            result = await users_collection.update_one(
-                {"_id": user_id},
+            result = await write_user(user_id, users_collection.update_one(
+                self._user_filter(user_id),
                 {
                     "$set": {
-                        "password": hashed_new_password,
+                        "password_hash": hashed_new_password,
                         "updated_at": datetime.utcnow()
                     }
                 }
-            )
+            ))
             
             return result.modified_count > 0
             
@@ -0,0 +1,220 @@
+"""
+Columnar storage for transcript words
+"""
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+from bson import Binary
+
+from models.schemas import TranscriptWord
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_FORMAT_VERSION = 1
+
+# Timestamps are stored as float32 and rounded back on read; Whisper emits them at 10ms resolution
+TIME_DECIMALS = 3
+CONFIDENCE_DECIMALS = 4
+
+
+class ColumnarWords(Sequence):
+    """Parallel arrays of word fields; TranscriptWord objects are only built when an item is accessed"""
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, confidences: np.ndarray, is_filler: np.ndarray,
+                 speakers: List[Optional[str]], speaker_codes: np.ndarray, text: bytes, text_offsets: np.ndarray):
+        self.starts = starts
+        self.ends = ends
+        self.confidences = confidences
+        self.is_filler = is_filler
+        self.speakers = speakers  # dictionary; speaker_codes index into [None] + speakers
+        self.speaker_codes = speaker_codes
+        self.text = text
+        self.text_offsets = text_offsets
+
+    @classmethod
+    def from_words(cls, words: Sequence[TranscriptWord]) -> "ColumnarWords":
+        """Encode word models into columns"""
+        n = len(words)
+        speakers: List[Optional[str]] = []
+        speaker_lookup: Dict[str, int] = {}
+        speaker_codes = np.zeros(n, dtype="<u2")
+        encoded_text = []
+        text_offsets = np.zeros(n + 1, dtype="<u4")
+        offset = 0
+        for i, word in enumerate(words):
+            if word.speaker_id is not None:
+                code = speaker_lookup.get(word.speaker_id)
+                if code is None:
+                    speakers.append(word.speaker_id)
+                    code = speaker_lookup[word.speaker_id] = len(speakers)
+                speaker_codes[i] = code
+            encoded = word.text.encode("utf-8")
+            encoded_text.append(encoded)
+            offset += len(encoded)
+            text_offsets[i + 1] = offset
+
+        return cls(
+            starts=np.fromiter((word.start for word in words), dtype="<f4", count=n),
+            ends=np.fromiter((word.end for word in words), dtype="<f4", count=n),
+            confidences=np.fromiter((word.confidence for word in words), dtype="<f4", count=n),
+            is_filler=np.fromiter((bool(word.is_filler) for word in words), dtype=bool, count=n),
+            speakers=speakers,
+            speaker_codes=speaker_codes,
+            text=b"".join(encoded_text),
+            text_offsets=text_offsets
+        )
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "ColumnarWords":
+        """Decode the stored BSON form; numeric columns are zero-copy views over the binary payloads"""
+        version = document.get("v")
+        if version != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar word format version: {version}")
+        n = document["count"]
+        return cls(
+            starts=np.frombuffer(document["start"], dtype="<f4", count=n),
+            ends=np.frombuffer(document["end"], dtype="<f4", count=n),
+            confidences=np.frombuffer(document["confidence"], dtype="<f4", count=n),
+            is_filler=np.unpackbits(np.frombuffer(document["is_filler"], dtype=np.uint8), count=n).astype(bool),
+            speakers=list(document.get("speakers", [])),
+            speaker_codes=np.frombuffer(document["speaker"], dtype="<u2", count=n),
+            text=bytes(document["text"]),
+            text_offsets=np.frombuffer(document["text_offsets"], dtype="<u4", count=n + 1)
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["ColumnarWords"]) -> "ColumnarWords":
+        """Join several column sets (e.g. one per segment) into one"""
+        if not parts:
+            return cls.from_words([])
+
+        speakers: List[Optional[str]] = []
+        speaker_lookup: Dict[str, int] = {}
+        speaker_codes = []
+        text_offsets = [np.zeros(1, dtype="<u4")]
+        base = 0
+        for part in parts:
+            # Re-map each part's speaker dictionary onto the merged one (code 0 stays "no speaker")
+            remap = np.zeros(len(part.speakers) + 1, dtype="<u2")
+            for code, speaker in enumerate(part.speakers, start=1):
+                if speaker not in speaker_lookup:
+                    speakers.append(speaker)
+                    speaker_lookup[speaker] = len(speakers)
+                remap[code] = speaker_lookup[speaker]
+            speaker_codes.append(remap[part.speaker_codes])
+            text_offsets.append(part.text_offsets[1:] + base)
+            base += len(part.text)
+
+        return cls(
+            starts=np.concatenate([part.starts for part in parts]),
+            ends=np.concatenate([part.ends for part in parts]),
+            confidences=np.concatenate([part.confidences for part in parts]),
+            is_filler=np.concatenate([part.is_filler for part in parts]),
+            speakers=speakers,
+            speaker_codes=np.concatenate(speaker_codes),
+            text=b"".join(part.text for part in parts),
+            text_offsets=np.concatenate(text_offsets).astype("<u4")
+        )
+
+    def to_document(self) -> Dict[str, Any]:
+        """BSON form: one binary payload per column instead of a subdocument per word"""
+        return {
+            "v": COLUMNAR_FORMAT_VERSION,
+            "count": len(self),
+            "start": Binary(self.starts.astype("<f4").tobytes()),
+            "end": Binary(self.ends.astype("<f4").tobytes()),
+            "confidence": Binary(self.confidences.astype("<f4").tobytes()),
+            "is_filler": Binary(np.packbits(self.is_filler).tobytes()),
+            "speakers": self.speakers,
+            "speaker": Binary(self.speaker_codes.astype("<u2").tobytes()),
+            "text": Binary(self.text),
+            "text_offsets": Binary(self.text_offsets.astype("<u4").tobytes())
+        }
+
+    def is_sorted(self) -> bool:
+        """Whether words are already in (start, end) order"""
+        if len(self) < 2:
+            return True
+        start_diff = np.diff(self.starts)
+        return bool(np.all((start_diff > 0) | ((start_diff == 0) & (np.diff(self.ends) >= 0))))
+
+    def take(self, indices: np.ndarray) -> "ColumnarWords":
+        """Reordered/filtered copy of the columns"""
+        lengths = np.diff(self.text_offsets)[indices]
+        offsets = np.zeros(len(indices) + 1, dtype="<u4")
+        np.cumsum(lengths, out=offsets[1:])
+        text = b"".join(self.text[self.text_offsets[i]:self.text_offsets[i + 1]] for i in indices.tolist())
+        return ColumnarWords(
+            starts=self.starts[indices],
+            ends=self.ends[indices],
+            confidences=self.confidences[indices],
+            is_filler=self.is_filler[indices],
+            speakers=self.speakers,
+            speaker_codes=self.speaker_codes[indices],
+            text=text,
+            text_offsets=offsets
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TranscriptWord, List[TranscriptWord]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[TranscriptWord]:
+        return (self._materialize(i) for i in range(len(self)))
+
+    def to_list(self) -> List[TranscriptWord]:
+        """Materialize every word, converting whole columns at once"""
+        return [TranscriptWord(**word) for word in self.to_dicts()]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Plain word dicts (TranscriptWord field order) for paths that serialize without models"""
+        offsets = self.text_offsets.tolist()
+        text = self.text
+        speaker_names = [None] + self.speakers
+        return [
+            {
+                "text": text[offsets[i]:offsets[i + 1]].decode("utf-8"),
+                "start": start,
+                "end": end,
+                "confidence": confidence,
+                "is_filler": is_filler,
+                "speaker_id": speaker_names[code]
+            }
+            for i, (start, end, confidence, is_filler, code) in enumerate(zip(
+                np.round(self.starts.astype(np.float64), TIME_DECIMALS).tolist(),
+                np.round(self.ends.astype(np.float64), TIME_DECIMALS).tolist(),
+                np.round(self.confidences.astype(np.float64), CONFIDENCE_DECIMALS).tolist(),
+                self.is_filler.tolist(),
+                self.speaker_codes.tolist()
+            ))
+        ]
+
+    def _materialize(self, i: int) -> TranscriptWord:
+        code = int(self.speaker_codes[i])
+        return TranscriptWord(
+            text=self.text[self.text_offsets[i]:self.text_offsets[i + 1]].decode("utf-8"),
+            start=round(float(self.starts[i]), TIME_DECIMALS),
+            end=round(float(self.ends[i]), TIME_DECIMALS),
+            confidence=round(float(self.confidences[i]), CONFIDENCE_DECIMALS),
+            is_filler=bool(self.is_filler[i]),
+            speaker_id=self.speakers[code - 1] if code else None
+        )
+
+
+def encode_words(words: Sequence[TranscriptWord]) -> Dict[str, Any]:
+    """Stored form of a word list"""
+    return ColumnarWords.from_words(words).to_document()
+
+
+def decode_words(document: Dict[str, Any]) -> ColumnarWords:
+    """Lazy view over a stored word list"""
+    return ColumnarWords.from_document(document)
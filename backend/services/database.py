@@ -8,6 +8,7 @@ from datetime import datetime
 
 # Import settings
 from config.settings import settings, get_mongodb_connection_string, get_mongodb_connection_options
+from services.db_monitoring import command_monitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +39,7 @@ async def init_db():
         # Initialize async client with connection options
         async_client = motor.motor_asyncio.AsyncIOMotorClient(
             connection_string,
+            event_listeners=[command_monitor],
             **connection_options
         )
         async_db = async_client[settings.mongodb_database]
@@ -45,6 +47,7 @@ async def init_db():
         # Initialize sync client with connection options
         sync_client = MongoClient(
             connection_string,
+            event_listeners=[command_monitor],
             **connection_options
         )
         sync_db = sync_client[settings.mongodb_database]
@@ -95,6 +98,8 @@ async def create_indexes():
         
         # Users collection indexes
         await create_index_if_not_exists(async_db.users, "email", unique=True)
+        # Case-insensitive login lookups; sparse until migrate_user_data backfills existing users
+        await create_index_if_not_exists(async_db.users, "email_lower", unique=True, sparse=True)
         await create_index_if_not_exists(async_db.users, "username", unique=True)
         await create_index_if_not_exists(async_db.users, "created_at")
         
@@ -105,6 +110,10 @@ async def create_indexes():
         await create_index_if_not_exists(async_db.projects, "name")
         await create_index_if_not_exists(async_db.projects, [("user_id", 1), ("created_at", -1)])
         await create_index_if_not_exists(async_db.projects, "is_deleted", sparse=True)
+        # Keyset pagination: one index per $or branch so each walks (updated_at, _id) in order
+        await create_index_if_not_exists(async_db.projects, [("user_id", 1), ("is_deleted", 1), ("updated_at", -1), ("_id", -1)])
+        await create_index_if_not_exists(async_db.projects, [("collaborators", 1), ("is_deleted", 1), ("updated_at", -1), ("_id", -1)])
+        await create_index_if_not_exists(async_db.projects, [("is_deleted", 1), ("updated_at", -1)])
         
         # Timeline states collection indexes
         await create_index_if_not_exists(async_db.timeline_states, "project_id")
@@ -119,6 +128,19 @@ async def create_indexes():
         await create_index_if_not_exists(async_db.transcriptions, [("project_id", 1), ("start_time", 1)])
         await create_index_if_not_exists(async_db.transcriptions, "speaker_id")
         
+        # Transcription segments collection indexes (one document per segment)
+        # Segment ids are unique per generation: a full replace inserts the new set before deleting the old one
+        await drop_index_if_exists(async_db.transcription_segments, "project_id_1_id_1")
+        await drop_index_if_exists(async_db.transcription_segments, "project_id_1_start_time_1")
+        await create_index_if_not_exists(async_db.transcription_segments, [("project_id", 1), ("generation", 1), ("start_time", 1)])
+        await create_index_if_not_exists(async_db.transcription_segments, [("project_id", 1), ("generation", 1), ("id", 1)], unique=True)
+        await create_index_if_not_exists(
+            async_db.transcription_segments,
+            [("text", "text"), ("edited_text", "text")],
+            weights={"edited_text": 2, "text": 1},
+            name="transcript_search"
+        )
+        
         # Clips collection indexes
         await create_index_if_not_exists(async_db.clips, "project_id")
         await create_index_if_not_exists(async_db.clips, "layer_id")
@@ -139,6 +161,18 @@ async def create_indexes():
         await create_index_if_not_exists(async_db.audit_logs, "timestamp")
         await create_index_if_not_exists(async_db.audit_logs, [("project_id", 1), ("timestamp", -1)])
         
+        # Email outbox indexes (worker claims by status and due time)
+        await create_index_if_not_exists(async_db.email_outbox, [("status", 1), ("next_attempt_at", 1)])
+        await create_index_if_not_exists(async_db.email_outbox, [("status", 1), ("lease_until", 1)])
+        await create_index_if_not_exists(async_db.email_outbox, "sent_at", expireAfterSeconds=7 * 24 * 3600)
+        
+        # Media job queue indexes (workers claim by status and due time; finished jobs expire)
+        await create_index_if_not_exists(async_db.jobs, [("status", 1), ("available_at", 1)])
+        await create_index_if_not_exists(async_db.jobs, [("status", 1), ("lease_until", 1)])
+        await create_index_if_not_exists(async_db.jobs, [("user_id", 1), ("created_at", -1)])
+        await create_index_if_not_exists(async_db.jobs, [("status", 1), ("job_class", 1), ("available_at", 1)])
+        await create_index_if_not_exists(async_db.jobs, "finished_at", expireAfterSeconds=7 * 24 * 3600)
+        
         logger.info("✅ Database indexes created successfully")
         
     except Exception as e:
@@ -156,6 +190,17 @@ async def create_index_if_not_exists(collection, index_spec, **kwargs):
         else:
             logger.warning(f"Failed to create index {index_spec}: {e}")
 
+async def drop_index_if_exists(collection, index_name: str):
+    """Drop an index superseded by a newer definition"""
+    try:
+        await collection.drop_index(index_name)
+        logger.info(f"Dropped superseded index {index_name}")
+    except Exception as e:
+        if "not found" in str(e) or "IndexNotFound" in str(e):
+            logger.debug(f"Index already dropped: {index_name}")
+        else:
+            logger.warning(f"Failed to drop index {index_name}: {e}")
+
 async def close_db():
     """Close database connections"""
     global async_client, sync_client
@@ -220,6 +265,12 @@ def get_transcriptions_collection():
         raise RuntimeError("Database not available")
     return async_db.transcriptions
 
+def get_transcription_segments_collection():
+    """Get transcription segments collection"""
+    if async_db is None:
+        raise RuntimeError("Database not available")
+    return async_db.transcription_segments
+
 def get_user_sessions_collection():
     """Get user sessions collection"""
     if async_db is None:
@@ -232,6 +283,18 @@ def get_audit_logs_collection():
         raise RuntimeError("Database not available")
     return async_db.audit_logs
 
+def get_email_outbox_collection():
+    """Get email outbox collection"""
+    if async_db is None:
+        raise RuntimeError("Database not available")
+    return async_db.email_outbox
+
+def get_jobs_collection():
+    """Get media jobs collection"""
+    if async_db is None:
+        raise RuntimeError("Database not available")
+    return async_db.jobs
+
 
 # Database health check functions
 async def get_database_stats() -> Dict[str, Any]:
@@ -245,7 +308,7 @@ async def get_database_stats() -> Dict[str, Any]:
         
         # Get collection counts
         collections_info = {}
-        collections = ["users", "projects", "timeline_states", "transcriptions", "clips", "user_sessions", "audit_logs"]
+        collections = ["users", "projects", "timeline_states", "transcriptions", "transcription_segments", "clips", "user_sessions", "audit_logs"]
         
         for collection_name in collections:
             try:
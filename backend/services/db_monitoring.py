@@ -0,0 +1,262 @@
+"""
+MongoDB command monitoring: latency histograms, per-operation attribution and slow-query log
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from config.settings import settings
+from services.metrics import registry, DEFAULT_LATENCY_BUCKETS
+from utils.error_handlers import current_operation
+from utils.tracing import current_trace, current_span_id, record_span
+
+logger = logging.getLogger(__name__)
+
+# Handshake/auth/session bookkeeping; timing these only adds noise
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "saslStart", "saslContinue", "authenticate", "getnonce",
+    "endSessions", "killCursors", "buildInfo", "buildinfo"
+})
+
+# Where each command keeps its query filter
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "findandmodify": "query"
+}
+
+# Label used for commands issued outside any ErrorContext operation
+NO_OPERATION = "__none__"
+
+mongodb_command_duration_seconds = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ("collection", "command"), buckets=(0.0005,) + DEFAULT_LATENCY_BUCKETS
+)
+mongodb_command_failures_total = registry.counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and command",
+    ("collection", "command")
+)
+mongodb_documents_returned_total = registry.counter(
+    "mongodb_documents_returned_total", "Documents returned or affected by collection and command",
+    ("collection", "command")
+)
+mongodb_operation_commands_total = registry.counter(
+    "mongodb_operation_commands_total", "MongoDB commands issued per service operation",
+    ("operation", "collection", "command")
+)
+mongodb_operation_seconds_total = registry.counter(
+    "mongodb_operation_seconds_total", "Time spent in MongoDB per service operation", ("operation",)
+)
+
+
+def filter_shape(value: Any, depth: int = 0) -> Any:
+    """Query structure with values replaced by placeholders, safe to log and group by"""
+    if depth > 6:
+        return "..."
+    if isinstance(value, dict):
+        return {key: filter_shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        # Keep operator arrays ($and/$or) structured; collapse value lists ($in)
+        if all(isinstance(item, dict) for item in value):
+            return [filter_shape(item, depth + 1) for item in value[:5]]
+        return ["?"]
+    return "?"
+
+
+def _collection_of(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", "$cmd"))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else "$cmd"
+
+
+def _command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    field = FILTER_FIELDS.get(command_name)
+    if field:
+        return command.get(field)
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or []
+        return statements[0].get("q") if statements else None
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        return pipeline[0] if pipeline else None
+    return None
+
+
+def _documents_returned(command_name: str, reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    if command_name in ("findAndModify", "findandmodify"):
+        return 1 if reply.get("value") is not None else 0
+    n = reply.get("n")
+    return int(n) if isinstance(n, (int, float)) else 0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """pymongo CommandListener shared by the async (Motor) and sync clients.
+
+    Callbacks run on the thread that executes the command, so they only do constant-time
+    bookkeeping; filter shapes are only computed for commands over the slow threshold.
+    """
+
+    def __init__(self, slow_query_ms: float = 100.0, max_slow_queries: int = 200, max_pending: int = 10000):
+        self.slow_query_ms = slow_query_ms
+        self.max_pending = max_pending
+        self.slow_queries: deque = deque(maxlen=max_slow_queries)
+        self._pending: "OrderedDict[Tuple[int, Any], Tuple[str, str, Dict[str, Any], Optional[str], Any, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._observers: List[Callable[[str, str, float], None]] = []
+        self.total_commands = 0
+        self.total_failures = 0
+
+    def add_observer(self, observer: Callable[[str, str, float], None]):
+        """Call observer(collection, command, duration_seconds) after every completed command"""
+        self._observers.append(observer)
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = _collection_of(event.command_name, event.command)
+        key = (event.request_id, event.connection_id)
+        with self._lock:
+            self._pending[key] = (
+                collection, event.command_name, event.command, current_operation.get(), current_trace(), current_span_id()
+            )
+            if len(self._pending) > self.max_pending:
+                # Events for a dropped connection never complete; don't let them pile up
+                self._pending.popitem(last=False)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, failed=False, reply=event.reply)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True, reply=None)
+
+    def _finish(self, event, failed: bool, reply: Optional[Dict[str, Any]]):
+        with self._lock:
+            pending = self._pending.pop((event.request_id, event.connection_id), None)
+        if pending is None:
+            return
+        collection, command_name, command, operation, trace, parent_span_id = pending
+        duration = event.duration_micros / 1_000_000
+        operation = operation or NO_OPERATION
+
+        mongodb_command_duration_seconds.labels(collection, command_name).observe(duration)
+        mongodb_operation_commands_total.labels(operation, collection, command_name).inc()
+        mongodb_operation_seconds_total.labels(operation).inc(duration)
+        documents = 0
+        if failed:
+            mongodb_command_failures_total.labels(collection, command_name).inc()
+        elif reply:
+            documents = _documents_returned(command_name, reply)
+            if documents:
+                mongodb_documents_returned_total.labels(collection, command_name).inc(documents)
+        with self._lock:
+            self.total_commands += 1
+            if failed:
+                self.total_failures += 1
+
+        if trace is not None:
+            end_ns = time.time_ns()
+            record_span(
+                trace, parent_span_id, f"mongodb.{command_name}", end_ns - event.duration_micros * 1000, end_ns,
+                error=str(getattr(event, "failure", "")) if failed else None,
+                **{"db.system": "mongodb", "db.collection": collection, "db.operation": command_name,
+                   "db.documents": documents}
+            )
+
+        duration_ms = duration * 1000
+        if duration_ms >= self.slow_query_ms:
+            self._record_slow_query(collection, command_name, command, operation, duration_ms, documents, failed)
+
+        for observer in self._observers:
+            try:
+                observer(collection, command_name, duration)
+            except Exception as e:
+                logger.debug(f"Command observer failed: {e}")
+
+    def _record_slow_query(self, collection: str, command_name: str, command: Dict[str, Any], operation: str,
+                           duration_ms: float, documents: int, failed: bool):
+        shape = filter_shape(_command_filter(command_name, command))
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "collection": collection,
+            "command": command_name,
+            "operation": operation,
+            "duration_ms": round(duration_ms, 2),
+            "documents": documents,
+            "failed": failed,
+            "filter_shape": shape
+        }
+        self.slow_queries.append(entry)
+        logger.warning(
+            f"Slow MongoDB {command_name} on {collection} ({duration_ms:.1f}ms, {documents} docs) "
+            f"from {operation}: filter={shape}"
+        )
+
+    def get_command_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Count, failures, documents and latency percentiles (ms) per collection.command"""
+        failures = {key: child.get() for key, child in mongodb_command_failures_total.series()}
+        documents = {key: child.get() for key, child in mongodb_documents_returned_total.series()}
+        stats = {}
+        for key, child in mongodb_command_duration_seconds.series():
+            _, total, count = child.snapshot()
+            if not count:
+                continue
+            stats[f"{key[0]}.{key[1]}"] = {
+                "count": count,
+                "failures": int(failures.get(key, 0)),
+                "documents": int(documents.get(key, 0)),
+                "total_ms": round(total * 1000, 2),
+                "avg_ms": round(total / count * 1000, 3),
+                "p50_ms": round(child.quantile(0.50) * 1000, 3),
+                "p95_ms": round(child.quantile(0.95) * 1000, 3),
+                "p99_ms": round(child.quantile(0.99) * 1000, 3)
+            }
+        return dict(sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+    def get_operation_stats(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Service operations ranked by total time spent in MongoDB"""
+        commands: Dict[str, Dict[str, int]] = {}
+        for (operation, collection, command_name), child in mongodb_operation_commands_total.series():
+            commands.setdefault(operation, {})[f"{collection}.{command_name}"] = int(child.get())
+        ranked = [
+            {
+                "operation": operation,
+                "total_ms": round(child.get() * 1000, 2),
+                "commands": commands.get(operation, {})
+            }
+            for (operation,), child in mongodb_operation_seconds_total.series()
+        ]
+        ranked.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return ranked[:limit]
+
+    def get_slow_queries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow commands, newest first"""
+        return list(self.slow_queries)[-limit:][::-1]
+
+    def reset(self):
+        """Clear recorded command metrics"""
+        for metric in (mongodb_command_duration_seconds, mongodb_command_failures_total,
+                       mongodb_documents_returned_total, mongodb_operation_commands_total,
+                       mongodb_operation_seconds_total):
+            metric.clear()
+        self.slow_queries.clear()
+        with self._lock:
+            self.total_commands = 0
+            self.total_failures = 0
+
+
+# Global command monitor, registered on both Mongo clients in init_db
+command_monitor = CommandMonitor(slow_query_ms=settings.mongodb_slow_query_ms)
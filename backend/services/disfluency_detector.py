@@ -0,0 +1,234 @@
+"""
+Filler word and disfluency detection over transcript word arrays
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.schemas import TranscriptWord, DisfluencyEvent, DisfluencyReport, DisfluencyType, FillerLexicon
+
+logger = logging.getLogger(__name__)
+
+# Always fillers, wherever they occur
+DEFAULT_FILLERS = [
+    "um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm",
+    "you know", "i mean", "sort of", "kind of",
+    "basically", "actually", "literally"
+]
+
+# Fillers only when set off by a pause or spoken with low confidence ("I like it" vs "it's, like, fine")
+DEFAULT_CONTEXTUAL_FILLERS = [
+    "like", "so", "well", "now", "right", "okay", "ok", "yeah", "yep"
+]
+
+# Words that are legitimately doubled in normal speech ("had had", "that that")
+ALLOWED_REPEATS = {"had", "that"}
+
+_TOKEN_STRIP = re.compile(r"[^\w']+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_token(text: str) -> str:
+    """Lowercase a word and strip surrounding punctuation"""
+    return _TOKEN_STRIP.sub("", text.lower())
+
+
+def default_lexicon() -> FillerLexicon:
+    """Lexicon used when the user has not configured one"""
+    return FillerLexicon(fillers=list(DEFAULT_FILLERS), contextual_fillers=list(DEFAULT_CONTEXTUAL_FILLERS))
+
+
+class DisfluencyDetector:
+    """Detects fillers, repetitions, stutters and long pauses in one pass over a word array"""
+
+    def __init__(self, lexicon: Optional[FillerLexicon] = None):
+        self.lexicon = lexicon or default_lexicon()
+        self._phrases: Dict[Tuple[str, ...], bool] = {}  # phrase -> contextual
+        for phrase in self.lexicon.contextual_fillers:
+            self._add_phrase(phrase, contextual=True)
+        for phrase in self.lexicon.fillers:
+            self._add_phrase(phrase, contextual=False)
+        self._first_tokens = {phrase[0] for phrase in self._phrases}
+        self._lengths = sorted({len(phrase) for phrase in self._phrases}, reverse=True)
+
+    def _add_phrase(self, phrase: str, contextual: bool):
+        tokens = tuple(token for token in (normalize_token(part) for part in phrase.split()) if token)
+        if tokens:
+            self._phrases[tokens] = contextual
+
+    def detect(self, words: List[TranscriptWord]) -> DisfluencyReport:
+        """Run every detector over the words and return flagged copies plus the events found"""
+        n = len(words)
+        if n == 0:
+            return DisfluencyReport(words=[], events=[], counts={})
+
+        tokens = [normalize_token(word.text) for word in words]
+        starts = np.fromiter((word.start for word in words), dtype=np.float64, count=n)
+        ends = np.fromiter((word.end for word in words), dtype=np.float64, count=n)
+        confidence = np.fromiter((word.confidence for word in words), dtype=np.float64, count=n)
+
+        # gaps[i] is the silence between word i and word i + 1; the utterance edges count as no pause,
+        # so a contextual filler there still needs a pause on its other side ("So I think" is not flagged)
+        gaps = np.maximum(starts[1:] - ends[:-1], 0.0)
+        gap_before = np.concatenate(([0.0], gaps))
+        gap_after = np.concatenate((gaps, [0.0]))
+
+        # Events are collected as (start, end, start_index, end_index, type) tuples and built once at the end
+        events: List[Tuple[float, float, int, int, DisfluencyType]] = []
+        # is_filler marks fillers only; repetitions and stutters are reported as their own event types
+        fillers = np.zeros(n, dtype=bool)
+        reported = np.zeros(n, dtype=bool)
+
+        self._detect_fillers(words, tokens, confidence, gap_before, gap_after, fillers, events)
+        reported |= fillers
+        self._detect_repetitions(words, tokens, gaps, reported, events)
+        self._detect_stutters(words, tokens, confidence, gaps, reported, events)
+        self._detect_pauses(starts, ends, gaps, events)
+
+        events.sort()
+        counts: Dict[str, int] = {}
+        for event in events:
+            counts[event[4].value] = counts.get(event[4].value, 0) + 1
+
+        # Values come from already-validated words, so skip re-validation for these internal objects
+        flagged_words = [
+            word if bool(fillers[i]) == bool(word.is_filler)
+            else word.model_copy(update={"is_filler": bool(fillers[i])})
+            for i, word in enumerate(words)
+        ]
+        return DisfluencyReport.model_construct(
+            words=flagged_words,
+            events=[self._build_event(event, words) for event in events],
+            counts=counts
+        )
+
+    def _detect_fillers(self, words, tokens, confidence, gap_before, gap_after, fillers, events):
+        """Longest-match n-gram lookup of lexicon phrases over token windows"""
+        context_gap = self.lexicon.context_pause
+        min_confidence = self.lexicon.min_confidence
+        n = len(tokens)
+        i = 0
+        while i < n:
+            if tokens[i] not in self._first_tokens:
+                i += 1
+                continue
+
+            matched = 0
+            for length in self._lengths:
+                if i + length > n:
+                    continue
+                contextual = self._phrases.get(tuple(tokens[i:i + length]))
+                if contextual is None:
+                    continue
+                last = i + length - 1
+                if contextual and not (
+                    gap_before[i] >= context_gap
+                    or gap_after[last] >= context_gap
+                    or confidence[i:last + 1].min() < min_confidence
+                ):
+                    continue
+                matched = length
+                break
+
+            if not matched:
+                i += 1
+                continue
+
+            fillers[i:i + matched] = True
+            events.append(self._span(DisfluencyType.FILLER, words, i, i + matched))
+            i += matched
+
+    def _detect_repetitions(self, words, tokens, gaps, reported, events):
+        """Immediate word and two-word repeats ("the the", "I was I was"); the event covers the earlier copy"""
+        n = len(tokens)
+        if n < 2:
+            return
+
+        # Dictionary-encode tokens; empty tokens get unique negative ids so they never match
+        vocabulary: Dict[str, int] = {}
+        ids = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) if token else -1 - i for i, token in enumerate(tokens)),
+            dtype=np.int64, count=n
+        )
+        max_gap = self.lexicon.repeat_gap
+
+        unigram = (ids[1:] == ids[:-1]) & (gaps <= max_gap)
+        for i in np.flatnonzero(unigram):
+            if tokens[i] in ALLOWED_REPEATS:
+                continue
+            reported[i] = True
+            events.append(self._span(DisfluencyType.REPETITION, words, int(i), int(i) + 1))
+
+        if n >= 4:
+            bigram = (ids[:-3] == ids[2:-1]) & (ids[1:-2] == ids[3:]) & (ids[:-3] != ids[1:-2]) & (gaps[1:-1] <= max_gap)
+            for i in np.flatnonzero(bigram):
+                reported[i:i + 2] = True
+                events.append(self._span(DisfluencyType.REPETITION, words, int(i), int(i) + 2))
+
+    def _detect_stutters(self, words, tokens, confidence, gaps, reported, events):
+        """Cut-off fragments ("w-", "th-") or short low-confidence prefixes of the next word"""
+        n = len(tokens)
+        max_gap = self.lexicon.repeat_gap
+        # Only hyphen-terminated or low-confidence words can be fragments
+        candidates = np.flatnonzero(confidence < self.lexicon.min_confidence).tolist()
+        candidates.extend(i for i, word in enumerate(words) if word.text.rstrip().endswith(("-", "—")))
+        for i in sorted(set(candidates)):
+            raw = words[i].text.strip()
+            fragment = raw.endswith(("-", "—")) and len(tokens[i]) <= 4
+            if not fragment and i + 1 < n:
+                token, following = tokens[i], tokens[i + 1]
+                fragment = (
+                    0 < len(token) <= 3
+                    and len(token) < len(following)
+                    and following.startswith(token)
+                    and confidence[i] < self.lexicon.min_confidence
+                    and gaps[i] <= max_gap
+                )
+            if fragment and not reported[i]:
+                reported[i] = True
+                events.append(self._span(DisfluencyType.STUTTER, words, i, i + 1))
+
+    def _detect_pauses(self, starts, ends, gaps, events):
+        """Silences between words longer than the pause threshold"""
+        pause_index = np.flatnonzero(gaps >= self.lexicon.pause_threshold)
+        events.extend(zip(
+            ends[pause_index].tolist(),
+            starts[pause_index + 1].tolist(),
+            (pause_index + 1).tolist(),
+            (pause_index + 1).tolist(),
+            [DisfluencyType.PAUSE] * len(pause_index)
+        ))
+
+    def _span(self, event_type: DisfluencyType, words: List[TranscriptWord], start_index: int, end_index: int):
+        return words[start_index].start, words[end_index - 1].end, start_index, end_index, event_type
+
+    def _build_event(self, event, words: List[TranscriptWord]) -> DisfluencyEvent:
+        start, end, start_index, end_index, event_type = event
+        return DisfluencyEvent.model_construct(
+            type=event_type.value,
+            start=start,
+            end=end,
+            start_index=start_index,
+            end_index=end_index,
+            text=" ".join(word.text.strip() for word in words[start_index:end_index])
+        )
+
+
+def lexicon_from_preferences(preferences: Optional[Dict]) -> FillerLexicon:
+    """Build a lexicon from a user's stored preferences, falling back to the defaults"""
+    stored = (preferences or {}).get("filler_lexicon")
+    if not stored:
+        return default_lexicon()
+    try:
+        return FillerLexicon(**stored)
+    except Exception as e:
+        logger.warning(f"Ignoring invalid filler lexicon in user preferences: {e}")
+        return default_lexicon()
+
+
+def detect_disfluencies(words: Iterable[TranscriptWord], lexicon: Optional[FillerLexicon] = None) -> DisfluencyReport:
+    """Convenience wrapper for a one-off detection run"""
+    return DisfluencyDetector(lexicon).detect(list(words))
@@ -0,0 +1,319 @@
+"""
+Persistent email outbox delivered by a background worker over pooled SMTP connections
+"""
+import asyncio
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from services.database import get_email_outbox_collection
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxStatus:
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class SMTPConnectionPool:
+    """Reuses authenticated SMTP connections instead of connect + STARTTLS + login per email.
+
+    Connections are blocking smtplib objects, so they are only used from the outbox's delivery threads;
+    each thread checks one out, sends, and returns it.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str], password: Optional[str],
+                 use_tls: bool = True, max_size: int = 2, idle_timeout: float = 60.0,
+                 max_messages_per_connection: int = 100, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self._idle: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            # Create SSL context with relaxed certificate verification for development
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            server.starttls(context=context)
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self) -> Dict[str, Any]:
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return {"server": self._connect(), "sent": 0, "last_used": time.monotonic()}
+            idle_for = time.monotonic() - entry["last_used"]
+            if idle_for > self.idle_timeout:
+                # Servers drop idle sessions; don't find out mid-send
+                self._close(entry["server"])
+                continue
+            if idle_for > 5.0:
+                try:
+                    if entry["server"].noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except Exception:
+                    self._close(entry["server"])
+                    continue
+            return entry
+
+    def _release(self, entry: Dict[str, Any], healthy: bool):
+        entry["last_used"] = time.monotonic()
+        if not healthy or entry["sent"] >= self.max_messages_per_connection:
+            self._close(entry["server"])
+            return
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(entry)
+                return
+        self._close(entry["server"])
+
+    def send(self, sender: str, recipient: str, message: str):
+        """Send one message on a pooled connection; raises on failure"""
+        entry = self._acquire()
+        try:
+            entry["server"].sendmail(sender, recipient, message)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The session is still usable; only this message was rejected
+            self._release(entry, healthy=True)
+            raise
+        except Exception:
+            self._release(entry, healthy=False)
+            raise
+        entry["sent"] += 1
+        with self._lock:
+            self.messages_sent += 1
+        self._release(entry, healthy=True)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close(entry["server"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse counters"""
+        with self._lock:
+            return {
+                "idle_connections": len(self._idle),
+                "connections_opened": self.connections_opened,
+                "messages_sent": self.messages_sent
+            }
+
+
+def build_message(sender: str, recipient: str, subject: str, html_content: str,
+                  text_content: Optional[str] = None) -> str:
+    """MIME multipart/alternative message"""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = recipient
+    if text_content:
+        message.attach(MIMEText(text_content, "plain"))
+    message.attach(MIMEText(html_content, "html"))
+    return message.as_string()
+
+
+class EmailOutbox:
+    """Emails are persisted in the email_outbox collection and delivered in the background.
+
+    Requests only pay for one insert. Workers claim messages with a lease (so a crashed worker's
+    messages are picked up again), send them over the SMTP pool in a thread, and reschedule failures
+    with exponential backoff until max_attempts.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, sender: str, workers: int = 2, max_attempts: int = 5,
+                 base_backoff_seconds: float = 30.0, max_backoff_seconds: float = 3600.0,
+                 lease_seconds: float = 120.0, poll_interval: float = 5.0):
+        self.pool = pool
+        self.sender = sender
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.enqueued = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def enqueue(self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None,
+                      template: Optional[str] = None) -> str:
+        """Persist an email for delivery; returns the outbox id"""
+        collection = get_email_outbox_collection()
+        now = datetime.utcnow()
+        result = await collection.insert_one({
+            "to": to_email,
+            "subject": subject,
+            "html": html_content,
+            "text": text_content,
+            "template": template,
+            "status": OutboxStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "lease_until": None,
+            "last_error": None,
+            "created_at": now,
+            "sent_at": None
+        })
+        self.enqueued += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return str(result.inserted_id)
+
+    def start(self):
+        """Start delivery workers on the running event loop"""
+        if self.running:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="smtp")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Email outbox started with {self.workers} workers")
+
+    async def stop(self):
+        """Stop workers; claimed messages are released by lease expiry if a send was interrupted"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the next due message (or one whose lease expired)"""
+        collection = get_email_outbox_collection()
+        now = datetime.utcnow()
+        return await collection.find_one_and_update(
+            {"$or": [
+                {"status": OutboxStatus.PENDING, "next_attempt_at": {"$lte": now}},
+                {"status": OutboxStatus.SENDING, "lease_until": {"$lt": now}}
+            ]},
+            {
+                "$set": {"status": OutboxStatus.SENDING, "lease_until": now + timedelta(seconds=self.lease_seconds)},
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Delay before the next attempt after `attempts` failures"""
+        return min(self.base_backoff_seconds * (2 ** max(attempts - 1, 0)), self.max_backoff_seconds)
+
+    async def _deliver(self, message_doc: Dict[str, Any]):
+        collection = get_email_outbox_collection()
+        message = build_message(
+            self.sender, message_doc["to"], message_doc["subject"], message_doc["html"], message_doc.get("text")
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self.pool.send, self.sender, message_doc["to"], message)
+        except Exception as e:
+            attempts = message_doc.get("attempts", 1)
+            permanent = isinstance(e, smtplib.SMTPRecipientsRefused) or attempts >= self.max_attempts
+            update = {"lease_until": None, "last_error": str(e)}
+            if permanent:
+                update["status"] = OutboxStatus.FAILED
+                self.failed += 1
+                logger.error(f"Giving up on email to {message_doc['to']} after {attempts} attempts: {e}")
+            else:
+                update["status"] = OutboxStatus.PENDING
+                update["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=self.backoff_seconds(attempts))
+                self.retried += 1
+                logger.warning(f"Email to {message_doc['to']} failed (attempt {attempts}), will retry: {e}")
+            await collection.update_one({"_id": message_doc["_id"]}, {"$set": update})
+            return
+
+        await collection.update_one(
+            {"_id": message_doc["_id"]},
+            {"$set": {"status": OutboxStatus.SENT, "sent_at": datetime.utcnow(), "lease_until": None, "last_error": None}}
+        )
+        self.delivered += 1
+        logger.info(f"Email sent successfully to {message_doc['to']}")
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                message_doc = await self._claim()
+                if message_doc is not None:
+                    await self._deliver(message_doc)
+                    continue
+                # Nothing due: sleep until an enqueue or the next poll (for retries coming due)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox worker {index} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queue counts by status plus worker and connection counters"""
+        stats = {
+            "running": self.running,
+            "workers": self.workers,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp": self.pool.get_stats()
+        }
+        try:
+            collection = get_email_outbox_collection()
+            counts = await collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(length=None)
+            stats["queue"] = {entry["_id"]: entry["count"] for entry in counts}
+        except Exception as e:
+            logger.warning(f"Failed to count outbox messages: {e}")
+        return stats
@@ -1,18 +1,19 @@
 """
 Email Service for Verification and Notifications
 """
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from typing import Optional, Dict, Any
 import logging
 import os
 from datetime import datetime, timedelta
 
 from services.database import get_users_collection
+from services.auth_cache import write_user
 from models.user_schemas import UserDocument
 from utils.password_utils import password_utils
+from services.password_hasher import password_hasher
+from services.email_outbox import EmailOutbox, SMTPConnectionPool
+from services.email_templates import EmailTemplateCache
+from utils.email_utils import email_query
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +23,30 @@ class EmailService:
     def __init__(self):
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        self.smtp_use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
         self.sender_email = os.getenv("SENDER_EMAIL")
         self.sender_password = os.getenv("SENDER_PASSWORD")
         self.app_name = os.getenv("APP_NAME", "Snipix")
         self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
         
+        # Delivery happens in the background: requests only enqueue into the outbox
+        outbox_workers = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+        self.smtp_pool = SMTPConnectionPool(
+            self.smtp_server,
+            self.smtp_port,
+            self.sender_email,
+            self.sender_password,
+            use_tls=self.smtp_use_tls,
+            max_size=outbox_workers
+        )
+        self.outbox = EmailOutbox(
+            self.smtp_pool,
+            self.sender_email,
+            workers=outbox_workers,
+            max_attempts=int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+        )
+        self.templates = EmailTemplateCache(self.app_name, self.frontend_url)
+        
         if not self.sender_email or not self.sender_password:
             logger.warning("Email service not configured. Set SENDER_EMAIL and SENDER_PASSWORD")
     
@@ -35,63 +55,38 @@ class EmailService:
         """Check if email service is properly configured"""
         return bool(self.sender_email and self.sender_password)
     
-    def _create_connection(self) -> Optional[smtplib.SMTP]:
-        """Create SMTP connection"""
-        if not self.is_configured:
-            logger.error("Email service not configured")
-            return None
-        
-        try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            
-            # Create SSL context with relaxed certificate verification for development
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            server.starttls(context=context)
-            server.login(self.sender_email, self.sender_password)
-            return server
-        except Exception as e:
-            logger.error(f"Failed to create SMTP connection: {e}")
-            return None
+    def start_outbox(self):
+        """Start background delivery (call from the running event loop)"""
+        if self.is_configured:
+            self.outbox.start()
+    
+    async def stop_outbox(self):
+        """Stop background delivery"""
+        await self.outbox.stop()
     
-    def _send_email(self, to_email: str, subject: str, html_content: str, text_content: str = None) -> bool:
-        """Send email"""
+    async def _send_email(self, to_email: str, subject: str, html_content: str, text_content: str = None,
+                          template: Optional[str] = None) -> bool:
+        """Queue email for background delivery"""
         if not self.is_configured:
             logger.error("Email service not configured")
             return False
         
         try:
-            server = self._create_connection()
-            if not server:
-                return False
-            
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.sender_email
-            message["To"] = to_email
-            
-            # Add text and HTML parts
-            if text_content:
-                text_part = MIMEText(text_content, "plain")
-                message.attach(text_part)
-            
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
-            # Send email
-            server.sendmail(self.sender_email, to_email, message.as_string())
-            server.quit()
-            
-            logger.info(f"Email sent successfully to {to_email}")
+            await self.outbox.enqueue(to_email, subject, html_content, text_content, template=template)
+            logger.info(f"Email queued for {to_email}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {e}")
+            logger.error(f"Failed to queue email to {to_email}: {e}")
             return False
     
+    async def _send_template(self, template: str, to_email: str, **values: str) -> bool:
+        """Render a cached template and queue it"""
+        rendered = self.templates.render(template, **values)
+        return await self._send_email(
+            to_email, rendered.subject, rendered.html_content, rendered.text_content, template=template
+        )
+    
     async def send_verification_email(self, user: UserDocument) -> bool:
         """Send email verification email"""
         if not user.email_verification_token:
@@ -99,69 +94,7 @@ class EmailService:
             return False
         
         verification_url = f"{self.frontend_url}/verify-email?token={user.email_verification_token}"
-        
-        subject = f"Verify your {self.app_name} account"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Verify Your Account</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #3b82f6; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; background: #3b82f6; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome to {self.app_name}!</h1>
-                </div>
-                <div class="content">
-                    <h2>Verify Your Email Address</h2>
-                    <p>Hi {user.name},</p>
-                    <p>Thank you for signing up for {self.app_name}! To complete your registration and start using your account, please verify your email address by clicking the button below:</p>
-                    
-                    <a href="{verification_url}" class="button">Verify Email Address</a>
-                    
-                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                    <p><a href="{verification_url}">{verification_url}</a></p>
-                    
-                    <p>This verification link will expire in 24 hours.</p>
-                    
-                    <p>If you didn't create an account with {self.app_name}, please ignore this email.</p>
-                </div>
-                <div class="footer">
-                    <p>This email was sent by {self.app_name}. If you have any questions, please contact our support team.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Welcome to {self.app_name}!
-        
-        Hi {user.name},
-        
-        Thank you for signing up for {self.app_name}! To complete your registration and start using your account, please verify your email address by visiting this link:
-        
-        {verification_url}
-        
-        This verification link will expire in 24 hours.
-        
-        If you didn't create an account with {self.app_name}, please ignore this email.
-        
-        Best regards,
-        The {self.app_name} Team
-        """
-        
-        return self._send_email(user.email, subject, html_content, text_content)
+        return await self._send_template("verification", user.email, name=user.name, url=verification_url)
     
     async def send_password_reset_email(self, user: UserDocument) -> bool:
         """Send password reset email"""
@@ -170,141 +103,11 @@ class EmailService:
             return False
         
         reset_url = f"{self.frontend_url}/reset-password?token={user.password_reset_token}"
-        
-        subject = f"Reset your {self.app_name} password"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Reset Your Password</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #ef4444; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; background: #ef4444; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Password Reset Request</h1>
-                </div>
-                <div class="content">
-                    <h2>Reset Your Password</h2>
-                    <p>Hi {user.name},</p>
-                    <p>We received a request to reset your password for your {self.app_name} account. If you made this request, click the button below to reset your password:</p>
-                    
-                    <a href="{reset_url}" class="button">Reset Password</a>
-                    
-                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                    <p><a href="{reset_url}">{reset_url}</a></p>
-                    
-                    <p>This password reset link will expire in 1 hour.</p>
-                    
-                    <p><strong>If you didn't request a password reset, please ignore this email. Your password will remain unchanged.</strong></p>
-                </div>
-                <div class="footer">
-                    <p>This email was sent by {self.app_name}. If you have any questions, please contact our support team.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Password Reset Request
-        
-        Hi {user.name},
-        
-        We received a request to reset your password for your {self.app_name} account. If you made this request, visit this link to reset your password:
-        
-        {reset_url}
-        
-        This password reset link will expire in 1 hour.
-        
-        If you didn't request a password reset, please ignore this email. Your password will remain unchanged.
-        
-        Best regards,
-        The {self.app_name} Team
-        """
-        
-        return self._send_email(user.email, subject, html_content, text_content)
+        return await self._send_template("password_reset", user.email, name=user.name, url=reset_url)
     
     async def send_welcome_email(self, user: UserDocument) -> bool:
         """Send welcome email to new users"""
-        subject = f"Welcome to {self.app_name}!"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Welcome to {self.app_name}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #10b981; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; background: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome to {self.app_name}!</h1>
-                </div>
-                <div class="content">
-                    <h2>Your Account is Ready</h2>
-                    <p>Hi {user.name},</p>
-                    <p>Welcome to {self.app_name}! Your account has been successfully created and verified. You can now start using all the features of our platform.</p>
-                    
-                    <a href="{self.frontend_url}/dashboard" class="button">Go to Dashboard</a>
-                    
-                    <h3>What's Next?</h3>
-                    <ul>
-                        <li>Complete your profile setup</li>
-                        <li>Upload your first video</li>
-                        <li>Explore our editing features</li>
-                        <li>Connect with our community</li>
-                    </ul>
-                    
-                    <p>If you have any questions or need help getting started, don't hesitate to reach out to our support team.</p>
-                </div>
-                <div class="footer">
-                    <p>This email was sent by {self.app_name}. If you have any questions, please contact our support team.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Welcome to {self.app_name}!
-        
-        Hi {user.name},
-        
-        Welcome to {self.app_name}! Your account has been successfully created and verified. You can now start using all the features of our platform.
-        
-        Visit your dashboard: {self.frontend_url}/dashboard
-        
-        What's Next?
-        - Complete your profile setup
-        - Upload your first video
-        - Explore our editing features
-        - Connect with our community
-        
-        If you have any questions or need help getting started, don't hesitate to reach out to our support team.
-        
-        Best regards,
-        The {self.app_name} Team
-        """
-        
-        return self._send_email(user.email, subject, html_content, text_content)
+        return await self._send_template("welcome", user.email, name=user.name)
     
     async def verify_email_token(self, token: str) -> Optional[UserDocument]:
         """Verify email verification token"""
@@ -322,7 +125,7 @@ class EmailService:
                 return None
             
             # Update user as verified
-            await users_collection.update_one(
+            await write_user(user_doc["_id"], users_collection.update_one(
                 {"_id": user_doc["_id"]},
                 {
                     "$set": {
@@ -331,7 +134,7 @@ class EmailService:
                         "updated_at": datetime.utcnow()
                     }
                 }
-            )
+            ))
             
             # Return updated user
             user_doc["_id"] = str(user_doc["_id"])
@@ -350,8 +153,8 @@ class EmailService:
         try:
             users_collection = get_users_collection()
             
-            # Find user by email
-            user_doc = await users_collection.find_one({"email": email})
+            # Find user by email (case-insensitive)
+            user_doc = await users_collection.find_one(email_query(email))
             if not user_doc:
                 logger.warning(f"User not found for password reset: {email}")
                 return None
@@ -361,7 +164,7 @@ class EmailService:
             expires_at = datetime.utcnow() + timedelta(hours=1)
             
             # Update user with reset token
-            await users_collection.update_one(
+            await write_user(user_doc["_id"], users_collection.update_one(
                 {"_id": user_doc["_id"]},
                 {
                     "$set": {
@@ -370,7 +173,7 @@ class EmailService:
                         "updated_at": datetime.utcnow()
                     }
                 }
-            )
+            ))
             
             logger.info(f"Password reset token generated for user: {email}")
             return reset_token
@@ -401,10 +204,10 @@ class EmailService:
                 return None
             
             # Hash new password
-            password_hash = password_utils.hash_password(new_password)
+            password_hash = await password_hasher.hash_password(new_password)
             
             # Update user password and clear reset token
-            await users_collection.update_one(
+            await write_user(user_doc["_id"], users_collection.update_one(
                 {"_id": user_doc["_id"]},
                 {
                     "$set": {
@@ -414,7 +217,7 @@ class EmailService:
                         "updated_at": datetime.utcnow()
                     }
                 }
-            )
+            ))
             
             # Return updated user
             user_doc["_id"] = str(user_doc["_id"])
@@ -0,0 +1,214 @@
+"""
+Email templates, pre-rendered once per process
+"""
+import html
+import logging
+import threading
+from string import Template
+from typing import Dict, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+_STYLE = """
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                .header {{ background: {color}; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
+                .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
+                .button {{ display: inline-block; background: {color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
+                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}"""
+
+_LAYOUT = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <title>$title</title>
+            <style>{style}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>$heading</h1>
+                </div>
+                <div class="content">{content}
+                </div>
+                <div class="footer">
+                    <p>This email was sent by $app_name. If you have any questions, please contact our support team.</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+
+def _html(color: str, content: str) -> str:
+    return _LAYOUT.format(style=_STYLE.format(color=color), content=content)
+
+
+# Placeholders: $app_name and $frontend_url are filled once per process; $name and $url per message
+TEMPLATES = {
+    "verification": {
+        "subject": "Verify your $app_name account",
+        "title": "Verify Your Account",
+        "heading": "Welcome to $app_name!",
+        "html": _html("#3b82f6", """
+                    <h2>Verify Your Email Address</h2>
+                    <p>Hi $name,</p>
+                    <p>Thank you for signing up for $app_name! To complete your registration and start using your account, please verify your email address by clicking the button below:</p>
+
+                    <a href="$url" class="button">Verify Email Address</a>
+
+                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+                    <p><a href="$url">$url</a></p>
+
+                    <p>This verification link will expire in 24 hours.</p>
+
+                    <p>If you didn't create an account with $app_name, please ignore this email.</p>"""),
+        "text": """
+        Welcome to $app_name!
+
+        Hi $name,
+
+        Thank you for signing up for $app_name! To complete your registration and start using your account, please verify your email address by visiting this link:
+
+        $url
+
+        This verification link will expire in 24 hours.
+
+        If you didn't create an account with $app_name, please ignore this email.
+
+        Best regards,
+        The $app_name Team
+        """
+    },
+    "password_reset": {
+        "subject": "Reset your $app_name password",
+        "title": "Reset Your Password",
+        "heading": "Password Reset Request",
+        "html": _html("#ef4444", """
+                    <h2>Reset Your Password</h2>
+                    <p>Hi $name,</p>
+                    <p>We received a request to reset your password for your $app_name account. If you made this request, click the button below to reset your password:</p>
+
+                    <a href="$url" class="button">Reset Password</a>
+
+                    <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+                    <p><a href="$url">$url</a></p>
+
+                    <p>This password reset link will expire in 1 hour.</p>
+
+                    <p><strong>If you didn't request a password reset, please ignore this email. Your password will remain unchanged.</strong></p>"""),
+        "text": """
+        Password Reset Request
+
+        Hi $name,
+
+        We received a request to reset your password for your $app_name account. If you made this request, visit this link to reset your password:
+
+        $url
+
+        This password reset link will expire in 1 hour.
+
+        If you didn't request a password reset, please ignore this email. Your password will remain unchanged.
+
+        Best regards,
+        The $app_name Team
+        """
+    },
+    "welcome": {
+        "subject": "Welcome to $app_name!",
+        "title": "Welcome to $app_name",
+        "heading": "Welcome to $app_name!",
+        "html": _html("#10b981", """
+                    <h2>Your Account is Ready</h2>
+                    <p>Hi $name,</p>
+                    <p>Welcome to $app_name! Your account has been successfully created and verified. You can now start using all the features of our platform.</p>
+
+                    <a href="$frontend_url/dashboard" class="button">Go to Dashboard</a>
+
+                    <h3>What's Next?</h3>
+                    <ul>
+                        <li>Complete your profile setup</li>
+                        <li>Upload your first video</li>
+                        <li>Explore our editing features</li>
+                        <li>Connect with our community</li>
+                    </ul>
+
+                    <p>If you have any questions or need help getting started, don't hesitate to reach out to our support team.</p>"""),
+        "text": """
+        Welcome to $app_name!
+
+        Hi $name,
+
+        Welcome to $app_name! Your account has been successfully created and verified. You can now start using all the features of our platform.
+
+        Visit your dashboard: $frontend_url/dashboard
+
+        What's Next?
+        - Complete your profile setup
+        - Upload your first video
+        - Explore our editing features
+        - Connect with our community
+
+        If you have any questions or need help getting started, don't hesitate to reach out to our support team.
+
+        Best regards,
+        The $app_name Team
+        """
+    }
+}
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html_content: str
+    text_content: str
+
+
+class EmailTemplateCache:
+    """Templates with the per-process values (app name, frontend URL) already substituted.
+
+    Rendering a message is then a single substitution of the per-recipient values.
+    """
+
+    def __init__(self, app_name: str, frontend_url: str):
+        self.app_name = app_name
+        self.frontend_url = frontend_url
+        self._compiled: Dict[str, Dict[str, Template]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, template_name: str) -> Dict[str, Template]:
+        compiled = self._compiled.get(template_name)
+        if compiled is None:
+            source = TEMPLATES[template_name]
+            constants = {"app_name": self.app_name, "frontend_url": self.frontend_url}
+            html_constants = {key: html.escape(value) for key, value in constants.items()}
+            html_source = Template(source["html"]).safe_substitute(
+                html_constants,
+                title=Template(source["title"]).safe_substitute(html_constants),
+                heading=Template(source["heading"]).safe_substitute(html_constants)
+            )
+            compiled = {
+                "subject": Template(Template(source["subject"]).safe_substitute(constants)),
+                "html": Template(html_source),
+                "text": Template(Template(source["text"]).safe_substitute(constants))
+            }
+            with self._lock:
+                self._compiled[template_name] = compiled
+        return compiled
+
+    def render(self, template_name: str, **values: str) -> RenderedEmail:
+        """Fill in per-recipient values; HTML values are escaped"""
+        compiled = self._get(template_name)
+        html_values = {key: html.escape(str(value)) for key, value in values.items()}
+        return RenderedEmail(
+            subject=compiled["subject"].safe_substitute(values),
+            html_content=compiled["html"].safe_substitute(html_values),
+            text_content=compiled["text"].safe_substitute(values)
+        )
+
+    def clear(self):
+        """Drop compiled templates"""
+        with self._lock:
+            self._compiled.clear()
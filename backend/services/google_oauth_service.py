@@ -8,8 +8,10 @@ from datetime import datetime
 
 from config.oauth_config import google_oauth_config
 from services.database import get_users_collection
+from services.auth_cache import write_user
 from models.user_schemas import UserDocument, UserRole, UserStatus, AuthProvider
 from utils.password_utils import password_utils
+from utils.email_utils import normalize_email, email_query
 
 logger = logging.getLogger(__name__)
 
@@ -82,14 +84,14 @@ class GoogleOAuthService:
                 mock_email = "mockuser@gmail.com"
                 
                 # Check if mock user exists
-                existing_user = await users_collection.find_one({"email": mock_email})
+                existing_user = await users_collection.find_one(email_query(mock_email))
                 
                 if existing_user:
                     # Update last login
-                    await users_collection.update_one(
+                    await write_user(existing_user["_id"], users_collection.update_one(
                         {"_id": existing_user["_id"]},
                         {"$set": {"last_login": datetime.utcnow()}}
-                    )
+                    ))
                     existing_user["_id"] = str(existing_user["_id"])
                     existing_user["id"] = str(existing_user["_id"])
                     return UserDocument(**existing_user)
@@ -97,6 +99,7 @@ class GoogleOAuthService:
                     # Create new mock user
                     user_data = {
                         "email": mock_email,
+                        "email_lower": normalize_email(mock_email),
                         "name": "Mock Google User",
                         "username": "mockuser",
                         "avatar_url": None,
@@ -148,18 +151,19 @@ class GoogleOAuthService:
             existing_user = await users_collection.find_one({
                 "$or": [
                     {"google_id": google_id},
-                    {"email": email}
+                    *email_query(email)["$or"]
                 ]
             })
             
             if existing_user:
                 # Update existing user
-                existing_user["_id"] = str(existing_user["_id"])
+                user_object_id = existing_user["_id"]
+                existing_user["_id"] = str(user_object_id)
                 
                 # Update Google ID if not set
                 if not existing_user.get("google_id"):
-                    await users_collection.update_one(
-                        {"_id": existing_user["_id"]},
+                    await write_user(user_object_id, users_collection.update_one(
+                        {"_id": user_object_id},
                         {"$set": {
                             "google_id": google_id,
                             "auth_provider": AuthProvider.GOOGLE.value,
@@ -168,7 +172,7 @@ class GoogleOAuthService:
                             "login_count": existing_user.get("login_count", 0) + 1,
                             "updated_at": datetime.utcnow()
                         }}
-                    )
+                    ))
                     existing_user["google_id"] = google_id
                     existing_user["auth_provider"] = AuthProvider.GOOGLE.value
                     existing_user["avatar_url"] = avatar_url
@@ -179,6 +183,7 @@ class GoogleOAuthService:
                 new_user_data = {
                     "google_id": google_id,
                     "email": email,
+                    "email_lower": normalize_email(email),
                     "name": name,
                     "avatar_url": avatar_url,
                     "auth_provider": AuthProvider.GOOGLE.value,
@@ -0,0 +1,357 @@
+"""
+Mongo-backed media job queue shared by API workers (which enqueue and poll) and media workers (which claim and run)
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+from config.settings import settings
+from models.schemas import MediaJob, MediaJobStatus, TranscriptWord
+from services.database import get_jobs_collection
+from services.media_scheduler import default_class_caps
+
+logger = logging.getLogger(__name__)
+
+# Results stored as plain documents are turned back into these models for the caller
+RESULT_MODELS = {"transcribe_audio": TranscriptWord, "transcribe_video": TranscriptWord}
+
+
+class JobFailedError(Exception):
+    """Raised to the waiting caller when a job ends in the failed state"""
+    pass
+
+
+class JobTimeoutError(Exception):
+    """Raised when a job does not finish within the wait timeout"""
+    pass
+
+
+def encode_result(value: Any) -> Any:
+    """Make MediaService arguments and return values storable in Mongo"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (list, tuple)):
+        return [encode_result(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode_result(item) for key, item in value.items()}
+    return value
+
+
+def decode_result(operation: str, value: Any) -> Any:
+    model = RESULT_MODELS.get(operation)
+    if model is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [model(**item) for item in value]
+    return model(**value)
+
+
+def _object_id(job_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+class JobQueue:
+    """Jobs live in the `jobs` collection; any number of workers on any host can take them.
+
+    A worker claims a job with one find_one_and_update that sets a lease. While the job runs the
+    worker keeps extending the lease (heartbeat); if the worker dies the lease lapses and the job
+    becomes claimable again (visibility timeout) until it has used max_attempts, after which
+    reap_expired fails it, so a job that keeps killing its worker is not retried forever. Result
+    writes are conditional on the worker still holding the job, so a worker that lost its lease
+    cannot overwrite a newer attempt.
+    """
+
+    def __init__(self, lease_seconds: float = 60.0, max_attempts: int = 3, base_backoff_seconds: float = 10.0,
+                 max_backoff_seconds: float = 600.0):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def enqueue(self, operation: str, args: List[Any], kwargs: Optional[Dict[str, Any]] = None,
+                      user_id: Optional[str] = None, project_id: Optional[str] = None,
+                      job_class: str = "proxy", cost: float = 1.0) -> str:
+        """Persist a job for the media workers; returns the job id"""
+        collection = get_jobs_collection()
+        now = datetime.utcnow()
+        result = await collection.insert_one({
+            "operation": operation,
+            "args": encode_result(list(args)),
+            "kwargs": encode_result(kwargs or {}),
+            "user_id": user_id,
+            "project_id": project_id,
+            "job_class": job_class,
+            "cost": cost,
+            "status": MediaJobStatus.QUEUED.value,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "available_at": now,
+            "lease_until": None,
+            "worker_id": None,
+            "heartbeat_at": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None
+        })
+        return str(result.inserted_id)
+
+    @staticmethod
+    def _claimable(now: datetime) -> Dict[str, Any]:
+        return {"$or": [
+            {"status": MediaJobStatus.QUEUED.value, "available_at": {"$lte": now}},
+            {
+                "status": MediaJobStatus.RUNNING.value,
+                "lease_until": {"$lt": now},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            }
+        ]}
+
+    async def reap_expired(self) -> int:
+        """Fail jobs whose lease lapsed on their last allowed attempt; returns how many"""
+        collection = get_jobs_collection()
+        now = datetime.utcnow()
+        result = await collection.update_many(
+            {
+                "status": MediaJobStatus.RUNNING.value,
+                "lease_until": {"$lt": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {"$set": {
+                "status": MediaJobStatus.FAILED.value,
+                "error": "Media worker stopped responding on the last attempt",
+                "lease_until": None,
+                "finished_at": now
+            }}
+        )
+        if result.modified_count:
+            logger.error(f"Failed {result.modified_count} media jobs whose workers died on their last attempt")
+        return result.modified_count
+
+    async def candidates(self, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Oldest claimable job per (job_class, user_id): the heads the fair-share scheduler chooses between"""
+        collection = get_jobs_collection()
+        return await collection.aggregate([
+            {"$match": self._claimable(datetime.utcnow())},
+            {"$sort": {"available_at": 1}},
+            {"$group": {
+                "_id": {"job_class": "$job_class", "user_id": "$user_id"},
+                "job_id": {"$first": "$_id"},
+                "cost": {"$first": "$cost"}
+            }},
+            {"$limit": limit}
+        ]).to_list(length=None)
+
+    async def claim(self, worker_id: str, job_id: Optional[ObjectId] = None) -> Optional[Dict[str, Any]]:
+        """Atomically take a specific job, or else the oldest due one (or one whose worker stopped heartbeating)"""
+        collection = get_jobs_collection()
+        now = datetime.utcnow()
+        query = self._claimable(now)
+        if job_id is not None:
+            query["_id"] = job_id
+        return await collection.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": MediaJobStatus.RUNNING.value,
+                    "worker_id": worker_id,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    "heartbeat_at": now,
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _owned(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {"_id": job["_id"], "status": MediaJobStatus.RUNNING.value, "worker_id": job["worker_id"]}
+
+    async def heartbeat(self, job: Dict[str, Any]) -> bool:
+        """Extend the lease; False means another worker has taken the job over"""
+        collection = get_jobs_collection()
+        now = datetime.utcnow()
+        result = await collection.update_one(
+            self._owned(job),
+            {"$set": {"lease_until": now + timedelta(seconds=self.lease_seconds), "heartbeat_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job: Dict[str, Any], result: Any) -> bool:
+        collection = get_jobs_collection()
+        update = await collection.update_one(self._owned(job), {"$set": {
+            "status": MediaJobStatus.SUCCEEDED.value,
+            "result": encode_result(result),
+            "error": None,
+            "lease_until": None,
+            "finished_at": datetime.utcnow()
+        }})
+        return update.matched_count == 1
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Delay before the next attempt after `attempts` failures"""
+        return min(self.base_backoff_seconds * (2 ** max(attempts - 1, 0)), self.max_backoff_seconds)
+
+    async def fail(self, job: Dict[str, Any], error: str, retry: bool = True) -> bool:
+        """Record a failed attempt; requeued with backoff until max_attempts"""
+        collection = get_jobs_collection()
+        attempts = job.get("attempts", 1)
+        update = {"lease_until": None, "error": error}
+        if retry and attempts < job.get("max_attempts", self.max_attempts):
+            update["status"] = MediaJobStatus.QUEUED.value
+            update["available_at"] = datetime.utcnow() + timedelta(seconds=self.backoff_seconds(attempts))
+            logger.warning(f"Media job {job['_id']} ({job['operation']}) failed on attempt {attempts}, will retry: {error}")
+        else:
+            update["status"] = MediaJobStatus.FAILED.value
+            update["finished_at"] = datetime.utcnow()
+            logger.error(f"Media job {job['_id']} ({job['operation']}) failed after {attempts} attempts: {error}")
+        result = await collection.update_one(self._owned(job), {"$set": update})
+        return result.matched_count == 1
+
+    async def get(self, job_id: str, user_id: Optional[str] = None, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Raw job document (scoped to the user when given)"""
+        object_id = _object_id(job_id)
+        if object_id is None:
+            return None
+        query: Dict[str, Any] = {"_id": object_id}
+        if user_id is not None:
+            query["user_id"] = user_id
+        projection = None if include_result else {"result": 0, "args": 0, "kwargs": 0}
+        return await get_jobs_collection().find_one(query, projection)
+
+    @staticmethod
+    def to_schema(job: Dict[str, Any], position: Optional[Dict[str, Any]] = None) -> MediaJob:
+        """API view of a job; the result is only included once the job has succeeded"""
+        succeeded = job["status"] == MediaJobStatus.SUCCEEDED.value
+        return MediaJob(
+            **(position or {}),
+            result=decode_result(job["operation"], job.get("result")) if succeeded else None,
+            id=str(job["_id"]),
+            operation=job["operation"],
+            status=job["status"],
+            project_id=job.get("project_id"),
+            job_class=job.get("job_class"),
+            estimated_seconds=job.get("cost"),
+            attempts=job.get("attempts", 0),
+            worker_id=job.get("worker_id"),
+            error=job.get("error"),
+            created_at=job["created_at"],
+            started_at=job.get("started_at"),
+            finished_at=job.get("finished_at")
+        )
+
+    async def estimate_position(self, job: Dict[str, Any], limit: int = 10000) -> Optional[Dict[str, Any]]:
+        """Where a queued job stands under fair share, and roughly when it should start.
+
+        Each class has its own workers' slots, so only jobs of the same class are ahead of it. Deficit
+        round-robin gives every user the same share of run time, so another user's job is ahead if it
+        starts before that user has used more run time than this job's owner will have by then.
+        """
+        if job.get("status") != MediaJobStatus.QUEUED.value:
+            return None
+        collection = get_jobs_collection()
+        job_class = job.get("job_class")
+        queued = await collection.find(
+            {"status": MediaJobStatus.QUEUED.value, "job_class": job_class},
+            {"user_id": 1, "cost": 1, "available_at": 1}
+        ).sort("available_at", 1).to_list(length=limit)
+
+        # Run time the owner's earlier jobs will have used by the time this one starts
+        owner = job.get("user_id")
+        own_ahead, own_share = 0, 0.0
+        for other in queued:
+            if other["_id"] == job["_id"]:
+                break
+            if other.get("user_id") == owner:
+                own_ahead += 1
+                own_share += other.get("cost") or 0.0
+
+        used: Dict[Any, float] = {}
+        jobs_ahead, seconds_ahead = own_ahead, own_share
+        for other in queued:
+            user_id = other.get("user_id")
+            if user_id == owner or used.get(user_id, 0.0) > own_share:
+                continue
+            cost = other.get("cost") or 0.0
+            jobs_ahead += 1
+            seconds_ahead += cost
+            used[user_id] = used.get(user_id, 0.0) + cost
+
+        # Cluster-wide slots for the class: as many as are busy now, and at least one worker's cap
+        running = await collection.count_documents({"status": MediaJobStatus.RUNNING.value, "job_class": job_class})
+        slots = max(running, default_class_caps(settings.media_scheduler_cpus or None).get(job_class, 1))
+        return {
+            "queue_position": jobs_ahead + 1,
+            "jobs_ahead": jobs_ahead,
+            "estimated_start_seconds": round(seconds_ahead / slots, 1)
+        }
+
+    async def abandon(self, job_id: str, reason: str) -> bool:
+        """Give up on a job nobody is waiting for; a worker still running it has its result discarded"""
+        object_id = _object_id(job_id)
+        if object_id is None:
+            return False
+        result = await get_jobs_collection().update_one(
+            {"_id": object_id, "status": {"$in": [MediaJobStatus.QUEUED.value, MediaJobStatus.RUNNING.value]}},
+            {"$set": {
+                "status": MediaJobStatus.ABANDONED.value,
+                "error": reason,
+                "lease_until": None,
+                "finished_at": datetime.utcnow()
+            }}
+        )
+        return result.modified_count == 1
+
+    async def wait(self, job_id: str, timeout: float, poll_interval: float = 1.0) -> Any:
+        """Poll until the job finishes and return its decoded result (raises JobFailedError/JobTimeoutError).
+
+        On timeout the job is abandoned so no worker spends time on a result nobody will read.
+        """
+        deadline = time.monotonic() + timeout
+        delay = min(0.05, poll_interval)
+        while True:
+            job = await self.get(job_id, include_result=True)
+            if job is None:
+                raise JobFailedError(f"Media job {job_id} disappeared")
+            if job["status"] == MediaJobStatus.SUCCEEDED.value:
+                return decode_result(job["operation"], job["result"])
+            if job["status"] in (MediaJobStatus.FAILED.value, MediaJobStatus.ABANDONED.value):
+                raise JobFailedError(job.get("error") or "Media job failed")
+            if time.monotonic() >= deadline:
+                message = f"Media job {job_id} did not finish within {timeout:g}s"
+                await self.abandon(job_id, message)
+                raise JobTimeoutError(message)
+            # Short jobs (probes, thumbnails) return quickly; back off towards poll_interval for long ones
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, poll_interval)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Job counts by status and the age of the oldest queued job"""
+        stats: Dict[str, Any] = {"lease_seconds": self.lease_seconds, "max_attempts": self.max_attempts}
+        try:
+            collection = get_jobs_collection()
+            counts = await collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(length=None)
+            oldest = await collection.find_one({"status": MediaJobStatus.QUEUED.value}, sort=[("created_at", 1)])
+            stats["jobs"] = {entry["_id"]: entry["count"] for entry in counts}
+            stats["oldest_queued_seconds"] = (
+                round((datetime.utcnow() - oldest["created_at"]).total_seconds(), 1) if oldest else None
+            )
+        except Exception as e:
+            logger.warning(f"Failed to count media jobs: {e}")
+        return stats
+
+
+# Global job queue
+job_queue = JobQueue(lease_seconds=settings.media_job_lease_seconds, max_attempts=settings.media_job_max_attempts)
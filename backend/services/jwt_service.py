@@ -7,6 +7,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 import logging
 
+from services.auth_cache import token_cache
+
 logger = logging.getLogger(__name__)
 
 class JWTService:
@@ -112,8 +114,15 @@ class JWTService:
             return None
     
     def verify_access_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify access token specifically"""
-        return self.verify_token(token, "access")
+        """Verify access token specifically, reusing the payload of an already verified token"""
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+        
+        payload = self.verify_token(token, "access")
+        if payload:
+            token_cache.put(token, payload)
+        return payload
     
     def verify_refresh_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify refresh token specifically"""
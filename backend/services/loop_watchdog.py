@@ -0,0 +1,210 @@
+"""
+Event-loop blocking watchdog: finds sync work running inside async code and reports it by call site
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as TallyCounter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Frames under this directory are "ours"; the innermost one names the call site
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Innermost frames that mean the loop was idle when sampled, not blocked
+IDLE_FRAMES = frozenset({("selectors.py", "select"), ("base_events.py", "_run_once")})
+
+UNSAMPLED_SITE = "(unsampled)"
+
+event_loop_block_seconds = registry.histogram(
+    "event_loop_block_seconds", "Event-loop stalls longer than the watchdog threshold",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+
+def _format_frame(frame: traceback.FrameSummary) -> str:
+    filename = frame.filename
+    if filename.startswith(APP_ROOT + os.sep):
+        filename = os.path.relpath(filename, APP_ROOT)
+    else:
+        filename = os.sep.join(filename.split(os.sep)[-2:])
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+def _is_app_frame(frame: traceback.FrameSummary) -> bool:
+    return frame.filename.startswith(APP_ROOT + os.sep) and "site-packages" not in frame.filename
+
+
+class LoopWatchdog:
+    """Heartbeat task on the loop plus a sampling thread off it.
+
+    The heartbeat publishes when it next expects to run. The thread only compares that deadline
+    with the clock, so the steady-state cost is one float read per check; stacks are captured
+    (sys._current_frames) only while the loop is actually overdue.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, heartbeat_interval: float = 0.05, max_sites: int = 200,
+                 max_stack_depth: int = 40):
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_interval = heartbeat_interval
+        self.check_interval = max(self.threshold / 2, 0.01)
+        self.max_sites = max_sites
+        self.max_stack_depth = max_stack_depth
+        self.sites: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+        self.recent: deque = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._samples: List[Tuple[str, ...]] = []
+        self._deadline: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.total_blocks = 0
+        self.total_blocked = 0.0
+        self.total_samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start watching the running event loop"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.heartbeat_interval
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event-loop watchdog started (reporting stalls over {self.threshold * 1000:.0f}ms)")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self._deadline = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.heartbeat_interval
+            self._deadline = expected
+            await asyncio.sleep(self.heartbeat_interval)
+            lag = time.monotonic() - expected
+            if lag >= self.threshold:
+                self._record_block(lag)
+            elif self._samples:
+                # Sampled right at the edge of the threshold; not a reportable stall
+                with self._lock:
+                    self._samples = []
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            deadline = self._deadline
+            if deadline is None or time.monotonic() - deadline < self.threshold:
+                continue
+            stack = self._capture_stack()
+            if stack:
+                with self._lock:
+                    self._samples.append(stack)
+                    self.total_samples += 1
+
+    def _capture_stack(self) -> Optional[Tuple[str, ...]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        summary = traceback.StackSummary.extract(
+            traceback.walk_stack(frame), limit=self.max_stack_depth, lookup_lines=False
+        )
+        if summary and (os.path.basename(summary[0].filename), summary[0].name) in IDLE_FRAMES:
+            return None
+        # Tag the call site onto the outermost-first stack so aggregation keys on both
+        call_site = next((frame for frame in summary if _is_app_frame(frame)), summary[0] if summary else None)
+        if call_site is None:
+            return None
+        return (_format_frame(call_site),) + tuple(_format_frame(frame) for frame in reversed(summary))
+
+    def _record_block(self, lag: float):
+        with self._lock:
+            samples, self._samples = self._samples, []
+            # A long stall may be sampled several times; charge it to the stack seen most often
+            key = TallyCounter(samples).most_common(1)[0][0] if samples else (UNSAMPLED_SITE,)
+            site = self.sites.get(key)
+            if site is None:
+                site = self.sites[key] = {"count": 0, "total": 0.0, "max": 0.0, "samples": 0, "last_seen": None}
+                if len(self.sites) > self.max_sites:
+                    self.sites.popitem(last=False)
+            else:
+                self.sites.move_to_end(key)
+            site["count"] += 1
+            site["total"] += lag
+            site["max"] = max(site["max"], lag)
+            site["samples"] += len(samples)
+            site["last_seen"] = datetime.utcnow().isoformat()
+            self.total_blocks += 1
+            self.total_blocked += lag
+            self.recent.append({
+                "timestamp": site["last_seen"],
+                "duration_ms": round(lag * 1000, 1),
+                "call_site": key[0]
+            })
+        event_loop_block_seconds.observe(lag)
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms at {key[0]}")
+
+    def get_report(self, limit: int = 20) -> Dict[str, Any]:
+        """Call sites ranked by total time they held the loop"""
+        with self._lock:
+            sites = [
+                {
+                    "call_site": key[0],
+                    "count": site["count"],
+                    "total_ms": round(site["total"] * 1000, 1),
+                    "avg_ms": round(site["total"] / site["count"] * 1000, 1),
+                    "max_ms": round(site["max"] * 1000, 1),
+                    "samples": site["samples"],
+                    "last_seen": site["last_seen"],
+                    "stack": list(key[1:])
+                }
+                for key, site in self.sites.items()
+            ]
+            recent = list(self.recent)[::-1]
+            totals = {
+                "total_blocks": self.total_blocks,
+                "total_blocked_ms": round(self.total_blocked * 1000, 1),
+                "total_samples": self.total_samples
+            }
+        sites.sort(key=lambda site: site["total_ms"], reverse=True)
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold * 1000,
+            **totals,
+            "sites": sites[:limit],
+            "recent": recent
+        }
+
+    def reset(self):
+        with self._lock:
+            self.sites.clear()
+            self.recent.clear()
+            self._samples = []
+            self.total_blocks = 0
+            self.total_blocked = 0.0
+            self.total_samples = 0
+        event_loop_block_seconds.clear()
+
+
+# Global watchdog, started with the app when LOOP_WATCHDOG_ENABLED
+loop_watchdog = LoopWatchdog(threshold_ms=settings.loop_block_threshold_ms)
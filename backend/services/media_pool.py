@@ -0,0 +1,309 @@
+"""
+Media jobs (ffmpeg, Whisper) dispatched off the API event loop to a bounded pool or the media job queue
+"""
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+from services.job_queue import job_queue
+from services.media_scheduler import (
+    PRIORITY_CLASSES, FairShareScheduler, create_scheduler, job_class_for, estimate_cost
+)
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# MediaService methods that may be dispatched (everything here takes and returns picklable values)
+ALLOWED_OPERATIONS = frozenset({
+    "get_video_duration",
+    "get_video_info",
+    "extract_audio",
+    "transcribe_audio",
+    "transcribe_video",
+    "trim_video",
+    "trim_video_segments",
+    "remove_filler_segments",
+    "generate_thumbnail",
+    "cleanup_temp_files"
+})
+
+
+def run_media_operation(operation: str, args: tuple, kwargs: dict) -> Any:
+    """Pool entry point; in process mode this runs in the child against its own media_service"""
+    from services.media_service import media_service
+    return getattr(media_service, operation)(*args, **kwargs)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _init_media_process(initializer: Optional[Callable[[], None]] = None):
+    """Runs once in each spawned pool child: the child loads its own Whisper model before taking jobs"""
+    from services.media_service import media_service
+    media_service.load_whisper()
+    if initializer is not None:
+        initializer()
+
+
+class MediaProcessCrashedError(RuntimeError):
+    """A pool child died (OOM kill, segfault) while running the job"""
+    pass
+
+
+class MediaPool:
+    """Bounded pool for MediaService calls so API workers stay responsive.
+
+    "thread" mode suits a single process: ffmpeg runs as a subprocess and Whisper releases the GIL.
+    "process" mode runs jobs in spawned children, so a crash or leak in a media job cannot take the
+    API worker down with it: a dead child breaks the executor, so it is replaced and only the jobs
+    that were running on it fail. Children are spawned rather than forked because CTranslate2 (under
+    faster-whisper) cannot survive a fork, so each child loads its own Whisper model at start-up;
+    size MEDIA_WORKERS for one model per child. `child_initializer` runs in each child after that.
+    "queue" mode runs nothing locally: jobs go to the Mongo job queue for `python -m workers.media`
+    (possibly on other hosts sharing the media directory) and the API only enqueues and polls.
+
+    Locally run jobs wait for the FairShareScheduler to admit them (priority class caps, then per-user
+    deficit round-robin); the executor is sized to the scheduler's total cap, so it never queues.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: Optional[int] = None,
+                 scheduler: Optional[FairShareScheduler] = None,
+                 child_initializer: Optional[Callable[[], None]] = None):
+        if mode not in ("thread", "process", "queue"):
+            raise ValueError(f"Unknown media execution mode {mode!r}; expected 'thread', 'process' or 'queue'")
+        self.mode = mode
+        self.scheduler = scheduler or FairShareScheduler(total_cap=max_workers)
+        self.max_workers = self.scheduler.total_cap
+        self.child_initializer = child_initializer
+        self._executor: Optional[Executor] = None
+        self._queue_started = False
+        # job_class -> user_id -> FIFO of (cost, admission future), only touched on the event loop
+        self._waiting: Dict[str, Dict[str, deque]] = defaultdict(dict)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+        self.operations: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None or self._queue_started
+
+    def start(self):
+        """Create the pool; in process mode this also starts the children and waits for one to load its model"""
+        if self.running:
+            return
+        if self.mode == "queue":
+            self._queue_started = True
+            logger.info("Media pool started (queue mode: jobs run on media workers)")
+            return
+        if self.mode == "process":
+            self._executor = self._create_process_executor()
+            # Spawn every child now (all start on the first submit) so model loading happens at start-up, not mid-request
+            self._executor.submit(_warm_up).result()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="media")
+        logger.info(f"Media pool started ({self.mode} mode, {self.max_workers} workers)")
+
+    def _create_process_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_media_process, initargs=(self.child_initializer,)
+        )
+
+    def _replace_broken_executor(self, broken: Executor):
+        """Swap in a fresh process pool once, however many jobs saw the old one break"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._create_process_executor()
+        broken.shutdown(wait=False)
+        logger.error(f"A media pool process died; replaced the process pool ({self.max_workers} workers)")
+
+    def kill_processes(self):
+        """Kill the process pool's children and start a fresh pool (process mode only).
+
+        ProcessPoolExecutor cannot stop a single job, and a dead child breaks the whole executor,
+        so every job running on it fails with MediaProcessCrashedError.
+        """
+        if self.mode != "process":
+            raise RuntimeError("Only process-mode media jobs can be killed")
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                return
+            self._executor = self._create_process_executor()
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning(f"Killed the media pool processes; replaced the process pool ({self.max_workers} workers)")
+
+    def _dispatch(self):
+        """Admit waiting jobs while the scheduler has free slots"""
+        while True:
+            heads: Dict[str, Dict[str, float]] = {}
+            for job_class, users in self._waiting.items():
+                for user_id, waiting in list(users.items()):
+                    while waiting and waiting[0][1].cancelled():
+                        waiting.popleft()
+                    if not waiting:
+                        del users[user_id]
+                        continue
+                    heads.setdefault(job_class, {})[user_id] = waiting[0][0]
+            choice = self.scheduler.pick(heads)
+            if choice is None:
+                return
+            job_class, user_id = choice
+            _, admitted = self._waiting[job_class][user_id].popleft()
+            admitted.set_result(None)
+
+    async def _admit(self, job_class: str, user_id: str, cost: float):
+        admitted = asyncio.get_running_loop().create_future()
+        self._waiting[job_class].setdefault(user_id, deque()).append((cost, admitted))
+        self._dispatch()
+        try:
+            await admitted
+        except asyncio.CancelledError:
+            if admitted.done() and not admitted.cancelled():
+                # Admitted just as the caller went away; hand the slot on
+                self.scheduler.release(job_class)
+                self._dispatch()
+            raise
+
+    async def execute(self, operation: str, args: tuple, kwargs: dict) -> Any:
+        """Run an operation on the executor straight away (callers must already hold a scheduler slot)"""
+        if operation not in ALLOWED_OPERATIONS:
+            raise ValueError(f"Media operation {operation!r} cannot be dispatched to the pool")
+        if not self.running:
+            self.start()
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        if self.mode == "thread":
+            # Carry the request's trace context so ffmpeg spans nest under this one
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(executor, context.run, run_media_operation, operation, args, kwargs)
+        try:
+            return await loop.run_in_executor(executor, run_media_operation, operation, args, kwargs)
+        except BrokenProcessPool as e:
+            self._replace_broken_executor(executor)
+            raise MediaProcessCrashedError(f"Media process died while running {operation}") from e
+
+    async def submit(self, operation: str, *args, user_id: Optional[str] = None, project_id: Optional[str] = None,
+                     media_seconds: Optional[float] = None, job_class: Optional[str] = None, **kwargs) -> str:
+        """Queue a MediaService call for the media workers without waiting; returns the job id (queue mode only)"""
+        if self.mode != "queue":
+            raise RuntimeError("Media jobs can only be submitted without waiting in queue mode")
+        if operation not in ALLOWED_OPERATIONS:
+            raise ValueError(f"Media operation {operation!r} cannot be dispatched to the pool")
+        job_class = job_class or job_class_for(operation)
+        if job_class not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown media job class {job_class!r}; expected one of {PRIORITY_CLASSES}")
+        return await job_queue.enqueue(
+            operation, args, kwargs, user_id=user_id, project_id=project_id, job_class=job_class,
+            cost=estimate_cost(operation, media_seconds)
+        )
+
+    async def run(self, operation: str, *args, user_id: Optional[str] = None, project_id: Optional[str] = None,
+                  media_seconds: Optional[float] = None, job_class: Optional[str] = None, **kwargs) -> Any:
+        """Run a MediaService method on the pool (or a media worker) and await its result.
+
+        media_seconds (the length of the media it works on) sizes the job's fair-share cost;
+        job_class overrides the priority class implied by the operation.
+        """
+        if operation not in ALLOWED_OPERATIONS:
+            raise ValueError(f"Media operation {operation!r} cannot be dispatched to the pool")
+        if not self.running:
+            self.start()
+        job_class = job_class or job_class_for(operation)
+        if job_class not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown media job class {job_class!r}; expected one of {PRIORITY_CLASSES}")
+        cost = estimate_cost(operation, media_seconds)
+        with self._lock:
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        started = time.perf_counter()
+        failed = False
+        try:
+            with span(f"media.{operation}", **{"media.execution": self.mode, "media.class": job_class}):
+                if self.mode == "queue":
+                    job_id = await job_queue.enqueue(
+                        operation, args, kwargs, user_id=user_id, project_id=project_id, job_class=job_class, cost=cost
+                    )
+                    return await job_queue.wait(
+                        job_id, timeout=settings.media_job_wait_timeout_seconds,
+                        poll_interval=settings.media_job_poll_interval_seconds
+                    )
+                await self._admit(job_class, user_id or "", cost)
+                try:
+                    return await self.execute(operation, args, kwargs)
+                finally:
+                    self.scheduler.release(job_class)
+                    self._dispatch()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.pending -= 1
+                self.total_seconds += elapsed
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                stats = self.operations.setdefault(operation, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                stats["count"] += 1
+                stats["total_seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, pending jobs and per-operation timings"""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "mode": self.mode,
+                "running": self.running,
+                "max_workers": self.max_workers,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "waiting": {
+                    job_class: sum(len(waiting) for waiting in users.values())
+                    for job_class, users in self._waiting.items() if users
+                },
+                "scheduler": self.scheduler.get_stats(),
+                "avg_seconds": round(self.total_seconds / finished, 3) if finished else 0.0,
+                "operations": {
+                    operation: {
+                        "count": stats["count"],
+                        "avg_seconds": round(stats["total_seconds"] / stats["count"], 3),
+                        "max_seconds": round(stats["max_seconds"], 3)
+                    }
+                    for operation, stats in self.operations.items()
+                }
+            }
+
+    def shutdown(self):
+        """Stop the pool, letting running jobs finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._queue_started = False
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Global media pool, started with the app
+media_pool = MediaPool(mode=settings.media_execution, scheduler=create_scheduler(settings.media_workers or None))
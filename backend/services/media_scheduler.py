@@ -0,0 +1,169 @@
+"""
+Priority classes and per-user fair share for media jobs (deficit round-robin)
+"""
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from config.settings import settings
+
+# Highest priority first
+PRIORITY_CLASSES = ("preview", "trim", "transcription", "proxy")
+
+OPERATION_CLASSES = {
+    "get_video_duration": "preview",
+    "get_video_info": "preview",
+    "generate_thumbnail": "preview",
+    "cleanup_temp_files": "preview",
+    "trim_video": "trim",
+    "trim_video_segments": "trim",
+    "remove_filler_segments": "trim",
+    "extract_audio": "transcription",
+    "transcribe_audio": "transcription",
+    "transcribe_video": "transcription"
+}
+
+# Expected run time as (fixed seconds, seconds per second of media) on one core; rough figures
+# from benchmarks.media_benchmark (stream-copy trims, small.en int8 transcription)
+OPERATION_COSTS = {
+    "get_video_duration": (0.2, 0.0),
+    "get_video_info": (0.2, 0.0),
+    "generate_thumbnail": (0.5, 0.0),
+    "cleanup_temp_files": (0.05, 0.0),
+    "trim_video": (0.5, 0.01),
+    "trim_video_segments": (1.0, 0.03),
+    "remove_filler_segments": (1.0, 0.03),
+    "extract_audio": (0.5, 0.02),
+    "transcribe_audio": (2.0, 0.3),
+    "transcribe_video": (2.5, 0.32)
+}
+
+
+def job_class_for(operation: str) -> str:
+    return OPERATION_CLASSES.get(operation, "proxy")
+
+
+def estimate_cost(operation: str, media_seconds: Optional[float] = None) -> float:
+    """Estimated run time in seconds, used as the job's fair-share cost"""
+    fixed, per_second = OPERATION_COSTS.get(operation, (1.0, 0.1))
+    return round(fixed + per_second * max(media_seconds or 0.0, 0.0), 3)
+
+
+def default_class_caps(cpus: Optional[int] = None) -> Dict[str, int]:
+    """Concurrent jobs per class: previews get the most slots, background proxies the fewest"""
+    cpus = cpus or os.cpu_count() or 2
+    return {
+        "preview": max(1, cpus // 2),
+        "trim": max(1, cpus // 4),
+        "transcription": max(1, cpus // 4),
+        "proxy": max(1, cpus // 8)
+    }
+
+
+class FairShareScheduler:
+    """Chooses which waiting job runs next.
+
+    Classes are tried in priority order, skipping any at its concurrency cap (or when the total cap is
+    reached). Within a class, users take turns by deficit round-robin: each turn adds `quantum` seconds
+    of credit and the user's jobs run while their credit covers the next job's estimated cost, so a user with
+    twenty 2-hour transcriptions gets the same share of transcription time as a user with one.
+
+    Holds no jobs itself: callers pass the head (oldest) job cost per user and class, so the same
+    state drives both the in-process pool and media workers choosing from the Mongo queue.
+    """
+
+    def __init__(self, class_caps: Optional[Mapping[str, int]] = None, total_cap: Optional[int] = None,
+                 quantum: float = 60.0):
+        self.class_caps = dict(class_caps or default_class_caps())
+        self.total_cap = total_cap or sum(self.class_caps.values())
+        self.quantum = quantum
+        self.active = {job_class: 0 for job_class in PRIORITY_CLASSES}
+        self._deficits: Dict[str, Dict[str, float]] = {job_class: {} for job_class in PRIORITY_CLASSES}
+        self._rotations: Dict[str, deque] = {job_class: deque() for job_class in PRIORITY_CLASSES}
+        self._turn_started = {job_class: False for job_class in PRIORITY_CLASSES}
+        self._lock = threading.Lock()
+
+    def has_capacity(self, job_class: Optional[str] = None) -> bool:
+        with self._lock:
+            return self._has_capacity(job_class)
+
+    def _has_capacity(self, job_class: Optional[str] = None) -> bool:
+        if sum(self.active.values()) >= self.total_cap:
+            return False
+        if job_class is None:
+            return any(self.active[name] < self.class_caps.get(name, 1) for name in PRIORITY_CLASSES)
+        return self.active[job_class] < self.class_caps.get(job_class, 1)
+
+    def pick(self, heads: Mapping[str, Mapping[str, float]]) -> Optional[Tuple[str, str]]:
+        """Choose (job_class, user_id) from {job_class: {user_id: head job cost}} and reserve a slot for it"""
+        with self._lock:
+            for job_class in PRIORITY_CLASSES:
+                waiting = heads.get(job_class)
+                if not waiting or not self._has_capacity(job_class):
+                    continue
+                user_id = self._next_user(job_class, waiting)
+                self.active[job_class] += 1
+                return job_class, user_id
+        return None
+
+    def _next_user(self, job_class: str, waiting: Mapping[str, float]) -> str:
+        deficits = self._deficits[job_class]
+        rotation = self._rotations[job_class]
+        # Users with nothing waiting leave the rotation and lose their credit (standard DRR)
+        for user_id in [user_id for user_id in rotation if user_id not in waiting]:
+            if user_id == rotation[0]:
+                self._turn_started[job_class] = False
+            rotation.remove(user_id)
+            deficits.pop(user_id, None)
+        for user_id in waiting:
+            if user_id not in deficits:
+                deficits[user_id] = 0.0
+                rotation.append(user_id)
+
+        if not self._turn_started[job_class]:
+            # Skip whole rounds in which nobody could afford their head job
+            rounds = min(math.ceil((waiting[user_id] - deficits[user_id]) / self.quantum) for user_id in rotation)
+            if rounds > 1:
+                for user_id in rotation:
+                    deficits[user_id] += (rounds - 1) * self.quantum
+        while True:
+            user_id = rotation[0]
+            if not self._turn_started[job_class]:
+                deficits[user_id] += self.quantum
+                self._turn_started[job_class] = True
+            if deficits[user_id] >= waiting[user_id]:
+                # The user keeps the turn while their credit covers their next job
+                deficits[user_id] -= waiting[user_id]
+                return user_id
+            rotation.rotate(-1)
+            self._turn_started[job_class] = False
+
+    def release(self, job_class: str):
+        """A job of this class finished; its slot is free"""
+        with self._lock:
+            self.active[job_class] = max(0, self.active[job_class] - 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "quantum_seconds": self.quantum,
+                "total_cap": self.total_cap,
+                "classes": {
+                    job_class: {
+                        "cap": self.class_caps.get(job_class, 1),
+                        "active": self.active[job_class],
+                        "users_waiting": len(self._rotations[job_class])
+                    }
+                    for job_class in PRIORITY_CLASSES
+                }
+            }
+
+
+def create_scheduler(total_cap: Optional[int] = None) -> FairShareScheduler:
+    """Scheduler configured from MEDIA_SCHEDULER_CPUS / MEDIA_SCHEDULER_QUANTUM_SECONDS"""
+    return FairShareScheduler(
+        default_class_caps(settings.media_scheduler_cpus or None), total_cap=total_cap,
+        quantum=settings.media_scheduler_quantum_seconds
+    )
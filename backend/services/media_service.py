@@ -5,6 +5,7 @@ import logging
 from typing import List, Dict, Any, Optional
 import tempfile
 import shutil
+import threading
 
 # Try to import faster-whisper, but don't fail if not available
 try:
@@ -14,7 +15,9 @@ except ImportError:
     WHISPER_AVAILABLE = False
     print("⚠️  faster-whisper not available - transcription features will be disabled")
 
-from models.schemas import TranscriptWord
+from models.schemas import TranscriptWord, DisfluencyReport, FillerLexicon
+from services.disfluency_detector import DisfluencyDetector
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +28,32 @@ class MediaService:
         self.processed_dir = os.path.join(self.media_dir, "processed")
         self.thumbnails_dir = os.path.join(self.media_dir, "thumbnails")
         
-        # Initialize Whisper model
-        self.whisper_model = None
-        self._init_whisper()
+        # Whisper is loaded on first use (or by load_whisper) in the process that transcribes, never at
+        # import: CTranslate2's worker threads do not survive fork, so a model loaded before a fork
+        # (gunicorn preload, forked pool children) can deadlock in the child
+        self._whisper_model = None
+        self._whisper_loaded = False
+        self._whisper_lock = threading.Lock()
         
-        # Filler words to detect
-        self.filler_words = {
-            "um", "uh", "like", "you know", "i mean", "basically", 
-            "actually", "literally", "sort of", "kind of", "right",
-            "so", "well", "now", "okay", "ok", "yeah", "yep"
-        }
+        # Filler/disfluency detection with the default lexicon
+        self.disfluency_detector = DisfluencyDetector()
+
+    @property
+    def whisper_model(self):
+        if not self._whisper_loaded:
+            self.load_whisper()
+        return self._whisper_model
+
+    @whisper_model.setter
+    def whisper_model(self, model):
+        self._whisper_model = model
+        self._whisper_loaded = True
+
+    def load_whisper(self):
+        """Load the Whisper model in this process unless it is already loaded"""
+        with self._whisper_lock:
+            if not self._whisper_loaded:
+                self._init_whisper()
 
     def _init_whisper(self):
         """Initialize Whisper model"""
@@ -51,6 +70,17 @@ class MediaService:
             logger.error(f"Failed to initialize Whisper model: {e}")
             self.whisper_model = None
 
+    def _run_ffmpeg(self, operation: str, stream):
+        """Run an ffmpeg command (overwriting its output) inside a trace span"""
+        # Only the operation is recorded: the arguments carry user file paths into the trace buffer
+        with span(f"ffmpeg.{operation}"):
+            stream.overwrite_output().run(quiet=True)
+
+    def _probe(self, file_path: str) -> Dict[str, Any]:
+        """ffprobe a media file inside a trace span"""
+        with span("ffmpeg.probe", **{"media.file": os.path.basename(file_path)}):
+            return ffmpeg.probe(file_path)
+
     def save_uploaded_file(self, file, project_id: str) -> str:
         """Save uploaded video file"""
         try:
@@ -74,7 +104,7 @@ class MediaService:
     def get_video_duration(self, file_path: str) -> float:
         """Get video duration using FFmpeg"""
         try:
-            probe = ffmpeg.probe(file_path)
+            probe = self._probe(file_path)
             print(f"DEBUG: FFmpeg probe result: {probe['format']}")
             duration = float(probe['format']['duration'])
             print(f"DEBUG: Raw duration from FFmpeg: {duration}")
@@ -87,41 +117,48 @@ class MediaService:
         """Extract audio from video for transcription"""
         try:
             audio_path = video_path.replace('.mp4', '_audio.wav')
-            ffmpeg.input(video_path).output(
+            self._run_ffmpeg("extract_audio", ffmpeg.input(video_path).output(
                 audio_path,
                 acodec='pcm_s16le',
                 ac=1,
                 ar='16000'
-            ).overwrite_output().run(quiet=True)
+            ))
             
             return audio_path
         except Exception as e:
             logger.error(f"Failed to extract audio: {e}")
             raise
 
-    def transcribe_audio(self, audio_path: str) -> List[TranscriptWord]:
-        """Transcribe audio using Whisper"""
+    def transcribe_audio(self, audio_path: str, lexicon: Optional[FillerLexicon] = None) -> List[TranscriptWord]:
+        """Transcribe audio using Whisper, flagging fillers with the user's lexicon (defaults if None)"""
         if not self.whisper_model:
             raise RuntimeError("Whisper model not initialized")
         
         try:
-            # Transcribe with word-level timestamps
-            segments, info = self.whisper_model.transcribe(
-                audio_path,
-                word_timestamps=True,
-                language="en"
-            )
-            
-            words = []
-            for segment in segments:
-                for word in segment.words:
-                    words.append(TranscriptWord(
-                        text=word.word.strip(),
-                        start=word.start,
-                        end=word.end,
-                        confidence=word.probability,
-                        is_filler=word.word.strip().lower() in self.filler_words
-                    ))
+            # Segments are decoded lazily, so the span covers iterating them too
+            with span("whisper.transcribe", **{"media.file": os.path.basename(audio_path)}) as whisper_span:
+                # Transcribe with word-level timestamps
+                segments, info = self.whisper_model.transcribe(
+                    audio_path,
+                    word_timestamps=True,
+                    language="en"
+                )
+                
+                words = []
+                for segment in segments:
+                    for word in segment.words:
+                        words.append(TranscriptWord(
+                            text=word.word.strip(),
+                            start=word.start,
+                            end=word.end,
+                            confidence=word.probability
+                        ))
+                if whisper_span is not None:
+                    whisper_span.set_attribute("whisper.words", len(words))
+                    whisper_span.set_attribute("whisper.audio_seconds", round(getattr(info, "duration", 0.0) or 0.0, 2))
+            
+            # Flag fillers over the whole word array so multi-word phrases and context are seen
+            words = self.detect_disfluencies(words, lexicon).words
             
             logger.info(f"Transcription completed: {len(words)} words")
             return words
@@ -130,6 +167,22 @@ class MediaService:
             logger.error(f"Failed to transcribe audio: {e}")
             raise
 
+    def transcribe_video(self, video_path: str, lexicon: Optional[FillerLexicon] = None) -> List[TranscriptWord]:
+        """Extract, transcribe and clean up a video's audio in one call (one media job)"""
+        audio_path = self.extract_audio(video_path)
+        try:
+            return self.transcribe_audio(audio_path, lexicon)
+        finally:
+            self.cleanup_temp_files([audio_path])
+
+    def detect_disfluencies(self, words: List[TranscriptWord], lexicon: Optional[FillerLexicon] = None) -> DisfluencyReport:
+        """Re-run filler/disfluency detection on an existing transcript"""
+        if isinstance(lexicon, dict):
+            # Jobs run by media workers get their arguments back from Mongo as plain documents
+            lexicon = FillerLexicon(**lexicon)
+        detector = DisfluencyDetector(lexicon) if lexicon else self.disfluency_detector
+        return detector.detect(words)
+
     def remove_filler_segments(self, video_path: str, segments_to_remove: List[Dict[str, Any]]) -> str:
         """Remove filler word segments from video"""
         try:
@@ -158,11 +211,11 @@ class MediaService:
             
             # Apply filter
             if filter_parts:
-                ffmpeg.input(video_path).output(
+                self._run_ffmpeg("remove_filler_segments", ffmpeg.input(video_path).output(
                     output_path,
                     vf=','.join(filter_parts),
                     acodec='copy'
-                ).overwrite_output().run(quiet=True)
+                ))
             else:
                 # No segments to remove, just copy
                 shutil.copy2(video_path, output_path)
@@ -186,7 +239,7 @@ class MediaService:
             )
             
             # Trim video using FFmpeg
-            ffmpeg.input(
+            self._run_ffmpeg("trim_video", ffmpeg.input(
                 video_path, 
                 ss=start_time, 
                 t=duration
@@ -194,7 +247,7 @@ class MediaService:
                 output_path,
                 acodec='copy',
                 vcodec='copy'
-            ).overwrite_output().run(quiet=True)
+            ))
             
             logger.info(f"Video trimmed: {output_path}")
             return output_path
@@ -242,7 +295,7 @@ class MediaService:
                     )
                     
                     # Trim each segment
-                    ffmpeg.input(
+                    self._run_ffmpeg("trim_video_segments", ffmpeg.input(
                         video_path, 
                         ss=segment['startTime'], 
                         t=segment['duration']
@@ -250,7 +303,7 @@ class MediaService:
                         temp_path,
                         acodec='copy',
                         vcodec='copy'
-                    ).overwrite_output().run(quiet=True)
+                    ))
                     
                     temp_files.append(temp_path)
                 
@@ -263,11 +316,11 @@ class MediaService:
                         f.write(f"file '{abs_path}'\n")
                 
                 # Concatenate segments
-                ffmpeg.input(concat_file, format='concat', safe=0).output(
+                self._run_ffmpeg("trim_video_segments", ffmpeg.input(concat_file, format='concat', safe=0).output(
                     output_path,
                     acodec='copy',
                     vcodec='copy'
-                ).overwrite_output().run(quiet=True)
+                ))
                 
                 # Cleanup temp files
                 for temp_file in temp_files:
@@ -298,11 +351,11 @@ class MediaService:
                 f"thumb_{os.path.splitext(os.path.basename(video_path))[0]}.jpg"
             )
             
-            ffmpeg.input(video_path, ss=time).output(
+            self._run_ffmpeg("generate_thumbnail", ffmpeg.input(video_path, ss=time).output(
                 thumbnail_path,
                 vframes=1,
                 qscale=2
-            ).overwrite_output().run(quiet=True)
+            ))
             
             logger.info(f"Thumbnail generated: {thumbnail_path}")
             return thumbnail_path
@@ -314,7 +367,7 @@ class MediaService:
     def get_video_info(self, video_path: str) -> Dict[str, Any]:
         """Get comprehensive video information"""
         try:
-            probe = ffmpeg.probe(video_path)
+            probe = self._probe(video_path)
             
             # Get video stream info
             video_stream = next((s for s in probe['streams'] if s['codec_type'] == 'video'), None)
@@ -0,0 +1,360 @@
+"""
+In-process metrics with Prometheus text exposition
+"""
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds; the long tail covers media endpoints (trim, transcription)
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# Label value used once a metric reaches max_series, so memory stays bounded whatever clients send
+OVERFLOW_LABEL = "__other__"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_string(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base for labelled metric families with a cap on the number of series"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 2000):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Series for the given label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is not None:
+            return child
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                if len(self._children) >= self.max_series:
+                    key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                    child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def series(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def clear(self):
+        with self._lock:
+            self._children.clear()
+
+    def snapshot(self) -> Dict[str, object]:
+        """Plain-data copy of every series, for merging metrics across worker processes"""
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "series": [[list(key), self._child_value(child)] for key, child in self.series()]
+        }
+
+    def _child_value(self, child) -> object:
+        return child.get()
+
+    def merge_series(self, key: Sequence[str], value: object):
+        """Add a snapshot value into the matching series"""
+        self.labels(*key).inc(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> Iterable[str]:
+        for key, child in self.series():
+            yield f"{self.name}{_label_string(self.labelnames, key)} {_format_value(child.get())}"
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def get(self) -> float:
+        return self.value
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled series"""
+        self.labels().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value", "_lock", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from a callback at scrape time"""
+        self.function = function
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception as e:
+                logger.debug(f"Gauge callback failed: {e}")
+                return math.nan
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the bucket that contains it"""
+        counts, _, count = self.snapshot()
+        return bucket_quantile(self.upper_bounds, counts, count, q)
+
+
+def bucket_quantile(upper_bounds: Sequence[float], counts: Sequence[int], count: int, q: float) -> Optional[float]:
+    """Quantile estimate from per-bucket (non-cumulative) counts, like PromQL histogram_quantile"""
+    if count == 0:
+        return None
+    rank = q * count
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        if bucket_count and cumulative + bucket_count >= rank:
+            if index >= len(upper_bounds):
+                # Beyond the last finite bucket: the best we can say is "at least the top bound"
+                return upper_bounds[-1]
+            lower = upper_bounds[index - 1] if index > 0 else 0.0
+            upper = upper_bounds[index]
+            return lower + (upper - lower) * ((rank - cumulative) / bucket_count)
+        cumulative += bucket_count
+    return upper_bounds[-1]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram: constant memory per series regardless of observation count"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, max_series: int = 2000):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.upper_bounds = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def snapshot(self) -> Dict[str, object]:
+        data = super().snapshot()
+        data["buckets"] = list(self.upper_bounds)
+        return data
+
+    def _child_value(self, child) -> object:
+        counts, total, count = child.snapshot()
+        return {"counts": counts, "sum": total, "count": count}
+
+    def merge_series(self, key: Sequence[str], value: object):
+        child = self.labels(*key)
+        with child._lock:
+            child.counts = [mine + theirs for mine, theirs in zip(child.counts, value["counts"])]
+            child.sum += value["sum"]
+            child.count += value["count"]
+
+    def _render_samples(self) -> Iterable[str]:
+        for key, child in self.series():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.upper_bounds + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_label_string(self.labelnames, key, le)} {cumulative}"
+            labels = _label_string(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """Named metric families rendered together for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.type_name}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, **kwargs))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, **kwargs))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """Plain-data copy of all metric families (JSON serialisable)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    @classmethod
+    def merged(cls, snapshots: Iterable[Dict[str, Dict[str, object]]]) -> "MetricsRegistry":
+        """Registry holding the sum of several snapshots (counters, histogram buckets and gauges add up)"""
+        merged = cls()
+        factories = {"counter": merged.counter, "gauge": merged.gauge, "histogram": merged.histogram}
+        for snapshot in snapshots:
+            for name, family in snapshot.items():
+                factory = factories.get(family["type"])
+                if factory is None:
+                    continue
+                kwargs = {"max_series": 100000}
+                if family["type"] == "histogram":
+                    kwargs["buckets"] = family["buckets"]
+                metric = factory(name, family["help"], family["labelnames"], **kwargs)
+                for key, value in family["series"]:
+                    if isinstance(value, float) and math.isnan(value):
+                        continue
+                    metric.merge_series(key, value)
+        return merged
+
+    def reset(self):
+        """Drop all recorded series (metric families stay registered)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+# Content type for the /metrics endpoint
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Global registry and HTTP metrics
+registry = MetricsRegistry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",)
+)
@@ -0,0 +1,144 @@
+"""
+Metrics aggregation across worker processes through a shared snapshot directory
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from services.metrics import MetricsRegistry, registry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATTERN = "worker_*.json"
+
+
+def _snapshot_path(directory: str, pid) -> str:
+    return os.path.join(directory, f"worker_{pid}.json")
+
+
+# Counters and histograms of every exited worker, summed into one file so recycled workers
+# (max_requests) do not leave a file each behind for every scrape to read
+DEAD_SNAPSHOT = "dead"
+
+
+def mark_process_dead(directory: str, pid: int):
+    """Called by the process manager (only ever from the one master process) when a worker exits.
+
+    Counters and histograms from the dead worker keep counting towards the totals (so rates never
+    go backwards); its gauges are dropped because nothing will ever update them again.
+    """
+    path = _snapshot_path(directory, pid)
+    try:
+        with open(path, encoding="utf-8") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (OSError, ValueError):
+        return
+    families = {name: family for name, family in snapshot["families"].items() if family["type"] != "gauge"}
+    dead_path = _snapshot_path(directory, DEAD_SNAPSHOT)
+    try:
+        with open(dead_path, encoding="utf-8") as dead_file:
+            accumulated = [json.load(dead_file)["families"]]
+    except (OSError, ValueError):
+        accumulated = []
+    merged = MetricsRegistry.merged(accumulated + [families]).snapshot()
+    # The dead worker's file is only removed once its totals are safely in the accumulated file
+    _write_atomic(dead_path, {"pid": DEAD_SNAPSHOT, "families": merged})
+    os.remove(path)
+
+
+def _write_atomic(path: str, data: Dict):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            json.dump(data, tmp_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class MultiprocessMetrics:
+    """Each worker periodically writes its registry snapshot to `directory`; any worker can merge them.
+
+    A scrape hits one worker at random, so /metrics renders the sum of every snapshot in the
+    directory. Snapshots are at most `flush_interval` seconds stale, except the scraped worker's,
+    which is written fresh before merging.
+    """
+
+    def __init__(self, metrics_registry: MetricsRegistry, directory: Optional[str], flush_interval: float = 5.0):
+        self.registry = metrics_registry
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start flushing this worker's snapshot on the running event loop"""
+        if not self.enabled or self.running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Writing metrics snapshots to {self.directory} every {self.flush_interval:g}s")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.enabled:
+            self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write metrics snapshot: {e}")
+
+    def flush(self):
+        """Write this process's snapshot"""
+        pid = os.getpid()
+        _write_atomic(_snapshot_path(self.directory, pid), {"pid": pid, "families": self.registry.snapshot()})
+
+    def load_snapshots(self) -> List[Dict]:
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.directory, SNAPSHOT_PATTERN))):
+            try:
+                with open(path, encoding="utf-8") as snapshot_file:
+                    snapshots.append(json.load(snapshot_file))
+            except (OSError, ValueError) as e:
+                # Removed by mark_process_dead between glob and open
+                logger.debug(f"Skipping metrics snapshot {path}: {e}")
+        return snapshots
+
+    def render(self) -> str:
+        """Prometheus text for all workers, or just this process when not running multi-worker"""
+        if not self.enabled:
+            return self.registry.render()
+        self.flush()
+        snapshots = self.load_snapshots()
+        return MetricsRegistry.merged(snapshot["families"] for snapshot in snapshots).render()
+
+
+# Global aggregator, enabled when PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py sets it)
+multiprocess_metrics = MultiprocessMetrics(
+    registry, settings.prometheus_multiproc_dir, flush_interval=settings.metrics_flush_interval_seconds
+)
@@ -0,0 +1,157 @@
+"""
+Async password hashing on a dedicated bcrypt thread pool
+"""
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from utils.password_utils import password_utils
+
+logger = logging.getLogger(__name__)
+
+# $2a$/$2b$/$2y$ followed by the two-digit cost factor
+BCRYPT_COST_PATTERN = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+def default_worker_count() -> int:
+    """One bcrypt thread per core, leaving a core for the event loop"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop.
+
+    bcrypt releases the GIL while it works, so a small pool of threads hashes in parallel across cores
+    while the loop keeps serving other requests. The pool size is the bound: extra logins wait in the
+    executor queue instead of taking CPU from everything else.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: Optional[int] = None):
+        self.rounds = rounds
+        self.max_workers = max_workers or default_worker_count()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.upgraded = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a bcrypt call on the pool, tracking queue depth and wait/run time"""
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                wait = started - submitted
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run_seconds += time.perf_counter() - started
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), task)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.completed += 1
+        return result
+
+    async def hash_password(self, password: str) -> str:
+        """Hash a password at the configured cost factor"""
+        return await self._run(password_utils.hash_password, password, self.rounds)
+
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against a bcrypt hash"""
+        return await self._run(password_utils.verify_password, password, hashed_password)
+
+    def get_cost(self, hashed_password: str) -> Optional[int]:
+        """Cost factor encoded in a bcrypt hash"""
+        match = BCRYPT_COST_PATTERN.match(hashed_password or "")
+        return int(match.group(1)) if match else None
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a hash was made with a lower cost factor than the current one"""
+        cost = self.get_cost(hashed_password)
+        return cost is not None and cost < self.rounds
+
+    async def verify_and_upgrade(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; on success also return a new hash if the stored one uses an old cost factor.
+
+        The plaintext is only available at login, so this is the one chance to re-hash it.
+        """
+        if not await self.verify_password(password, hashed_password):
+            return False, None
+        if not self.needs_rehash(hashed_password):
+            return True, None
+        try:
+            new_hash = await self.hash_password(password)
+        except Exception as e:
+            # The login itself succeeded; the upgrade is retried next time
+            logger.warning(f"Failed to upgrade password hash: {e}")
+            return True, None
+        with self._lock:
+            self.upgraded += 1
+        return True, new_hash
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth and timing counters"""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "rounds": self.rounds,
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "upgraded": self.upgraded,
+                "avg_wait_ms": round(self.total_wait_seconds / finished * 1000, 2) if finished else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "avg_run_ms": round(self.total_run_seconds / finished * 1000, 2) if finished else 0.0
+            }
+
+    def shutdown(self):
+        """Stop the pool, letting queued hashes finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(
+    rounds=settings.password_bcrypt_rounds,
+    max_workers=settings.password_hash_workers or None
+)
@@ -6,11 +6,15 @@ import time
 import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
-import psutil
-import threading
+from collections import defaultdict
 
 from services.database import get_database_stats, test_database_connection
+from services.db_monitoring import command_monitor
+from services.system_sampler import system_sampler
+from services.loop_watchdog import loop_watchdog
+from services.metrics import (
+    http_requests_total, http_request_duration_seconds, http_requests_in_progress
+)
 from utils.error_handlers import ErrorContext
 
 logger = logging.getLogger(__name__)
@@ -20,87 +24,58 @@ class PerformanceMonitor:
     """Performance monitoring service for the application"""
     
     def __init__(self):
+        # Request counts and latencies live in fixed-size histograms (services.metrics);
+        # process resources in the system sampler's ring buffer
         self.metrics = {
-            "api_calls": defaultdict(int),
-            "response_times": defaultdict(list),
-            "error_counts": defaultdict(int),
-            "database_operations": defaultdict(int),
-            "memory_usage": deque(maxlen=100),
-            "cpu_usage": deque(maxlen=100),
-            "active_connections": deque(maxlen=100)
+            "database_operations": defaultdict(int)
         }
         self.start_time = datetime.now()
-        self.monitoring_active = False
-        self.monitor_thread = None
+    
+    @property
+    def monitoring_active(self) -> bool:
+        return system_sampler.running
     
     def start_monitoring(self):
-        """Start performance monitoring"""
+        """Start performance monitoring (call from the event loop)"""
         if not self.monitoring_active:
-            self.monitoring_active = True
-            self.monitor_thread = threading.Thread(target=self._monitor_system_resources)
-            self.monitor_thread.daemon = True
-            self.monitor_thread.start()
+            system_sampler.start()
             logger.info("Performance monitoring started")
     
     def stop_monitoring(self):
         """Stop performance monitoring"""
-        self.monitoring_active = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=1)
+        system_sampler.stop()
         logger.info("Performance monitoring stopped")
     
-    def _monitor_system_resources(self):
-        """Monitor system resources in background thread"""
-        while self.monitoring_active:
-            try:
-                # Monitor memory usage
-                try:
-                    memory_info = psutil.virtual_memory()
-                    self.metrics["memory_usage"].append({
-                        "timestamp": datetime.now().isoformat(),
-                        "used_percent": memory_info.percent,
-                        "used_mb": memory_info.used / 1024 / 1024,
-                        "available_mb": memory_info.available / 1024 / 1024
-                    })
-                except Exception as e:
-                    logger.debug(f"Could not get memory info: {e}")
-                
-                # Monitor CPU usage
-                try:
-                    cpu_percent = psutil.cpu_percent(interval=0.1)  # Reduced interval
-                    self.metrics["cpu_usage"].append({
-                        "timestamp": datetime.now().isoformat(),
-                        "cpu_percent": cpu_percent
-                    })
-                except Exception as e:
-                    logger.debug(f"Could not get CPU info: {e}")
-                
-                # Monitor active connections (skip if permission denied)
-                try:
-                    connections = len(psutil.net_connections())
-                    self.metrics["active_connections"].append({
-                        "timestamp": datetime.now().isoformat(),
-                        "count": connections
-                    })
-                except (psutil.AccessDenied, PermissionError):
-                    logger.debug("Skipping network connections monitoring (permission denied)")
-                except Exception as e:
-                    logger.debug(f"Could not get network connections: {e}")
-                
-                time.sleep(10)  # Monitor every 10 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in performance monitoring: {e}")
-                time.sleep(30)  # Wait longer on error
-    
     def record_api_call(self, endpoint: str, method: str, response_time: float, status_code: int):
-        """Record API call metrics"""
-        key = f"{method} {endpoint}"
-        self.metrics["api_calls"][key] += 1
-        self.metrics["response_times"][key].append(response_time)
-        
-        if status_code >= 400:
-            self.metrics["error_counts"][key] += 1
+        """Record API call metrics (endpoint should be the route template, not the raw path)"""
+        http_requests_total.labels(method, endpoint, str(status_code)).inc()
+        http_request_duration_seconds.labels(method, endpoint).observe(response_time)
+    
+    def get_api_call_counts(self) -> Dict[str, Dict[str, int]]:
+        """Total and error (status >= 400) counts per method and route template"""
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "errors": 0})
+        for (method, route, status_code), child in http_requests_total.series():
+            entry = counts[f"{method} {route}"]
+            entry["calls"] += int(child.get())
+            if status_code.isdigit() and int(status_code) >= 400:
+                entry["errors"] += int(child.get())
+        return dict(counts)
+    
+    def get_latency_percentiles(self) -> Dict[str, Dict[str, Any]]:
+        """Average and p50/p95/p99 latency (ms) per method and route template, estimated from histogram buckets"""
+        latencies = {}
+        for (method, route), child in http_request_duration_seconds.series():
+            _, total, count = child.snapshot()
+            if not count:
+                continue
+            latencies[f"{method} {route}"] = {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 2),
+                "p50_ms": round(child.quantile(0.50) * 1000, 2),
+                "p95_ms": round(child.quantile(0.95) * 1000, 2),
+                "p99_ms": round(child.quantile(0.99) * 1000, 2)
+            }
+        return latencies
     
     def record_database_operation(self, operation: str, duration: float):
         """Record database operation metrics"""
@@ -110,37 +85,28 @@ class PerformanceMonitor:
         """Get performance summary"""
         uptime = datetime.now() - self.start_time
         
-        # Calculate average response times
-        avg_response_times = {}
-        for endpoint, times in self.metrics["response_times"].items():
-            if times:
-                avg_response_times[endpoint] = sum(times) / len(times)
+        # Latency percentiles from the request histograms
+        latencies = self.get_latency_percentiles()
+        avg_response_times = {endpoint: stats["avg_ms"] / 1000 for endpoint, stats in latencies.items()}
         
         # Calculate error rates
+        call_counts = self.get_api_call_counts()
         error_rates = {}
-        for endpoint, calls in self.metrics["api_calls"].items():
-            errors = self.metrics["error_counts"].get(endpoint, 0)
-            error_rates[endpoint] = (errors / calls * 100) if calls > 0 else 0
-        
-        # Get latest system metrics
-        latest_memory = self.metrics["memory_usage"][-1] if self.metrics["memory_usage"] else None
-        latest_cpu = self.metrics["cpu_usage"][-1] if self.metrics["cpu_usage"] else None
-        latest_connections = self.metrics["active_connections"][-1] if self.metrics["active_connections"] else None
+        for endpoint, counts in call_counts.items():
+            error_rates[endpoint] = (counts["errors"] / counts["calls"] * 100) if counts["calls"] > 0 else 0
         
         return {
             "uptime_seconds": uptime.total_seconds(),
             "uptime_human": str(uptime),
-            "total_api_calls": sum(self.metrics["api_calls"].values()),
+            "total_api_calls": sum(counts["calls"] for counts in call_counts.values()),
             "total_database_operations": sum(self.metrics["database_operations"].values()),
+            "in_flight_requests": int(sum(child.get() for _, child in http_requests_in_progress.series())),
             "average_response_times": avg_response_times,
+            "latency_percentiles": latencies,
             "error_rates": error_rates,
-            "system_metrics": {
-                "memory": latest_memory,
-                "cpu": latest_cpu,
-                "connections": latest_connections
-            },
+            "system_metrics": system_sampler.ring.latest(),
             "top_endpoints": sorted(
-                self.metrics["api_calls"].items(), 
+                ((endpoint, counts["calls"]) for endpoint, counts in call_counts.items()),
                 key=lambda x: x[1], 
                 reverse=True
             )[:10]
@@ -150,6 +116,10 @@ class PerformanceMonitor:
         """Get detailed performance metrics"""
         return {
             "metrics": self.metrics,
+            "api_calls": self.get_api_call_counts(),
+            "latency_percentiles": self.get_latency_percentiles(),
+            "system_sampler": system_sampler.get_stats(),
+            "system_history": system_sampler.get_history(window_seconds=3600, points=60),
             "monitoring_active": self.monitoring_active,
             "start_time": self.start_time.isoformat(),
             "current_time": datetime.now().isoformat()
@@ -158,14 +128,13 @@ class PerformanceMonitor:
     def reset_metrics(self):
         """Reset all performance metrics"""
         self.metrics = {
-            "api_calls": defaultdict(int),
-            "response_times": defaultdict(list),
-            "error_counts": defaultdict(int),
-            "database_operations": defaultdict(int),
-            "memory_usage": deque(maxlen=100),
-            "cpu_usage": deque(maxlen=100),
-            "active_connections": deque(maxlen=100)
+            "database_operations": defaultdict(int)
         }
+        system_sampler.ring.clear()
+        http_requests_total.clear()
+        http_request_duration_seconds.clear()
+        command_monitor.reset()
+        loop_watchdog.reset()
         self.start_time = datetime.now()
         logger.info("Performance metrics reset")
 
@@ -189,11 +158,11 @@ class DatabasePerformanceMonitor:
             connected = await test_database_connection()
             connection_time = (time.time() - start_time) * 1000  # Convert to milliseconds
             
-            # Calculate average query times
-            avg_query_times = {}
+            # Per collection.command latency from the command listener, plus any manual timings
+            query_performance = command_monitor.get_command_stats()
             for operation, times in self.query_times.items():
                 if times:
-                    avg_query_times[operation] = sum(times) / len(times)
+                    query_performance.setdefault(operation, {"count": len(times), "avg_ms": sum(times) / len(times) * 1000})
             
             return {
                 "database_stats": db_stats,
@@ -201,7 +170,10 @@ class DatabasePerformanceMonitor:
                     "connected": connected,
                     "connection_time_ms": connection_time
                 },
-                "query_performance": avg_query_times,
+                "query_performance": query_performance,
+                "operations": command_monitor.get_operation_stats(),
+                "slow_queries": command_monitor.get_slow_queries(),
+                "slow_query_threshold_ms": command_monitor.slow_query_ms,
                 "index_usage": dict(self.index_usage),
                 "connection_pool": self.connection_pool_stats
             }
@@ -286,28 +258,8 @@ performance_monitor = PerformanceMonitor()
 database_performance_monitor = DatabasePerformanceMonitor()
 performance_optimizer = PerformanceOptimizer()
 
+# Count every Mongo command the listener sees as a database operation
+command_monitor.add_observer(
+    lambda collection, command, duration: performance_monitor.record_database_operation(f"{collection}.{command}", duration)
+)
 
-class PerformanceMiddleware:
-    """Middleware for performance monitoring"""
-    
-    def __init__(self, app):
-        self.app = app
-        self.performance_monitor = performance_monitor
-    
-    async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            start_time = time.time()
-            
-            # Process request
-            await self.app(scope, receive, send)
-            
-            # Record metrics
-            response_time = time.time() - start_time
-            method = scope.get("method", "UNKNOWN")
-            path = scope.get("path", "/")
-            
-            # Extract status code from response (simplified)
-            self.performance_monitor.record_api_call(path, method, response_time, 200)
-        
-        else:
-            await self.app(scope, receive, send)
@@ -0,0 +1,232 @@
+"""
+On-demand profiling of the live process: a thread-based statistical CPU sampler and tracemalloc diffs
+"""
+import asyncio
+import linecache
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter as TallyCounter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Innermost frames of a thread that is parked, not working (selector poll, lock/queue waits, idle pool workers)
+IDLE_FRAMES = frozenset({
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker")
+})
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+    pass
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(APP_ROOT + os.sep) and "site-packages" not in filename:
+        return os.path.relpath(filename, APP_ROOT)
+    parts = filename.split(os.sep)
+    if "site-packages" in parts:
+        return os.sep.join(parts[parts.index("site-packages") + 1:])
+    return os.sep.join(parts[-2:])
+
+
+class SamplingProfiler:
+    """Samples every thread's stack with sys._current_frames() from a background thread.
+
+    Pure Python and safe to run on a live worker: nothing is installed in the profiled threads,
+    so the cost is the sampler thread itself (roughly 1-3% of one core at 200 Hz).
+    Frames are keyed by function (first line), so one flamegraph node per function.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame_names: Dict[Any, Tuple[str, str, int]] = {}
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _frame_key(self, code) -> Tuple[str, str, int]:
+        key = self._frame_names.get(code)
+        if key is None:
+            key = self._frame_names[code] = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+        return key
+
+    def _sample_loop(self, stop: threading.Event, interval: float, include_idle: bool,
+                     stacks: TallyCounter, stats: Dict[str, int]):
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not stop.wait(interval):
+            frames = sys._current_frames()
+            stats["samples"] += 1
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                if not include_idle and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_key(frame.f_code))
+                    frame = frame.f_back
+                name = thread_names.get(thread_id)
+                if name is None:
+                    thread_names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                    name = thread_names.setdefault(thread_id, str(thread_id))
+                stacks[(name,) + tuple(reversed(stack))] += 1
+                stats["stacks"] += 1
+
+    async def profile(self, seconds: float, interval: float = 0.005, include_idle: bool = False) -> Dict[str, Any]:
+        """Sample for `seconds` while the event loop keeps serving requests"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            stacks: TallyCounter = TallyCounter()
+            stats = {"samples": 0, "stacks": 0}
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample_loop, args=(stop, interval, include_idle, stacks, stats),
+                name="sampling-profiler", daemon=True
+            )
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.get_running_loop().run_in_executor(None, sampler.join)
+            duration = time.perf_counter() - started
+            logger.info(f"Profiled {duration:.1f}s: {stats['samples']} samples, {len(stacks)} distinct stacks")
+            return {
+                "duration": duration,
+                "interval": interval,
+                "samples": stats["samples"],
+                "stacks": stacks
+            }
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def to_collapsed(profile: Dict[str, Any]) -> str:
+        """Brendan Gregg's folded format (flamegraph.pl, speedscope, inferno)"""
+        lines = []
+        for stack, count in profile["stacks"].most_common():
+            thread_name, frames = stack[0], stack[1:]
+            names = [thread_name] + [f"{name} ({path}:{line})" for name, path, line in frames]
+            lines.append(";".join(part.replace(";", ":") for part in names) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def to_speedscope(profile: Dict[str, Any], name: str = "snipix") -> Dict[str, Any]:
+        """Speedscope file with one sampled profile per thread (weights in seconds)"""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        by_thread: Dict[str, Dict[str, list]] = {}
+        interval = profile["interval"]
+        for stack, count in profile["stacks"].items():
+            indexes = []
+            for frame in stack[1:]:
+                index = frame_index.get(frame)
+                if index is None:
+                    index = frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(index)
+            thread = by_thread.setdefault(stack[0], {"samples": [], "weights": []})
+            thread["samples"].append(indexes)
+            thread["weights"].append(round(count * interval, 6))
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(thread["weights"]), 6),
+                "samples": thread["samples"],
+                "weights": thread["weights"]
+            }
+            for thread_name, thread in sorted(by_thread.items(), key=lambda item: -sum(item[1]["weights"]))
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "snipix-sampling-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+
+class MemoryProfiler:
+    """tracemalloc snapshot diffs over a time window, to find what keeps growing"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ))
+
+    async def diff(self, seconds: float, limit: int = 25, group_by: str = "lineno", frames: int = 10) -> Dict[str, Any]:
+        """Allocations still live after `seconds` that were not there at the start, largest growth first"""
+        if self._lock.locked():
+            raise ProfilerBusyError("A memory profile is already running")
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start(frames)
+            try:
+                # Snapshots walk every traced block; keep them off the event loop
+                before = await loop.run_in_executor(None, self._snapshot)
+                await asyncio.sleep(seconds)
+                after = await loop.run_in_executor(None, self._snapshot)
+                traced_current, traced_peak = tracemalloc.get_traced_memory()
+            finally:
+                if not was_tracing:
+                    tracemalloc.stop()
+
+        differences = await loop.run_in_executor(None, after.compare_to, before, group_by)
+        top = []
+        for stat in differences[:limit]:
+            frame = stat.traceback[0]
+            entry = {
+                "location": f"{_short_path(frame.filename)}:{frame.lineno}",
+                "size_diff_kb": round(stat.size_diff / 1024, 2),
+                "size_kb": round(stat.size / 1024, 2),
+                "count_diff": stat.count_diff,
+                "count": stat.count
+            }
+            if group_by == "traceback":
+                entry["traceback"] = [f"{_short_path(line.filename)}:{line.lineno}" for line in stat.traceback]
+            top.append(entry)
+        return {
+            "seconds": seconds,
+            "group_by": group_by,
+            "total_growth_kb": round(sum(stat.size_diff for stat in differences) / 1024, 2),
+            "traced_current_kb": round(traced_current / 1024, 2),
+            "traced_peak_kb": round(traced_peak / 1024, 2),
+            "top": top
+        }
+
+
+# Global profilers
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
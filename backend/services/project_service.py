@@ -7,7 +7,7 @@ from datetime import datetime
 from bson import ObjectId
 
 from models.schemas import (
-    Project, ProjectCreate, ProjectUpdate, 
+    Project, ProjectCreate, ProjectUpdate, ProjectListItem, ProjectListPage,
     User, AuditLog, AuditLogCreate, AuditLogAction
 )
 from services.database import (
@@ -19,6 +19,8 @@ from utils.error_handlers import (
     DatabaseError, ValidationError, OperationError
 )
 from utils.retry_decorator import resilient_operation
+from utils.pagination import encode_cursor, keyset_filter
+from utils.conditional import make_etag
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,20 @@ logger = logging.getLogger(__name__)
 class ProjectService:
     """Service for managing projects with MongoDB integration"""
     
+    # Fields returned for project listings
+    LIST_PROJECTION = {
+        "name": 1,
+        "description": 1,
+        "user_id": 1,
+        "thumbnail": 1,
+        "duration": 1,
+        "trimmed_duration": 1,
+        "status": 1,
+        "tags": 1,
+        "created_at": 1,
+        "updated_at": 1
+    }
+    
     def __init__(self):
         self.projects_collection = None
         self.users_collection = None
@@ -187,6 +203,77 @@ class ProjectService:
             
             return projects
     
+    @retry_database_operation(max_retries=3)
+    async def get_projects_etag(self, user_id: str, limit: int = 50, skip: int = 0) -> str:
+        """ETag of a user's project list from a projected (_id, updated_at) read of the same page"""
+        with ErrorContext("get_projects_etag", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.projects_collection is None:
+                raise DatabaseError("Database not available")
+            
+            query = {
+                "is_deleted": False,
+                "$or": [
+                    {"user_id": user_id},
+                    {"collaborators": user_id}
+                ]
+            }
+            
+            cursor = self.projects_collection.find(
+                query,
+                projection={"updated_at": 1}
+            ).sort("updated_at", -1).skip(skip).limit(limit)
+            stamps = [(doc["_id"], doc.get("updated_at")) async for doc in cursor]
+            return self.projects_etag(user_id, stamps)
+    
+    def projects_etag(self, user_id: str, stamps: List[tuple]) -> str:
+        """Strong ETag for a project list given its (id, updated_at) pairs in order"""
+        return make_etag("projects", user_id, *(f"{project_id}@{updated_at}" for project_id, updated_at in stamps))
+    
+    @retry_database_operation(max_retries=3)
+    async def get_projects_page(self, user_id: str, limit: int = 50, cursor: Optional[str] = None) -> ProjectListPage:
+        """Get a page of list-view projects using an (updated_at, _id) keyset cursor"""
+        with ErrorContext("get_projects_page", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.projects_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Owner/collaborator branches each map onto their own compound index
+            conditions = [
+                {
+                    "is_deleted": False,
+                    "$or": [
+                        {"user_id": user_id},
+                        {"collaborators": user_id}
+                    ]
+                }
+            ]
+            seek = keyset_filter("updated_at", cursor)
+            if seek:
+                conditions.append(seek)
+            query = {"$and": conditions} if len(conditions) > 1 else conditions[0]
+            
+            cursor_docs = self.projects_collection.find(
+                query,
+                projection=self.LIST_PROJECTION
+            ).sort([("updated_at", -1), ("_id", -1)]).limit(limit)
+            
+            items = []
+            last_doc = None
+            async for project_doc in cursor_docs:
+                last_doc = project_doc
+                items.append(ProjectListItem(**dict(project_doc, _id=str(project_doc["_id"]))))
+            
+            next_cursor = None
+            if last_doc is not None and len(items) == limit:
+                next_cursor = encode_cursor(last_doc.get("updated_at"), last_doc["_id"])
+            
+            return ProjectListPage(items=items, next_cursor=next_cursor)
+    
     @retry_database_operation(max_retries=3)
     async def update_project(self, project_id: str, project_data: ProjectUpdate, user_id: str) -> Optional[Project]:
         """Update a project"""
@@ -0,0 +1,262 @@
+"""
+Process resource sampler: RSS, open fds, threads, CPU, event-loop lag and GC pauses,
+kept in a fixed-size numeric ring buffer with min/max/avg downsampling
+"""
+import asyncio
+import gc
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import psutil
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Columns stored per sample (after the timestamp)
+SAMPLE_FIELDS = (
+    "rss_mb",
+    "open_fds",
+    "threads",
+    "cpu_percent",
+    "loop_lag_ms",
+    "gc_pause_ms",
+    "gc_max_pause_ms",
+    "gc_collections"
+)
+
+
+def _json_values(values: np.ndarray, digits: int = 3) -> List[Optional[float]]:
+    """Rounded floats with NaN as None (JSON has no NaN)"""
+    return [None if math.isnan(value) else round(value, digits) for value in values.tolist()]
+
+
+class SampleRing:
+    """Fixed-size ring of numeric samples, one row per sample (timestamp + fields).
+
+    Storage is allocated once, so a day of history costs the same memory on day one and day thirty.
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str] = SAMPLE_FIELDS):
+        self.fields = tuple(fields)
+        self.capacity = max(1, int(capacity))
+        self._data = np.full((self.capacity, len(self.fields) + 1), np.nan)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def append(self, timestamp: float, values: Sequence[float]):
+        with self._lock:
+            row = self._data[self._next]
+            row[0] = timestamp
+            row[1:] = values
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._data.fill(np.nan)
+            self._next = 0
+            self._count = 0
+
+    def rows(self) -> np.ndarray:
+        """Copy of the stored samples, oldest first"""
+        with self._lock:
+            if self._count < self.capacity:
+                return self._data[:self._count].copy()
+            return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._count:
+                return None
+            row = self._data[(self._next - 1) % self.capacity].copy()
+        sample = dict(zip(self.fields, _json_values(row[1:])))
+        sample["timestamp"] = round(float(row[0]), 3)
+        return sample
+
+    def downsample(self, window_seconds: float, points: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Min/max/avg per field over `points` equal time buckets covering the last `window_seconds`.
+
+        Empty buckets are omitted, so gaps (sampler stopped) show up as missing timestamps.
+        """
+        now = now if now is not None else time.time()
+        points = max(1, int(points))
+        start = now - window_seconds
+        step = window_seconds / points
+        rows = self.rows()
+        rows = rows[rows[:, 0] >= start]
+
+        series: Dict[str, Dict[str, List[Optional[float]]]] = {
+            field: {"min": [], "max": [], "avg": []} for field in self.fields
+        }
+        result = {"start": start, "end": now, "step_seconds": step, "timestamps": [], "series": series}
+        if not len(rows):
+            return result
+
+        # Rows are time ordered, so bucket indexes are non-decreasing and reduceat can fold each run
+        buckets = np.clip(((rows[:, 0] - start) // step).astype(np.int64), 0, points - 1)
+        bucket_ids, offsets = np.unique(buckets, return_index=True)
+        values = rows[:, 1:]
+        present = ~np.isnan(values)
+        counts = np.add.reduceat(present, offsets, axis=0)
+        sums = np.add.reduceat(np.where(present, values, 0.0), offsets, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(counts > 0, sums / counts, np.nan)
+        minimums = np.fmin.reduceat(values, offsets, axis=0)
+        maximums = np.fmax.reduceat(values, offsets, axis=0)
+
+        result["timestamps"] = _json_values(start + bucket_ids * step, digits=1)
+        for column, field in enumerate(self.fields):
+            series[field]["min"] = _json_values(minimums[:, column])
+            series[field]["max"] = _json_values(maximums[:, column])
+            series[field]["avg"] = _json_values(averages[:, column])
+        return result
+
+
+class GCPauseTracker:
+    """Times garbage collector runs through gc.callbacks"""
+
+    def __init__(self):
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+        self.pause_total = 0.0
+        self.pause_max = 0.0
+        self.collections = 0
+        self.installed = False
+
+    def _callback(self, phase: str, info: Dict[str, Any]):
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            with self._lock:
+                self.pause_total += pause
+                self.pause_max = max(self.pause_max, pause)
+                self.collections += 1
+
+    def install(self):
+        if not self.installed:
+            gc.callbacks.append(self._callback)
+            self.installed = True
+
+    def uninstall(self):
+        if self.installed:
+            gc.callbacks.remove(self._callback)
+            self.installed = False
+
+    def drain(self):
+        """(total pause seconds, longest pause seconds, collections) since the last drain"""
+        with self._lock:
+            totals = (self.pause_total, self.pause_max, self.collections)
+            self.pause_total = 0.0
+            self.pause_max = 0.0
+            self.collections = 0
+        return totals
+
+
+class SystemSampler:
+    """Samples this process on the event loop; no threads and no system-wide scans.
+
+    Each sample is a handful of /proc reads batched with psutil's oneshot(), cheap enough to run
+    inline. Loop lag is the worst delay of a short heartbeat sleep seen since the previous sample.
+    """
+
+    def __init__(self, interval: float = 5.0, history_seconds: float = 24 * 3600, lag_probe_interval: float = 0.5):
+        self.interval = interval
+        self.lag_probe_interval = lag_probe_interval
+        self.process = psutil.Process()
+        self.ring = SampleRing(int(history_seconds // interval) + 1)
+        self.gc_tracker = GCPauseTracker()
+        self._tasks: List[asyncio.Task] = []
+        self._max_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start sampling on the running event loop"""
+        if self.running:
+            return
+        self.gc_tracker.install()
+        # Prime the CPU counter so the first sample covers one interval
+        self.process.cpu_percent(None)
+        self._tasks = [asyncio.create_task(self._sample_loop()), asyncio.create_task(self._lag_loop())]
+        logger.info(f"System sampler started ({self.interval:.0f}s interval, {self.ring.capacity} samples of history)")
+
+    def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        self.gc_tracker.uninstall()
+
+    async def _lag_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_probe_interval
+            await asyncio.sleep(self.lag_probe_interval)
+            self._max_lag = max(self._max_lag, loop.time() - expected)
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Could not sample process resources: {e}")
+
+    def _open_fds(self) -> float:
+        if hasattr(self.process, "num_fds"):
+            return self.process.num_fds()
+        return self.process.num_handles()  # Windows
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and store it"""
+        with self.process.oneshot():
+            rss_mb = self.process.memory_info().rss / 1024 / 1024
+            threads = self.process.num_threads()
+            cpu_percent = self.process.cpu_percent(None)
+            try:
+                open_fds = self._open_fds()
+            except (psutil.AccessDenied, OSError):
+                open_fds = float("nan")
+        loop_lag, self._max_lag = self._max_lag, 0.0
+        gc_total, gc_max, gc_collections = self.gc_tracker.drain()
+        self.ring.append(time.time(), (
+            rss_mb, open_fds, threads, cpu_percent, loop_lag * 1000, gc_total * 1000, gc_max * 1000, gc_collections
+        ))
+        return self.ring.latest()
+
+    def get_history(self, window_seconds: float = 3600, points: int = 120) -> Dict[str, Any]:
+        return self.ring.downsample(window_seconds, points)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "samples": len(self.ring),
+            "capacity": self.ring.capacity,
+            "history_hours": round(self.ring.capacity * self.interval / 3600, 2),
+            "buffer_bytes": self.ring.nbytes,
+            "latest": self.ring.latest()
+        }
+
+
+# Global sampler, started with performance monitoring
+system_sampler = SystemSampler(
+    interval=settings.system_sample_interval_seconds,
+    history_seconds=settings.system_sample_history_hours * 3600
+)
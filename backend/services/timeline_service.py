@@ -2,12 +2,16 @@
 Timeline State Management Service for MongoDB Integration
 """
 import logging
-from typing import List, Optional, Dict, Any
+import uuid
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
 
 from models.schemas import (
     TimelineState, TimelineStateDocument, TimelineStateCreate, TimelineStateUpdate,
+    TimelineOperation, TimelineOperationType, TimelineOperationsRequest, TimelineOperationsResult,
+    TimelineStateSummary, TimelineHistoryPage,
     AuditLog, AuditLogCreate, AuditLogAction
 )
 from services.database import (
@@ -19,13 +23,36 @@ from utils.error_handlers import (
     DatabaseError, ValidationError, OperationError
 )
 from utils.retry_decorator import resilient_operation
+from utils.responses import trusted_document
+from utils.conditional import make_etag
 
 logger = logging.getLogger(__name__)
 
 
+def build_timeline_stats(layer_clip_ends: List[List[float]], duration: Optional[float]) -> Dict[str, Any]:
+    """Summary stats stored alongside each timeline state, from each layer's clip end times"""
+    clip_ends = [end_time for clip_ends in layer_clip_ends for end_time in clip_ends]
+    return {
+        "clip_count": len(clip_ends),
+        "layer_count": len(layer_clip_ends),
+        "duration": max([duration or 0.0, *clip_ends])
+    }
+
+
 class TimelineService:
     """Service for managing timeline states with MongoDB integration"""
     
+    # Fields returned for history listings; the layer/clip tree is never loaded
+    HISTORY_SUMMARY_PROJECTION = {
+        "version": 1,
+        "is_current": 1,
+        "description": 1,
+        "change_summary": 1,
+        "created_by": 1,
+        "created_at": 1,
+        "stats": 1
+    }
+    
     def __init__(self):
         self.timeline_states_collection = None
         self.projects_collection = None
@@ -84,6 +111,7 @@ class TimelineService:
             # Get next version number
             latest_state = await self.timeline_states_collection.find_one(
                 {"project_id": timeline_data.project_id},
+                projection={"version": 1},
                 sort=[("version", -1)]
             )
             next_version = (latest_state.get("version", 0) + 1) if latest_state else 1
@@ -97,6 +125,7 @@ class TimelineService:
                 "description": timeline_data.description,
                 "created_by": user_id,
                 "change_summary": timeline_data.change_summary,
+                "stats": self._compute_timeline_stats(timeline_data.timeline_state),
                 "created_at": datetime.now(),
                 "updated_at": datetime.now()
             }
@@ -173,6 +202,72 @@ class TimelineService:
             
             return timeline_state
     
+    @retry_database_operation(max_retries=3)
+    async def get_current_timeline_state_data(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current timeline state as response-ready data, skipping model validation of the trusted stored document"""
+        with ErrorContext("get_current_timeline_state_data", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.timeline_states_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            timeline_doc = await self.timeline_states_collection.find_one({
+                "project_id": project_id,
+                "is_current": True
+            })
+            
+            if not timeline_doc:
+                return None
+            
+            # Layer/clip trees are only ever written from validated models, so only the top level needs shaping
+            timeline_doc["_id"] = str(timeline_doc["_id"])
+            timeline_doc.setdefault("created_by", user_id)
+            timeline_doc.setdefault("version", 1)
+            timeline_doc.setdefault("is_current", True)
+            timeline_state = trusted_document(TimelineStateDocument, timeline_doc)
+            
+            # Create audit log
+            await self._create_audit_log(
+                user_id=user_id,
+                action=AuditLogAction.VIEW,
+                resource_type="timeline_state",
+                resource_id=timeline_state["_id"],
+                details={"project_id": project_id}
+            )
+            
+            return timeline_state
+    
+    @retry_database_operation(max_retries=3)
+    async def get_timeline_state_etag(self, project_id: str, user_id: str) -> Optional[str]:
+        """ETag of the current timeline state from a projected version/updated_at read"""
+        with ErrorContext("get_timeline_state_etag", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.timeline_states_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            timeline_doc = await self.timeline_states_collection.find_one(
+                {"project_id": project_id, "is_current": True},
+                projection={"version": 1, "updated_at": 1}
+            )
+            return self.timeline_etag(timeline_doc) if timeline_doc else None
+    
+    def timeline_etag(self, timeline_doc: Dict[str, Any]) -> str:
+        """Strong ETag for a stored timeline state (any write bumps version or updated_at)"""
+        return make_etag("timeline", timeline_doc["_id"], timeline_doc.get("version", 1), timeline_doc.get("updated_at"))
+    
     @retry_database_operation(max_retries=3)
     async def get_timeline_state_by_version(self, project_id: str, version: int, user_id: str) -> Optional[TimelineStateDocument]:
         """Get a specific timeline state by version"""
@@ -248,6 +343,41 @@ class TimelineService:
             
             return timeline_states
     
+    @retry_database_operation(max_retries=3)
+    async def get_timeline_history_summary(self, project_id: str, user_id: str, limit: int = 20,
+                                           before_version: Optional[int] = None) -> TimelineHistoryPage:
+        """Get lightweight timeline history using a projection and keyset pagination on version"""
+        with ErrorContext("get_timeline_history_summary", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.timeline_states_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            # Seek past the last version seen instead of skipping; served by (project_id, version) index
+            query = {"project_id": project_id}
+            if before_version is not None:
+                query["version"] = {"$lt": before_version}
+            
+            cursor = self.timeline_states_collection.find(
+                query,
+                projection=self.HISTORY_SUMMARY_PROJECTION
+            ).sort("version", -1).limit(limit)
+            
+            items = []
+            async for timeline_doc in cursor:
+                timeline_doc["_id"] = str(timeline_doc["_id"])
+                timeline_doc.setdefault("version", 1)
+                items.append(TimelineStateSummary(**timeline_doc))
+            
+            next_before_version = items[-1].version if items and len(items) == limit else None
+            return TimelineHistoryPage(items=items, next_before_version=next_before_version)
+    
     @retry_database_operation(max_retries=3)
     async def update_timeline_state(self, timeline_id: str, timeline_data: TimelineStateUpdate, user_id: str) -> Optional[TimelineStateDocument]:
         """Update a timeline state"""
@@ -278,15 +408,17 @@ class TimelineService:
             
             if timeline_data.timeline_state is not None:
                 update_data["timeline_state"] = timeline_data.timeline_state.dict()
+                update_data["stats"] = self._compute_timeline_stats(timeline_data.timeline_state)
             if timeline_data.description is not None:
                 update_data["description"] = timeline_data.description
             if timeline_data.change_summary is not None:
                 update_data["change_summary"] = timeline_data.change_summary
             
             # Update timeline state
+            # Bumping the revision fails any operation batch built from the previous state
             result = await self.timeline_states_collection.update_one(
                 {"_id": ObjectId(timeline_id)},
-                {"$set": update_data}
+                {"$set": update_data, "$inc": {"revision": 1}}
             )
             
             if result.modified_count == 0:
@@ -303,7 +435,229 @@ class TimelineService:
             
             # Return updated timeline state
             return await self.get_timeline_state_by_id(timeline_id, user_id)
-    
+
+    # Not retried: a batch that lost to a concurrent change must be rebuilt from the new state by the client
+    @retry_database_operation(max_retries=0)
+    async def apply_timeline_operations(self, timeline_id: str, operations_data: TimelineOperationsRequest, user_id: str) -> Optional[TimelineOperationsResult]:
+        """Apply a list of targeted operations to a timeline state without rewriting it"""
+        with ErrorContext("apply_timeline_operations", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+
+            if self.timeline_states_collection is None:
+                raise DatabaseError("Database not available")
+
+            if not operations_data.operations:
+                raise ValidationError("No timeline operations provided")
+
+            # Fetch only the layer/clip id skeleton needed to validate the operations, plus whole
+            # clips when a clip has to be carried across layers
+            moves_across_layers = any(
+                operation.type == TimelineOperationType.MOVE_CLIP
+                and operation.target_layer_id and operation.target_layer_id != operation.layer_id
+                for operation in operations_data.operations
+            )
+            projection = {
+                "project_id": 1,
+                "version": 1,
+                "revision": 1,
+                "timeline_state.duration": 1,
+                "timeline_state.layers.id": 1
+            }
+            if moves_across_layers:
+                projection["timeline_state.layers.clips"] = 1
+            else:
+                # End times are enough to recompute stats
+                projection["timeline_state.layers.clips.id"] = 1
+                projection["timeline_state.layers.clips.end_time"] = 1
+            existing_timeline = await self.timeline_states_collection.find_one(
+                {"_id": ObjectId(timeline_id)},
+                projection=projection
+            )
+
+            if not existing_timeline:
+                return None
+
+            # Validate project access
+            project = await self._validate_project_access(existing_timeline["project_id"], user_id)
+            if not project:
+                raise ValidationError(f"Project {existing_timeline['project_id']} not found or access denied")
+
+            # Layer id -> clip id -> clip body, kept up to date as the batch is translated so later
+            # operations see the layers and clips earlier ones added, moved or trimmed
+            layer_clips = {
+                layer.get("id"): {clip.get("id"): clip for clip in layer.get("clips", [])}
+                for layer in existing_timeline.get("timeline_state", {}).get("layers", [])
+            }
+
+            now = datetime.now()
+            updates = []
+            changes = []
+            for operation in operations_data.operations:
+                operation_updates, change = self._build_operation_updates(operation, layer_clips, now)
+                updates.extend(operation_updates)
+                changes.append(change)
+
+            # Stats are recomputed from the batch's end state (so trims can shorten the duration);
+            # they, the description and the summary ride along with the last write
+            metadata = {
+                "updated_at": now,
+                "stats": build_timeline_stats(
+                    [[clip.get("end_time") or 0.0 for clip in clips.values()] for clips in layer_clips.values()],
+                    existing_timeline.get("timeline_state", {}).get("duration")
+                )
+            }
+            if operations_data.description is not None:
+                metadata["description"] = operations_data.description
+            if operations_data.change_summary is not None:
+                metadata["change_summary"] = operations_data.change_summary
+            updates.append(({"$set": metadata}, None))
+
+            requests = self._guarded_requests(timeline_id, existing_timeline.get("revision", 0), updates)
+            result = await self.timeline_states_collection.bulk_write(requests, ordered=True)
+            if result.matched_count == 0:
+                # The first write's revision check failed, so nothing was applied
+                raise OperationError("Timeline changed since it was read; reload and retry")
+            if result.matched_count < len(requests):
+                # Only a whole-state save landing mid-batch can do this; the batch is left partly applied
+                logger.error(f"Timeline {timeline_id} operations partly applied ({result.matched_count}/{len(requests)} writes)")
+                raise OperationError("Timeline operations were only partly applied; reload the timeline")
+
+            # Create audit log
+            await self._create_audit_log(
+                user_id=user_id,
+                action=AuditLogAction.UPDATE,
+                resource_type="timeline_state",
+                resource_id=timeline_id,
+                details={
+                    "action": "apply_operations",
+                    "operations": [change["type"] for change in changes]
+                }
+            )
+
+            return TimelineOperationsResult(
+                timeline_id=timeline_id,
+                project_id=existing_timeline["project_id"],
+                version=existing_timeline.get("version", 1),
+                changes=changes,
+                updated_at=now
+            )
+
+    def _guarded_requests(self, timeline_id: str, revision: int,
+                          updates: List[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]]) -> List[UpdateOne]:
+        """Guard a batch's writes with one precondition on the timeline's revision.
+        
+        The first write only matches at the revision the batch was built from; it bumps the revision and
+        tags the document with a batch token that every later write requires. A stale batch therefore
+        matches nothing at all (an ordered bulk write carries on past unmatched writes, so each write
+        needs its own guard), and another batch built from the same revision fails its first write.
+        Documents written before revisions existed count as revision 0.
+        """
+        batch_token = uuid.uuid4().hex
+        requests = []
+        for index, (update, array_filters) in enumerate(updates):
+            if index == 0:
+                timeline_filter = {"_id": ObjectId(timeline_id), "revision": revision if revision else {"$in": [None, 0]}}
+                update = {**update, "$inc": {"revision": 1},
+                          "$set": {**update.get("$set", {}), "revision_batch": batch_token}}
+            else:
+                timeline_filter = {"_id": ObjectId(timeline_id), "revision": revision + 1, "revision_batch": batch_token}
+            requests.append(UpdateOne(timeline_filter, update, array_filters=array_filters))
+        return requests
+
+    def _build_operation_updates(self, operation: TimelineOperation,
+                                 layer_clips: Dict[str, Dict[str, Dict[str, Any]]],
+                                 now: datetime) -> Tuple[List[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]], Dict[str, Any]]:
+        """Translate a timeline operation into targeted (update, array_filters) pairs and its changed fragment"""
+        op_type = operation.type
+
+        if op_type == TimelineOperationType.SET_PLAYHEAD:
+            if operation.playhead_time is None:
+                raise ValidationError("set_playhead requires playhead_time")
+            update = {"$set": {
+                "timeline_state.playhead_time": operation.playhead_time,
+                "updated_at": now
+            }}
+            return [(update, None)], {"type": op_type, "playhead_time": operation.playhead_time}
+
+        if op_type == TimelineOperationType.ADD_LAYER:
+            if operation.layer is None:
+                raise ValidationError("add_layer requires layer")
+            if operation.layer.id in layer_clips:
+                raise ValidationError(f"Layer {operation.layer.id} already exists")
+            layer_doc = operation.layer.dict()
+            layer_clips[operation.layer.id] = {clip["id"]: dict(clip) for clip in layer_doc.get("clips", [])}
+            update = {
+                "$push": {"timeline_state.layers": layer_doc},
+                "$set": {"updated_at": now}
+            }
+            return [(update, None)], {"type": op_type, "layer": layer_doc}
+
+        # Remaining operations address an existing layer
+        if operation.layer_id not in layer_clips:
+            raise ValidationError(f"Layer {operation.layer_id} not found in timeline")
+
+        if op_type == TimelineOperationType.REMOVE_LAYER:
+            layer_clips.pop(operation.layer_id)
+            update = {
+                "$pull": {"timeline_state.layers": {"id": operation.layer_id}},
+                "$set": {"updated_at": now}
+            }
+            return [(update, None)], {"type": op_type, "layer_id": operation.layer_id}
+
+        # Clip operations
+        if operation.clip_id not in layer_clips[operation.layer_id]:
+            raise ValidationError(f"Clip {operation.clip_id} not found in layer {operation.layer_id}")
+        if operation.start_time is None or operation.end_time is None:
+            raise ValidationError(f"{op_type} requires start_time and end_time")
+        if operation.end_time <= operation.start_time:
+            raise ValidationError("Clip end_time must be greater than start_time")
+
+        clip_fields = {
+            "start_time": operation.start_time,
+            "end_time": operation.end_time,
+            "duration": operation.end_time - operation.start_time
+        }
+        if op_type == TimelineOperationType.TRIM_CLIP and operation.original_start_time is not None:
+            clip_fields["original_start_time"] = operation.original_start_time
+
+        change = {"type": op_type, "layer_id": operation.layer_id, "clip_id": operation.clip_id, **clip_fields}
+        target_layer_id = operation.target_layer_id
+
+        if op_type == TimelineOperationType.MOVE_CLIP and target_layer_id and target_layer_id != operation.layer_id:
+            if target_layer_id not in layer_clips:
+                raise ValidationError(f"Layer {target_layer_id} not found in timeline")
+
+            # Clip bodies are replaced rather than mutated, so queued $push documents stay as built
+            clip_doc = {**layer_clips[operation.layer_id].pop(operation.clip_id), **clip_fields}
+            layer_clips[target_layer_id][operation.clip_id] = clip_doc
+            updates = [
+                (
+                    {"$pull": {"timeline_state.layers.$[layer].clips": {"id": operation.clip_id}}},
+                    [{"layer.id": operation.layer_id}]
+                ),
+                (
+                    {
+                        "$push": {"timeline_state.layers.$[layer].clips": clip_doc},
+                        "$set": {"updated_at": now}
+                    },
+                    [{"layer.id": target_layer_id}]
+                )
+            ]
+            change["target_layer_id"] = target_layer_id
+            return updates, change
+
+        layer = layer_clips[operation.layer_id]
+        layer[operation.clip_id] = {**layer[operation.clip_id], **clip_fields}
+        clip_path = "timeline_state.layers.$[layer].clips.$[clip]"
+        update = {
+            "$set": {
+                **{f"{clip_path}.{field}": value for field, value in clip_fields.items()},
+                "updated_at": now
+            }
+        }
+        return [(update, [{"layer.id": operation.layer_id}, {"clip.id": operation.clip_id}])], change
+
     @retry_database_operation(max_retries=3)
     async def get_timeline_state_by_id(self, timeline_id: str, user_id: str) -> Optional[TimelineStateDocument]:
         """Get a timeline state by ID"""
@@ -439,6 +793,13 @@ class TimelineService:
             logger.info(f"Deleted timeline state {timeline_id}")
             return True
     
+    def _compute_timeline_stats(self, timeline_state: TimelineState) -> Dict[str, Any]:
+        """Precompute summary stats stored alongside each timeline state"""
+        return build_timeline_stats(
+            [[clip.end_time for clip in layer.clips] for layer in timeline_state.layers],
+            timeline_state.duration
+        )
+    
     async def _validate_project_access(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Validate that user has access to project"""
         if self.projects_collection is None:
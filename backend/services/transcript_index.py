@@ -0,0 +1,130 @@
+"""
+In-memory time-range index over transcript words
+"""
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.schemas import TranscriptWord
+from services.columnar_words import ColumnarWords, TIME_DECIMALS
+
+logger = logging.getLogger(__name__)
+
+
+def word_id(word: TranscriptWord) -> str:
+    """Client-side word identifier ("<start>-<end>")"""
+    return f"{word.start}-{word.end}"
+
+
+def parse_word_id(value: str) -> Optional[Tuple[float, float]]:
+    """Parse a "<start>-<end>" word identifier"""
+    try:
+        start, end = value.split("-", 1)
+        return float(start), float(end)
+    except (ValueError, AttributeError):
+        return None
+
+
+class TranscriptWordIndex:
+    """Sorted start-time arrays with a running max of end times for bisect range queries"""
+
+    def __init__(self, words: Iterable[TranscriptWord]):
+        self.words: Sequence[TranscriptWord] = sorted(words, key=lambda word: (word.start, word.end))
+        self.starts: List[float] = [word.start for word in self.words]
+        self.ends: List[float] = [word.end for word in self.words]
+
+        # max_end[i] = max(ends[:i + 1]); non-decreasing, so it can be bisected too
+        self.max_end: List[float] = []
+        running = float("-inf")
+        for end in self.ends:
+            running = max(running, end)
+            self.max_end.append(running)
+
+    @classmethod
+    def from_columns(cls, columns: ColumnarWords) -> "TranscriptWordIndex":
+        """Build the index straight from columnar words; word objects are only created for query results"""
+        if not columns.is_sorted():
+            columns = columns.take(np.lexsort((columns.ends, columns.starts)))
+        index = cls.__new__(cls)
+        index.words = columns
+        starts = np.round(columns.starts.astype(np.float64), TIME_DECIMALS)
+        ends = np.round(columns.ends.astype(np.float64), TIME_DECIMALS)
+        index.starts = starts.tolist()
+        index.ends = ends.tolist()
+        index.max_end = np.maximum.accumulate(ends).tolist() if len(ends) else []
+        return index
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def words_in_range(self, start: float, end: Optional[float] = None) -> List[TranscriptWord]:
+        """Words overlapping [start, end)"""
+        # First word whose prefix max end passes start; nothing earlier can overlap
+        lo = bisect_right(self.max_end, start)
+        hi = bisect_left(self.starts, end) if end is not None else len(self.words)
+        return [self.words[i] for i in range(lo, hi) if self.ends[i] > start]
+
+    def find(self, start: float, end: float, tolerance: float = 1e-6) -> Optional[TranscriptWord]:
+        """Word with the given start/end times"""
+        i = bisect_left(self.starts, start - tolerance)
+        while i < len(self.words) and self.starts[i] <= start + tolerance:
+            if abs(self.ends[i] - end) <= tolerance:
+                return self.words[i]
+            i += 1
+        return None
+
+    def lookup_ids(self, word_ids: Iterable[str]) -> List[TranscriptWord]:
+        """Resolve client word ids; unknown ids are skipped"""
+        found = []
+        for value in word_ids:
+            parsed = parse_word_id(value)
+            if parsed is None:
+                continue
+            word = self.find(*parsed)
+            if word is not None:
+                found.append(word)
+        return found
+
+
+class TranscriptIndexCache:
+    """Bounded LRU of word indexes keyed by project, invalidated by the transcription's updated_at"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, TranscriptWordIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project_id: str, version_key: Any) -> Optional[TranscriptWordIndex]:
+        """Cached index for a project if it was built from the same version"""
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is None or entry[0] != version_key:
+                return None
+            self._entries.move_to_end(project_id)
+            return entry[1]
+
+    def put(self, project_id: str, version_key: Any, index: TranscriptWordIndex):
+        """Store an index, evicting the least recently used one when full"""
+        with self._lock:
+            self._entries[project_id] = (version_key, index)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, project_id: str):
+        """Drop the cached index for a project"""
+        with self._lock:
+            self._entries.pop(project_id, None)
+
+    def clear(self):
+        """Drop all cached indexes"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global transcript index cache instance
+transcript_index_cache = TranscriptIndexCache()
@@ -2,24 +2,31 @@
 Transcription Data Management Service for MongoDB Integration
 """
 import logging
-from typing import List, Optional, Dict, Any
+import re
+import uuid
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from models.schemas import (
     TranscriptionDocument, TranscriptionCreate, TranscriptionUpdate,
-    TranscriptSegment, TranscriptWord,
+    TranscriptSegment, TranscriptWord, TranscriptSearchHit, TranscriptSearchResults,
     AuditLog, AuditLogCreate, AuditLogAction
 )
 from services.database import (
-    get_transcriptions_collection, get_projects_collection, get_audit_logs_collection,
-    is_db_available
+    get_transcriptions_collection, get_transcription_segments_collection,
+    get_projects_collection, get_audit_logs_collection, is_db_available
 )
 from utils.error_handlers import (
     retry_database_operation, ErrorContext, handle_database_error,
     DatabaseError, ValidationError, OperationError
 )
 from utils.retry_decorator import resilient_operation
+from services.transcript_index import TranscriptWordIndex, transcript_index_cache
+from services.columnar_words import ColumnarWords, encode_words
+from utils.responses import trusted_document
+from utils.conditional import make_etag
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +34,19 @@ logger = logging.getLogger(__name__)
 class TranscriptionService:
     """Service for managing transcription data with MongoDB integration"""
     
+    # Bookkeeping fields stored on segment documents but not part of TranscriptSegment
+    SEGMENT_PROJECTION = {
+        "_id": 0,
+        "project_id": 0,
+        "transcription_id": 0,
+        "generation": 0,
+        "created_at": 0,
+        "updated_at": 0
+    }
+    
     def __init__(self):
         self.transcriptions_collection = None
+        self.transcription_segments_collection = None
         self.projects_collection = None
         self.audit_logs_collection = None
         self._ensure_collections()
@@ -41,6 +59,7 @@ class TranscriptionService:
         
         try:
             self.transcriptions_collection = get_transcriptions_collection()
+            self.transcription_segments_collection = get_transcription_segments_collection()
             self.projects_collection = get_projects_collection()
             self.audit_logs_collection = get_audit_logs_collection()
         except Exception as e:
@@ -55,6 +74,7 @@ class TranscriptionService:
         
         try:
             self.transcriptions_collection = get_transcriptions_collection()
+            self.transcription_segments_collection = get_transcription_segments_collection()
             self.projects_collection = get_projects_collection()
             self.audit_logs_collection = get_audit_logs_collection()
         except Exception as e:
@@ -96,6 +116,8 @@ class TranscriptionService:
                 "is_edited": False,
                 "speaker_count": 1,
                 "speakers": {},
+                "segment_storage": True,  # segments live in transcription_segments
+                "max_segment_duration": 0.0,
                 "created_at": datetime.now(),
                 "updated_at": datetime.now()
             }
@@ -146,6 +168,9 @@ class TranscriptionService:
             if not transcription_doc:
                 return None
             
+            if transcription_doc.get("segment_storage"):
+                transcription_doc["segments"] = await self._load_segments(self._segment_query(transcription_doc))
+            
             # Convert to TranscriptionDocument
             transcription_doc["_id"] = str(transcription_doc["_id"])
             transcription = TranscriptionDocument(**transcription_doc)
@@ -161,6 +186,71 @@ class TranscriptionService:
             
             return transcription
     
+    @retry_database_operation(max_retries=3)
+    async def get_transcription_data(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get transcription for a project as response-ready data, skipping model validation of the trusted stored document"""
+        with ErrorContext("get_transcription_data", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcriptions_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            transcription_doc = await self.transcriptions_collection.find_one({
+                "project_id": project_id
+            })
+            
+            if not transcription_doc:
+                return None
+            
+            if transcription_doc.get("segment_storage"):
+                transcription_doc["segments"] = await self._load_segments(self._segment_query(transcription_doc))
+            
+            # Segments and words were written from validated models, so only the top level needs shaping
+            transcription_doc["_id"] = str(transcription_doc["_id"])
+            transcription = trusted_document(TranscriptionDocument, transcription_doc)
+            
+            # Create audit log
+            await self._create_audit_log(
+                user_id=user_id,
+                action=AuditLogAction.VIEW,
+                resource_type="transcription",
+                resource_id=transcription["_id"],
+                details={"project_id": project_id}
+            )
+            
+            return transcription
+    
+    @retry_database_operation(max_retries=3)
+    async def get_transcription_etag(self, project_id: str, user_id: str) -> Optional[str]:
+        """ETag of a project's transcription from a projected updated_at read"""
+        with ErrorContext("get_transcription_etag", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcriptions_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            transcription_doc = await self.transcriptions_collection.find_one(
+                {"project_id": project_id},
+                projection={"updated_at": 1}
+            )
+            return self.transcription_etag(transcription_doc) if transcription_doc else None
+    
+    def transcription_etag(self, transcription_doc: Dict[str, Any]) -> str:
+        """Strong ETag for a stored transcription (segment writes also bump the parent's updated_at)"""
+        return make_etag("transcription", transcription_doc["_id"], transcription_doc.get("updated_at"))
+    
     @retry_database_operation(max_retries=3)
     async def update_transcription(self, project_id: str, transcription_data: TranscriptionUpdate, user_id: str) -> Optional[TranscriptionDocument]:
         """Update transcription data"""
@@ -190,7 +280,13 @@ class TranscriptionService:
             }
             
             if transcription_data.segments is not None:
-                update_data["segments"] = [segment.dict() for segment in transcription_data.segments]
+                # Legacy embedded segments are moved out on write so search sees every edited transcript
+                if not existing_transcription.get("segment_storage"):
+                    existing_transcription = await self._migrate_to_segment_storage(existing_transcription)
+                await self._replace_segments(
+                    existing_transcription, transcription_data.segments,
+                    {"max_segment_duration": self._max_segment_duration(transcription_data.segments)}
+                )
             if transcription_data.is_edited is not None:
                 update_data["is_edited"] = transcription_data.is_edited
             if transcription_data.speakers is not None:
@@ -205,6 +301,8 @@ class TranscriptionService:
             if result.modified_count == 0:
                 raise OperationError("Failed to update transcription")
             
+            transcript_index_cache.invalidate(project_id)
+            
             # Create audit log
             await self._create_audit_log(
                 user_id=user_id,
@@ -240,23 +338,33 @@ class TranscriptionService:
             if not existing_transcription:
                 raise ValidationError(f"Transcription not found for project {project_id}")
             
-            # Add new segments
-            new_segments = [segment.dict() for segment in segments]
+            # Move legacy embedded segments out before appending
+            if not existing_transcription.get("segment_storage"):
+                existing_transcription = await self._migrate_to_segment_storage(existing_transcription)
+            
+            # Add new segments, one document each
+            if segments:
+                await self.transcription_segments_collection.insert_many([
+                    self._segment_to_document(segment, existing_transcription)
+                    for segment in segments
+                ])
             
             result = await self.transcriptions_collection.update_one(
                 {"project_id": project_id},
                 {
-                    "$push": {"segments": {"$each": new_segments}},
                     "$set": {
                         "updated_at": datetime.now(),
                         "is_complete": True  # Mark as complete when segments are added
-                    }
+                    },
+                    "$max": {"max_segment_duration": self._max_segment_duration(segments)}
                 }
             )
             
             if result.modified_count == 0:
                 raise OperationError("Failed to add transcription segments")
             
+            transcript_index_cache.invalidate(project_id)
+            
             # Create audit log
             await self._create_audit_log(
                 user_id=user_id,
@@ -273,9 +381,10 @@ class TranscriptionService:
             return await self.get_transcription(project_id, user_id)
     
     @retry_database_operation(max_retries=3)
-    async def update_transcription_segment(self, project_id: str, segment_id: str, updated_segment: TranscriptSegment, user_id: str) -> Optional[TranscriptionDocument]:
-        """Update a specific transcription segment"""
-        with ErrorContext("update_transcription_segment", user_id) as ctx:
+    async def get_transcription_segments(self, project_id: str, user_id: str, start_time: float = 0.0,
+                                         end_time: Optional[float] = None) -> Optional[List[TranscriptSegment]]:
+        """Get only the segments overlapping [start_time, end_time) for a project"""
+        with ErrorContext("get_transcription_segments", user_id) as ctx:
             # Ensure collections are available
             await self._ensure_collections_async()
             
@@ -287,30 +396,223 @@ class TranscriptionService:
             if not project:
                 raise ValidationError(f"Project {project_id} not found or access denied")
             
-            # Update specific segment
-            result = await self.transcriptions_collection.update_one(
+            transcription_doc = await self.transcriptions_collection.find_one(
+                {"project_id": project_id},
+                projection={"project_id": 1, "segment_storage": 1, "segment_generation": 1, "max_segment_duration": 1}
+            )
+            
+            if not transcription_doc:
+                return None
+            
+            if transcription_doc.get("segment_storage"):
+                # A segment starting before (start_time - longest segment) cannot reach the window,
+                # so both bounds sit on the (project_id, start_time) index
+                start_bound = {"$gte": start_time - transcription_doc.get("max_segment_duration", 0.0)}
+                if end_time is not None:
+                    start_bound["$lt"] = end_time
+                segment_docs = await self._load_segments(self._segment_query(
+                    transcription_doc,
+                    start_time=start_bound,
+                    end_time={"$gt": start_time}
+                ))
+                return [TranscriptSegment(**segment_doc) for segment_doc in segment_docs]
+            
+            # Legacy embedded segments: filter server-side so only the window is transferred
+            conditions = [{"$gt": ["$$segment.end_time", start_time]}]
+            if end_time is not None:
+                conditions.append({"$lt": ["$$segment.start_time", end_time]})
+            pipeline = [
+                {"$match": {"project_id": project_id}},
+                {"$project": {
+                    "_id": 0,
+                    "segments": {"$filter": {
+                        "input": "$segments",
+                        "as": "segment",
+                        "cond": {"$and": conditions}
+                    }}
+                }}
+            ]
+            async for doc in self.transcriptions_collection.aggregate(pipeline):
+                return [TranscriptSegment(**segment) for segment in doc.get("segments", [])]
+            return []
+    
+    @retry_database_operation(max_retries=3)
+    async def get_transcript_words_in_range(self, project_id: str, user_id: str, start_time: float,
+                                            end_time: Optional[float] = None) -> Optional[List[TranscriptWord]]:
+        """Get the words overlapping [start_time, end_time) from the cached word index"""
+        with ErrorContext("get_transcript_words_in_range", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcriptions_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            word_index = await self._get_word_index(project_id)
+            if word_index is None:
+                return None
+            
+            return word_index.words_in_range(start_time, end_time)
+    
+    @retry_database_operation(max_retries=3)
+    async def get_transcript_words_by_id(self, project_id: str, word_ids: List[str], user_id: str) -> Optional[List[TranscriptWord]]:
+        """Resolve client word ids ("<start>-<end>") to words from the cached word index"""
+        with ErrorContext("get_transcript_words_by_id", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcriptions_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            word_index = await self._get_word_index(project_id)
+            if word_index is None:
+                return None
+            
+            return word_index.lookup_ids(word_ids)
+    
+    @retry_database_operation(max_retries=3)
+    async def search_transcripts(self, user_id: str, query: str, limit: int = 20,
+                                 project_id: Optional[str] = None) -> TranscriptSearchResults:
+        """Full-text search over segment text/edited_text across the user's projects"""
+        with ErrorContext("search_transcripts", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcription_segments_collection is None:
+                raise DatabaseError("Database not available")
+            
+            if not query.strip():
+                return TranscriptSearchResults(query=query, hits=[])
+            
+            # Restrict to projects the user owns or collaborates on
+            project_filter = {
+                "is_deleted": False,
+                "$or": [
+                    {"user_id": user_id},
+                    {"collaborators": user_id}
+                ]
+            }
+            if project_id:
+                project_filter["_id"] = ObjectId(project_id)
+            project_names = {}
+            async for project_doc in self.projects_collection.find(project_filter, projection={"name": 1}):
+                project_names[str(project_doc["_id"])] = project_doc.get("name")
+            
+            if not project_names:
+                return TranscriptSearchResults(query=query, hits=[])
+            
+            # Only each transcription's current segment generation, never a replace still in flight
+            current_generations = [
+                {"project_id": transcription_doc["project_id"], "generation": transcription_doc.get("segment_generation")}
+                async for transcription_doc in self.transcriptions_collection.find(
+                    {"project_id": {"$in": list(project_names)}, "segment_storage": True},
+                    projection={"_id": 0, "project_id": 1, "segment_generation": 1}
+                )
+            ]
+            if not current_generations:
+                return TranscriptSearchResults(query=query, hits=[])
+            
+            # The transcript_search text index is maintained by Mongo as segments are added, edited or deleted
+            cursor = self.transcription_segments_collection.find(
                 {
-                    "project_id": project_id,
-                    "segments.id": segment_id
+                    "$text": {"$search": query},
+                    "$or": current_generations
                 },
+                projection={
+                    "_id": 0,
+                    "id": 1,
+                    "project_id": 1,
+                    "start_time": 1,
+                    "end_time": 1,
+                    "text": 1,
+                    "edited_text": 1,
+                    "score": {"$meta": "textScore"}
+                }
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            
+            terms = self._search_terms(query)
+            hits = []
+            async for segment_doc in cursor:
+                text = segment_doc.get("edited_text") or segment_doc.get("text", "")
+                snippet, highlights = self._build_snippet(text, terms)
+                hits.append(TranscriptSearchHit(
+                    project_id=segment_doc["project_id"],
+                    project_name=project_names.get(segment_doc["project_id"]),
+                    segment_id=segment_doc["id"],
+                    start_time=segment_doc["start_time"],
+                    end_time=segment_doc["end_time"],
+                    snippet=snippet,
+                    highlights=highlights,
+                    score=segment_doc.get("score", 0.0)
+                ))
+            
+            return TranscriptSearchResults(query=query, hits=hits)
+    
+    @retry_database_operation(max_retries=3)
+    async def update_transcription_segment(self, project_id: str, segment_id: str, updated_segment: TranscriptSegment, user_id: str) -> Optional[TranscriptSegment]:
+        """Update a specific transcription segment and return just that segment"""
+        with ErrorContext("update_transcription_segment", user_id) as ctx:
+            # Ensure collections are available
+            await self._ensure_collections_async()
+            
+            if self.transcriptions_collection is None:
+                raise DatabaseError("Database not available")
+            
+            # Validate project access
+            project = await self._validate_project_access(project_id, user_id)
+            if not project:
+                raise ValidationError(f"Project {project_id} not found or access denied")
+            
+            segment_fields = {
+                "start_time": updated_segment.start_time,
+                "end_time": updated_segment.end_time,
+                "text": updated_segment.text,
+                # Words are stored once, in columnar form
+                "words_columnar": encode_words(updated_segment.words),
+                "speaker_id": updated_segment.speaker_id,
+                "confidence": updated_segment.confidence,
+                "is_edited": updated_segment.is_edited,
+                "edited_text": updated_segment.edited_text
+            }
+            
+            transcription_doc = await self._find_for_segment_write(project_id)
+            if not transcription_doc:
+                return None
+            
+            segment_doc = await self.transcription_segments_collection.find_one_and_update(
+                self._segment_query(transcription_doc, id=segment_id),
                 {
                     "$set": {
-                        "segments.$.start_time": updated_segment.start_time,
-                        "segments.$.end_time": updated_segment.end_time,
-                        "segments.$.text": updated_segment.text,
-                        "segments.$.words": [word.dict() for word in updated_segment.words],
-                        "segments.$.speaker_id": updated_segment.speaker_id,
-                        "segments.$.confidence": updated_segment.confidence,
-                        "segments.$.is_edited": updated_segment.is_edited,
-                        "segments.$.edited_text": updated_segment.edited_text,
-                        "updated_at": datetime.now(),
-                        "is_edited": True
-                    }
+                        **segment_fields,
+                        "updated_at": datetime.now()
+                    },
+                    "$unset": {"words": ""}
+                },
+                projection=self.SEGMENT_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+            if not segment_doc:
+                return None
+            segment_doc = self._segment_from_document(segment_doc)
+            
+            await self.transcriptions_collection.update_one(
+                {"project_id": project_id},
+                {
+                    "$set": {"updated_at": datetime.now(), "is_edited": True},
+                    "$max": {"max_segment_duration": updated_segment.end_time - updated_segment.start_time}
                 }
             )
             
-            if result.modified_count == 0:
-                raise OperationError("Failed to update transcription segment")
+            transcript_index_cache.invalidate(project_id)
             
             # Create audit log
             await self._create_audit_log(
@@ -325,11 +627,11 @@ class TranscriptionService:
             )
             
             logger.info(f"Updated segment {segment_id} in transcription for project {project_id}")
-            return await self.get_transcription(project_id, user_id)
+            return TranscriptSegment(**segment_doc)
     
     @retry_database_operation(max_retries=3)
-    async def delete_transcription_segment(self, project_id: str, segment_id: str, user_id: str) -> Optional[TranscriptionDocument]:
-        """Delete a specific transcription segment"""
+    async def delete_transcription_segment(self, project_id: str, segment_id: str, user_id: str) -> Optional[TranscriptSegment]:
+        """Delete a specific transcription segment and return the removed segment"""
         with ErrorContext("delete_transcription_segment", user_id) as ctx:
             # Ensure collections are available
             await self._ensure_collections_async()
@@ -342,20 +644,24 @@ class TranscriptionService:
             if not project:
                 raise ValidationError(f"Project {project_id} not found or access denied")
             
-            # Remove specific segment
-            result = await self.transcriptions_collection.update_one(
+            transcription_doc = await self._find_for_segment_write(project_id)
+            if not transcription_doc:
+                return None
+            
+            segment_doc = await self.transcription_segments_collection.find_one_and_delete(
+                self._segment_query(transcription_doc, id=segment_id),
+                projection=self.SEGMENT_PROJECTION
+            )
+            if not segment_doc:
+                return None
+            segment_doc = self._segment_from_document(segment_doc)
+            
+            await self.transcriptions_collection.update_one(
                 {"project_id": project_id},
-                {
-                    "$pull": {"segments": {"id": segment_id}},
-                    "$set": {
-                        "updated_at": datetime.now(),
-                        "is_edited": True
-                    }
-                }
+                {"$set": {"updated_at": datetime.now(), "is_edited": True}}
             )
             
-            if result.modified_count == 0:
-                raise OperationError("Failed to delete transcription segment")
+            transcript_index_cache.invalidate(project_id)
             
             # Create audit log
             await self._create_audit_log(
@@ -370,7 +676,7 @@ class TranscriptionService:
             )
             
             logger.info(f"Deleted segment {segment_id} from transcription for project {project_id}")
-            return await self.get_transcription(project_id, user_id)
+            return TranscriptSegment(**segment_doc)
     
     @retry_database_operation(max_retries=3)
     async def set_transcription_metadata(self, project_id: str, metadata: Dict[str, Any], user_id: str) -> Optional[TranscriptionDocument]:
@@ -457,6 +763,10 @@ class TranscriptionService:
             if result.deleted_count == 0:
                 raise OperationError("Failed to delete transcription")
             
+            if self.transcription_segments_collection is not None:
+                await self.transcription_segments_collection.delete_many({"project_id": project_id})
+            transcript_index_cache.invalidate(project_id)
+            
             # Create audit log
             await self._create_audit_log(
                 user_id=user_id,
@@ -469,6 +779,177 @@ class TranscriptionService:
             logger.info(f"Deleted transcription for project {project_id}")
             return True
     
+    async def _get_word_index(self, project_id: str) -> Optional[TranscriptWordIndex]:
+        """Word index for a project, built on first access and reused until the transcription changes"""
+        transcription_doc = await self.transcriptions_collection.find_one(
+            {"project_id": project_id},
+            projection={"project_id": 1, "segment_storage": 1, "segment_generation": 1, "updated_at": 1}
+        )
+        if not transcription_doc:
+            return None
+        
+        version_key = transcription_doc.get("updated_at")
+        word_index = transcript_index_cache.get(project_id, version_key)
+        if word_index is not None:
+            return word_index
+        
+        if transcription_doc.get("segment_storage"):
+            cursor = self.transcription_segments_collection.find(
+                self._segment_query(transcription_doc),
+                projection={"_id": 0, "words": 1, "words_columnar": 1}
+            ).sort("start_time", 1)
+            segment_docs = await cursor.to_list(length=None)
+        else:
+            full_doc = await self.transcriptions_collection.find_one(
+                {"project_id": project_id},
+                projection={"_id": 0, "segments.words": 1}
+            )
+            segment_docs = (full_doc or {}).get("segments", [])
+        
+        # Columnar segments are concatenated without creating word objects
+        columns = []
+        for segment_doc in segment_docs:
+            if "words_columnar" in segment_doc:
+                columns.append(ColumnarWords.from_document(segment_doc["words_columnar"]))
+            else:
+                columns.append(ColumnarWords.from_words([TranscriptWord(**word) for word in segment_doc.get("words", [])]))
+        word_index = TranscriptWordIndex.from_columns(ColumnarWords.concat(columns))
+        transcript_index_cache.put(project_id, version_key, word_index)
+        logger.info(f"Built word index for project {project_id} ({len(word_index)} words)")
+        return word_index
+    
+    async def _load_segments(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Load segment documents matching a query, ordered by start time"""
+        cursor = self.transcription_segments_collection.find(
+            query,
+            projection=self.SEGMENT_PROJECTION
+        ).sort("start_time", 1)
+        return [self._segment_from_document(segment_doc) for segment_doc in await cursor.to_list(length=None)]
+    
+    def _segment_from_document(self, segment_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Expand columnar words of a stored segment; segments written before columnar storage keep their word list"""
+        columnar = segment_doc.pop("words_columnar", None)
+        if columnar is not None:
+            segment_doc["words"] = ColumnarWords.from_document(columnar).to_dicts()
+        return segment_doc
+    
+    def _segment_to_document(self, segment: TranscriptSegment, transcription_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the stored document for a single segment, with words in columnar form"""
+        segment_doc = segment.dict(exclude={"words"})
+        segment_doc["words_columnar"] = encode_words(segment.words)
+        segment_doc.update({
+            "project_id": transcription_doc["project_id"],
+            "transcription_id": str(transcription_doc["_id"]),
+            "generation": transcription_doc.get("segment_generation"),
+            "created_at": datetime.now(),
+            "updated_at": datetime.now()
+        })
+        return segment_doc
+    
+    def _max_segment_duration(self, segments: List[TranscriptSegment]) -> float:
+        """Longest segment duration, used to bound time-range index scans"""
+        return max((segment.end_time - segment.start_time for segment in segments), default=0.0)
+    
+    def _segment_query(self, transcription_doc: Dict[str, Any], **conditions) -> Dict[str, Any]:
+        """Query for the transcription's current segment generation (segments written before generations have none)"""
+        return {
+            "project_id": transcription_doc["project_id"],
+            "generation": transcription_doc.get("segment_generation"),
+            **conditions
+        }
+    
+    async def _replace_segments(self, transcription_doc: Dict[str, Any], segments: List[TranscriptSegment],
+                                fields: Optional[Dict[str, Any]] = None):
+        """Replace all stored segments for a transcription, setting `fields` on it in the same switch.
+        
+        The new set is inserted under a fresh generation and the transcription is switched to it only if
+        nobody else switched first; the old generation is deleted last, so a failed or losing replace
+        leaves the previous segments in place.
+        """
+        segment_ids = [segment.id for segment in segments]
+        if len(set(segment_ids)) != len(segment_ids):
+            duplicates = sorted({segment_id for segment_id in segment_ids if segment_ids.count(segment_id) > 1})
+            raise ValidationError(f"Duplicate segment ids: {', '.join(duplicates)}")
+        
+        project_id = transcription_doc["project_id"]
+        old_generation = transcription_doc.get("segment_generation")
+        new_generation = uuid.uuid4().hex
+        staged = {**transcription_doc, "segment_generation": new_generation}
+        try:
+            if segments:
+                await self.transcription_segments_collection.insert_many([
+                    self._segment_to_document(segment, staged) for segment in segments
+                ])
+            result = await self.transcriptions_collection.update_one(
+                {"_id": transcription_doc["_id"], "segment_generation": old_generation},
+                {"$set": {**(fields or {}), "segment_generation": new_generation}}
+            )
+        except Exception:
+            await self.transcription_segments_collection.delete_many({"project_id": project_id, "generation": new_generation})
+            raise
+        if result.matched_count == 0:
+            await self.transcription_segments_collection.delete_many({"project_id": project_id, "generation": new_generation})
+            raise OperationError("Transcription segments changed concurrently; reload and retry")
+        
+        await self.transcription_segments_collection.delete_many({"project_id": project_id, "generation": old_generation})
+        transcription_doc["segment_generation"] = new_generation
+    
+    async def _find_for_segment_write(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Transcription about to have a segment written, moved to segment storage first if still legacy"""
+        transcription_doc = await self.transcriptions_collection.find_one(
+            {"project_id": project_id},
+            projection={"project_id": 1, "segment_storage": 1, "segment_generation": 1, "segments": 1}
+        )
+        if transcription_doc and not transcription_doc.get("segment_storage"):
+            transcription_doc = await self._migrate_to_segment_storage(transcription_doc)
+        return transcription_doc
+    
+    async def _migrate_to_segment_storage(self, transcription_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Move embedded segments of a legacy transcription into the segments collection"""
+        segments = [TranscriptSegment(**segment) for segment in transcription_doc.get("segments", [])]
+        await self._replace_segments(
+            transcription_doc, segments,
+            {"segment_storage": True, "max_segment_duration": self._max_segment_duration(segments)}
+        )
+        
+        await self.transcriptions_collection.update_one(
+            {"_id": transcription_doc["_id"]},
+            {"$unset": {"segments": ""}}
+        )
+        
+        logger.info(f"Migrated {len(segments)} embedded segments for project {transcription_doc['project_id']}")
+        transcription_doc.pop("segments", None)
+        transcription_doc["segment_storage"] = True
+        return transcription_doc
+    
+    def _search_terms(self, query: str) -> List[str]:
+        """Positive terms of a $text query, used to highlight snippets"""
+        return [
+            term.strip('"').lower()
+            for term in query.split()
+            if term.strip('"') and not term.startswith("-")
+        ]
+    
+    def _build_snippet(self, text: str, terms: List[str], radius: int = 60) -> Tuple[str, List[List[int]]]:
+        """Cut a snippet around the first matching term and return highlight offsets within it"""
+        if not terms:
+            return text[:radius * 2], []
+        
+        # Prefix match so stemmed hits ("editing" for "edit") are highlighted too
+        pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+        matches = list(pattern.finditer(text))
+        if not matches:
+            return text[:radius * 2], []
+        
+        start = max(0, matches[0].start() - radius)
+        end = min(len(text), matches[0].end() + radius)
+        highlights = [
+            [match.start() - start, match.end() - start]
+            for match in matches
+            if match.start() >= start and match.end() <= end
+        ]
+        return text[start:end], highlights
+    
     async def _validate_project_access(self, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Validate that user has access to project"""
         if self.projects_collection is None:
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the token and user auth caches
+"""
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mongomock
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import services.database as database_module
+from mongomock_async import AsyncDatabase
+from middleware.auth_middleware import AuthMiddleware
+from services.auth_cache import TokenCache, token_cache, user_cache
+from services.auth_service import auth_service
+from services.email_service import email_service
+from services.jwt_service import jwt_service
+
+
+async def current_user(token: str):
+    """Resolve a bearer token the way protected routes do"""
+    return await AuthMiddleware.get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+
+async def check_user_changes(database):
+    """Role, status and password changes must not wait for the user cache TTL"""
+    user_id = str(database.users.insert_one({
+        "email": "cache_test@example.com",
+        "email_lower": "cache_test@example.com",
+        "name": "Cache Test User",
+        "role": "user",
+        "status": "active",
+        "auth_provider": "email",
+        "password_hash": await auth_service.hash_password("old-password-1"),
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }).inserted_id)
+    token = jwt_service.create_access_token({"sub": user_id, "email": "cache_test@example.com", "role": "user"})
+
+    # Test that the user is served from the cache once loaded
+    print("👤 Testing cached user lookups...")
+    assert (await current_user(token)).role == "user"
+    hits = user_cache.hits
+    await current_user(token)
+    assert user_cache.hits == hits + 1
+    print(f"✅ Second lookup served from the cache (ttl {user_cache.ttl_seconds}s)")
+
+    # Test that a role change is visible immediately
+    print("🛡️ Testing role change within the TTL...")
+    await auth_service.update_user(user_id, {"role": "admin"})
+    assert (await current_user(token)).role == "admin"
+    print("✅ Role change visible on the next request")
+
+    # Test that suspending the user locks them out immediately
+    print("⛔ Testing status change within the TTL...")
+    await auth_service.update_user(user_id, {"status": "suspended"})
+    try:
+        await current_user(token)
+        raise AssertionError("suspended user was still served from the cache")
+    except HTTPException as e:
+        assert e.status_code in (401, 403), e.status_code
+    await auth_service.update_user(user_id, {"status": "active"})
+    print("✅ Suspended user rejected on the next request")
+
+    # Test that a password change drops the cached user and only the new password logs in
+    print("🔑 Testing password change within the TTL...")
+    await current_user(token)
+    assert user_cache.get(user_id) is not None
+    assert await auth_service.change_password(user_id, "old-password-1", "new-password-2")
+    assert user_cache.get(user_id) is None
+    assert await auth_service.authenticate_user("cache_test@example.com", "old-password-1") is None
+    assert await auth_service.authenticate_user("cache_test@example.com", "new-password-2") is not None
+    print("✅ Password change invalidated the cached user; the old password is rejected")
+
+    # Test that email verification and password resets drop the cached user too
+    print("📧 Testing email verification and password reset within the TTL...")
+    database.users.update_one({"_id": ObjectId(user_id)}, {"$set": {
+        "is_email_verified": False, "email_verification_token": "verify-token-1"
+    }})
+    await current_user(token)
+    assert user_cache.get(user_id) is not None
+    assert await email_service.verify_email_token("verify-token-1") is not None
+    assert user_cache.get(user_id) is None
+    assert (await current_user(token)).is_email_verified
+    reset_token = await email_service.generate_password_reset_token("cache_test@example.com")
+    assert reset_token and user_cache.get(user_id) is None
+    await current_user(token)
+    assert await email_service.reset_password_with_token(reset_token, "Reset-Passw0rd-3!") is not None
+    assert user_cache.get(user_id) is None
+    assert await auth_service.authenticate_user("cache_test@example.com", "new-password-2") is None
+    print("✅ Verification and reset invalidated the cached user; the pre-reset password is rejected")
+
+
+def check_token_expiry():
+    """A cached token must stop verifying once its exp claim passes"""
+    print("⏱️ Testing expired token eviction...")
+    token = jwt_service.create_access_token({"sub": "user_1"}, expires_delta=timedelta(seconds=1))
+    assert jwt_service.verify_access_token(token) is not None
+    hits = token_cache.hits
+    assert jwt_service.verify_access_token(token) is not None
+    assert token_cache.hits == hits + 1
+    time.sleep(2.1)
+    assert jwt_service.verify_access_token(token) is None
+    assert token_cache.hits == hits + 1
+    print("✅ Expired token rejected instead of served from the cache")
+
+    cache = TokenCache()
+    cache.put("stale", {"sub": "user_1", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "user_1"})
+    assert cache.get("stale") is None and cache.get("no-exp") is None
+    assert cache.get_stats()["entries"] == 0
+    print("✅ Payloads already expired or without exp are never served")
+
+
+def test_auth_cache():
+    """Test that the auth caches never serve stale users or expired tokens"""
+    print("🚀 Testing Auth Cache...")
+
+    original_db = database_module.async_db
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+        user_cache.clear()
+        token_cache.clear()
+
+        asyncio.run(check_user_changes(database))
+        check_token_expiry()
+
+        print("✅ All auth cache tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Auth cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db = original_db
+        user_cache.clear()
+        token_cache.clear()
+
+
+if __name__ == "__main__":
+    test_auth_cache()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for columnar transcript word storage
+"""
+import sys
+import os
+import time
+import random
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bson import encode, decode
+
+from models.schemas import TranscriptWord
+from services.columnar_words import ColumnarWords, encode_words, decode_words
+
+
+def make_words(count):
+    vocabulary = "we were going to the store um and then it was café ✨ good".split()
+    words, t = [], 0.0
+    for _ in range(count):
+        words.append(TranscriptWord(
+            text=random.choice(vocabulary),
+            start=round(t, 2),
+            end=round(t + 0.2, 2),
+            confidence=round(random.random(), 4),
+            is_filler=random.random() < 0.1,
+            speaker_id=random.choice([None, "speaker_1", "speaker_2"])
+        ))
+        t += 0.31
+    return words
+
+
+def test_columnar_words():
+    """Test columnar word encoding functionality"""
+    print("🚀 Testing Columnar Word Storage...")
+    
+    try:
+        words = make_words(20000)
+        
+        # Test round trip through BSON
+        print("🔁 Testing BSON round trip...")
+        stored = decode(encode({"words_columnar": encode_words(words)}))["words_columnar"]
+        view = decode_words(stored)
+        if len(view) == len(words) and view[123].dict() == words[123].dict() and \
+                all(a.dict() == b.dict() for a, b in zip(view.to_list(), words)):
+            print(f"✅ Round trip preserved {len(view)} words")
+        else:
+            print("❌ Round trip changed word data")
+        
+        # Test concatenation with speaker re-mapping
+        print("🧩 Testing concatenation...")
+        merged = ColumnarWords.concat([ColumnarWords.from_words(words[:10]), ColumnarWords.from_words(words[10:20])])
+        if [word.dict() for word in merged] == [word.dict() for word in words[:20]]:
+            print("✅ Concatenated columns match the source words")
+        else:
+            print("❌ Concatenated columns do not match")
+        
+        # Compare document size and decode time against per-word subdocuments
+        print("📏 Comparing against per-word subdocuments...")
+        row_bytes = encode({"words": [word.dict() for word in words]})
+        column_bytes = encode({"words_columnar": encode_words(words)})
+        
+        started = time.perf_counter()
+        [TranscriptWord(**word) for word in decode(row_bytes)["words"]]
+        row_ms = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        decode_words(decode(column_bytes)["words_columnar"])
+        column_ms = (time.perf_counter() - started) * 1000
+        
+        print(f"✅ BSON size {len(row_bytes)} -> {len(column_bytes)} bytes "
+              f"({len(row_bytes) / len(column_bytes):.1f}x), load {row_ms:.1f}ms -> {column_ms:.2f}ms")
+        
+        print("✅ All columnar word storage tests completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Columnar word storage test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_columnar_words()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for response compression and conditional GET
+"""
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from middleware.compression import setup_compression
+from utils.conditional import etag_matches, make_etag, not_modified, set_etag
+
+ETAG = make_etag("project_1", 7)
+
+
+def create_test_app() -> FastAPI:
+    """Routes shaped like the project/timeline/transcription GETs, behind the compression middleware"""
+    app = FastAPI()
+    setup_compression(app, minimum_size=1024)
+
+    @app.get("/large")
+    async def large(request: Request):
+        if etag_matches(request.headers.get("if-none-match"), ETAG):
+            return not_modified(ETAG)
+        return set_etag(JSONResponse({"segments": ["hello world"] * 200}), ETAG)
+
+    @app.get("/small")
+    async def small(request: Request):
+        if etag_matches(request.headers.get("if-none-match"), ETAG):
+            return not_modified(ETAG)
+        return set_etag(JSONResponse({"id": "project_1"}), ETAG)
+
+    return app
+
+
+def test_conditional_requests():
+    """Test that encoded responses get their own ETag and revalidate to a 304 carrying it"""
+    print("🚀 Testing Compression and Conditional GET...")
+
+    try:
+        client = TestClient(create_test_app())
+
+        # Test that compressed representations get a per-encoding strong ETag
+        print("🗜️ Testing compressed responses...")
+        identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert identity.headers["etag"] == ETAG, identity.headers
+        assert "content-encoding" not in identity.headers
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["etag"] == f'{ETAG[:-1]}-gzip"', gzipped.headers
+        assert gzipped.json() == identity.json()
+        assert "Accept-Encoding" in gzipped.headers["vary"]
+        print(f"✅ Identity ETag {identity.headers['etag']}, gzip ETag {gzipped.headers['etag']}")
+
+        # Test revalidating the encoded representation
+        print("🔁 Testing conditional GET of the gzip variant...")
+        revalidated = client.get("/large", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+        assert revalidated.status_code == 304, revalidated.status_code
+        assert revalidated.headers["etag"] == gzipped.headers["etag"], revalidated.headers
+        assert "Accept-Encoding" in revalidated.headers["vary"]
+        assert revalidated.content == b""
+        print(f"✅ 304 carries the variant ETag {revalidated.headers['etag']}")
+
+        # Test revalidating the uncompressed representation
+        print("🔁 Testing conditional GET of the identity representation...")
+        revalidated = client.get("/large", headers={"Accept-Encoding": "identity", "If-None-Match": ETAG})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == ETAG
+        # Bodies under the size threshold are never compressed, so their ETag stays unsuffixed
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers and small.headers["etag"] == ETAG
+        revalidated = client.get("/small", headers={"Accept-Encoding": "gzip", "If-None-Match": ETAG})
+        assert revalidated.status_code == 304 and revalidated.headers["etag"] == ETAG, revalidated.headers
+        print("✅ Unencoded representations revalidate with the plain ETag")
+
+        # Test ETag comparison
+        print("🔍 Testing If-None-Match matching...")
+        assert etag_matches(f'"other", {ETAG[:-1]}-br"', ETAG)
+        assert etag_matches(f"W/{ETAG}", ETAG)
+        assert etag_matches("*", ETAG)
+        assert not etag_matches('"other"', ETAG)
+        assert client.get("/large", headers={"If-None-Match": '"stale-gzip"'}).status_code == 200
+        print("✅ Suffixed, weak and wildcard validators match; stale ones do not")
+
+        print("✅ All compression and conditional GET tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Conditional request test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_conditional_requests()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for MongoDB command monitoring
+"""
+import sys
+import os
+from datetime import timedelta
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo import monitoring
+
+from services.db_monitoring import CommandMonitor, filter_shape
+from utils.error_handlers import ErrorContext
+
+
+def run_command(monitor, request_id, command, reply, duration_ms):
+    """Feed the listener the same events pymongo emits for one command"""
+    command_name = next(iter(command))
+    monitor.started(monitoring.CommandStartedEvent(command, "snipix", request_id, ("localhost", 27017), request_id))
+    monitor.succeeded(monitoring.CommandSucceededEvent(
+        timedelta(milliseconds=duration_ms), reply, command_name, request_id, ("localhost", 27017), request_id
+    ))
+
+
+def test_db_monitoring():
+    """Test latency stats, operation attribution and slow-query capture"""
+    print("🚀 Testing MongoDB Command Monitoring...")
+
+    try:
+        monitor = CommandMonitor(slow_query_ms=50)
+        monitor.reset()
+
+        # Test latency and document stats
+        print("⏱️ Testing per-collection command stats...")
+        with ErrorContext("get_project_segments", "user-1"):
+            for i in range(10):
+                run_command(
+                    monitor, i,
+                    {"find": "transcription_segments", "filter": {"project_id": "p1", "start_time": {"$gte": i}}},
+                    {"cursor": {"firstBatch": [{}] * 20, "id": 0}, "ok": 1}, 2
+                )
+        run_command(monitor, 100, {"update": "projects", "updates": [{"q": {"_id": "x"}, "u": {"$set": {"a": 1}}}]},
+                    {"n": 1, "nModified": 1, "ok": 1}, 3)
+        stats = monitor.get_command_stats()
+        segments = stats["transcription_segments.find"]
+        assert segments["count"] == 10 and segments["documents"] == 200, segments
+        assert stats["projects.update"]["documents"] == 1
+        print(f"✅ {segments['count']} finds, {segments['documents']} docs, p95 {segments['p95_ms']}ms")
+
+        # Test operation attribution
+        print("🏷️ Testing operation attribution...")
+        operations = {entry["operation"]: entry for entry in monitor.get_operation_stats()}
+        assert operations["get_project_segments"]["commands"] == {"transcription_segments.find": 10}
+        assert "__none__" in operations
+        print(f"✅ Commands attributed to {sorted(operations)}")
+
+        # Test slow query capture
+        print("🐢 Testing slow-query log...")
+        run_command(
+            monitor, 200,
+            {"aggregate": "projects", "pipeline": [{"$match": {"user_id": "secret", "tags": {"$in": ["a", "b"]}}}]},
+            {"cursor": {"firstBatch": [{}] * 3, "id": 0}, "ok": 1}, 120
+        )
+        slow = monitor.get_slow_queries()
+        assert len(slow) == 1
+        assert slow[0]["filter_shape"] == {"$match": {"user_id": "?", "tags": {"$in": ["?"]}}}, slow[0]
+        assert slow[0]["documents"] == 3
+        assert "secret" not in str(slow)
+        assert filter_shape({"$or": [{"a": 1}, {"b": 2}]}) == {"$or": [{"a": "?"}, {"b": "?"}]}
+        print(f"✅ Slow query recorded without values: {slow[0]['filter_shape']}")
+
+        print("✅ All command monitoring tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Command monitoring test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_db_monitoring()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the filler/disfluency detector
+"""
+import sys
+import os
+import time
+import random
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.schemas import TranscriptWord, FillerLexicon
+from services.disfluency_detector import DisfluencyDetector
+
+
+def make_word(text, start, end, confidence=0.9):
+    return TranscriptWord(text=text, start=start, end=end, confidence=confidence)
+
+
+def test_disfluency_detector():
+    """Test disfluency detection functionality"""
+    print("🚀 Testing Disfluency Detector...")
+    
+    try:
+        words = [
+            make_word("Um,", 0.0, 0.3), make_word("you", 0.4, 0.5), make_word("know", 0.5, 0.7),
+            make_word("I", 0.8, 0.9), make_word("like", 0.9, 1.1), make_word("it.", 1.1, 1.3),
+            make_word("the", 2.5, 2.6), make_word("the", 2.6, 2.7), make_word("w-", 2.8, 2.9),
+            make_word("way", 2.9, 3.1), make_word("I", 3.2, 3.3), make_word("was", 3.3, 3.4),
+            make_word("I", 3.4, 3.5), make_word("was", 3.5, 3.6), make_word("going", 3.6, 3.9)
+        ]
+        
+        # Test default lexicon
+        print("🔎 Testing default detection...")
+        report = DisfluencyDetector().detect(words)
+        flagged = [word.text for word in report.words if word.is_filler]
+        events = [(event.type, event.text) for event in report.events]
+        expected = [
+            ("filler", "Um,"), ("filler", "you know"), ("pause", ""), ("repetition", "the"),
+            ("stutter", "w-"), ("repetition", "I was")
+        ]
+        if events == expected and "like" not in flagged:
+            print(f"✅ Detected {report.counts} (multi-word filler matched, 'I like it' left alone)")
+        else:
+            print(f"❌ Unexpected events: {events}")
+        
+        # Test contextual fillers at the utterance edges
+        print("🧭 Testing contextual fillers at the start and end...")
+        edges = [make_word("So", 0.0, 0.2), make_word("I", 0.25, 0.3), make_word("think", 0.3, 0.5),
+                 make_word("so", 0.55, 0.7)]
+        paused = [make_word("So", 0.0, 0.2), make_word("I", 1.0, 1.1), make_word("think", 1.1, 1.3)]
+        edge_flagged = [word.text for word in DisfluencyDetector().detect(edges).words if word.is_filler]
+        paused_flagged = [word.text for word in DisfluencyDetector().detect(paused).words if word.is_filler]
+        if edge_flagged == [] and paused_flagged == ["So"]:
+            print("✅ Contextual fillers at the edges need a pause on their other side")
+        else:
+            print(f"❌ Unexpected edge fillers: {edge_flagged} / {paused_flagged}")
+        
+        # Test a per-user lexicon
+        print("📚 Testing custom lexicon...")
+        lexicon = FillerLexicon(fillers=["i like"], contextual_fillers=[])
+        custom = DisfluencyDetector(lexicon).detect(words)
+        if any(event.text == "I like" for event in custom.events):
+            print("✅ Custom lexicon phrase detected")
+        else:
+            print("❌ Custom lexicon phrase not detected")
+        
+        # Test performance on a long transcript
+        print("⏱️ Testing 20k-word transcript...")
+        vocabulary = "we were going to the store and then it was um a good day you know".split()
+        long_words, t = [], 0.0
+        for _ in range(20000):
+            long_words.append(make_word(random.choice(vocabulary), t, t + 0.2))
+            t += 0.2 + random.choice([0.05] * 20 + [1.2])
+        detector = DisfluencyDetector()
+        started = time.perf_counter()
+        long_report = detector.detect(long_words)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"✅ Processed {len(long_words)} words in {elapsed_ms:.1f}ms: {long_report.counts}")
+        
+        print("✅ All disfluency detector tests completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Disfluency detector test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_disfluency_detector()
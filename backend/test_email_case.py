@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for case-insensitive email login and registration
+"""
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mongomock
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+import services.database as database_module
+from mongomock_async import AsyncDatabase
+from models.user_schemas import UserCreate
+from services.auth_service import auth_service
+from utils.email_utils import email_query, normalize_email
+
+PASSWORD = "Case-Test-Passw0rd!"
+
+
+def registration(email: str) -> UserCreate:
+    return UserCreate(email=email, name="Case Test User", password=PASSWORD, confirm_password=PASSWORD)
+
+
+async def check_email_case(database):
+    # Same unique sparse index services.database creates on startup
+    database.users.create_index("email", unique=True)
+    database.users.create_index("email_lower", unique=True, sparse=True)
+
+    # Test the normalized lookup
+    print("🔡 Testing email normalization...")
+    assert normalize_email("  Mixed.Case@Example.COM ") == "mixed.case@example.com"
+    assert email_query("Mixed.Case@Example.COM") == {
+        "$or": [{"email_lower": "mixed.case@example.com"}, {"email": "Mixed.Case@Example.COM"}]
+    }
+    print("✅ Emails normalize to trimmed lowercase")
+
+    # Test logging in with a different case than the one registered
+    print("🔑 Testing mixed-case login...")
+    user, error = await auth_service.create_user(registration("Mixed.Case@Example.com"))
+    assert user is not None, error
+    stored = database.users.find_one({"_id": ObjectId(user.id)})
+    assert stored["email_lower"] == "mixed.case@example.com", stored
+    for login_email in ("mixed.case@example.com", "MIXED.CASE@EXAMPLE.COM", " Mixed.Case@example.com "):
+        logged_in = await auth_service.authenticate_user(login_email, PASSWORD)
+        assert logged_in is not None and logged_in.id == user.id, login_email
+    assert await auth_service.authenticate_user("MIXED.CASE@EXAMPLE.COM", "Wrong-Passw0rd!") is None
+    print("✅ Login succeeds whatever the case of the email")
+
+    # Users created before email_lower was backfilled still log in by their exact email
+    database.users.insert_one({
+        "email": "Legacy@Example.com", "name": "Legacy User", "status": "active",
+        "password_hash": await auth_service.hash_password(PASSWORD)
+    })
+    assert await auth_service.authenticate_user("Legacy@Example.com", PASSWORD) is not None
+    print("✅ Users without email_lower log in with their exact email")
+
+    # Test registering an email that differs only by case
+    print("🚫 Testing case-only duplicate registration...")
+    duplicate, error = await auth_service.create_user(registration("MIXED.CASE@example.com"))
+    assert duplicate is None and "already exists" in error, error
+    assert database.users.count_documents({"email_lower": "mixed.case@example.com"}) == 1
+    print(f"✅ Registration rejected: {error}")
+
+    # A registration racing past the lookup is stopped by the unique index
+    try:
+        database.users.insert_one({"email": "mixed.CASE@example.com", "email_lower": "mixed.case@example.com"})
+        raise AssertionError("unique email_lower index accepted a case-only duplicate")
+    except DuplicateKeyError:
+        pass
+    print("✅ Unique email_lower index rejects case-only duplicates")
+
+
+def test_email_case():
+    """Test case-insensitive login and case-only duplicate registrations"""
+    print("🚀 Testing Email Case Handling...")
+
+    original_db = database_module.async_db
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+
+        asyncio.run(check_email_case(database))
+
+        print("✅ All email case tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Email case test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db = original_db
+
+
+if __name__ == "__main__":
+    test_email_case()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for pooled SMTP delivery and cached email templates
+"""
+import sys
+import os
+import time
+import socketserver
+import threading
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.email_outbox import SMTPConnectionPool, EmailOutbox, build_message
+from services.email_templates import EmailTemplateCache
+
+
+class LocalSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP stand-in: accepts everything and records messages"""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost test SMTP")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline().decode()
+                    if data_line in (".\r\n", ".\n"):
+                        break
+                    lines.append(data_line)
+                self.server.messages.append("".join(lines))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def start_local_smtp():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), LocalSMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_email_outbox():
+    """Test connection reuse, message building, templates and backoff"""
+    print("🚀 Testing Email Outbox...")
+
+    try:
+        smtp = start_local_smtp()
+        port = smtp.server_address[1]
+
+        # Test connection reuse
+        print("📨 Testing pooled SMTP delivery...")
+        pool = SMTPConnectionPool("127.0.0.1", port, None, None, use_tls=False, max_size=1)
+        started = time.perf_counter()
+        for i in range(20):
+            message = build_message("noreply@snipix.test", "user@example.com", f"Hello {i}", f"<p>{i}</p>", f"{i}")
+            pool.send("noreply@snipix.test", "user@example.com", message)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert len(smtp.messages) == 20, len(smtp.messages)
+        assert smtp.connections == 1, smtp.connections
+        assert pool.get_stats()["connections_opened"] == 1
+        print(f"✅ 20 emails over {smtp.connections} connection in {elapsed_ms:.1f}ms")
+
+        # Test stale connections are replaced
+        pool.idle_timeout = 0.0
+        time.sleep(0.01)
+        pool.send("noreply@snipix.test", "user@example.com", build_message("a@b.c", "d@e.f", "s", "<p>h</p>"))
+        assert pool.get_stats()["connections_opened"] == 2
+        pool.close()
+        print("✅ Idle connections are recycled")
+
+        # Test templates
+        print("📝 Testing cached templates...")
+        templates = EmailTemplateCache("Snipix", "http://localhost:3000")
+        rendered = templates.render("verification", name="<Ann>", url="http://localhost:3000/verify-email?token=abc")
+        assert rendered.subject == "Verify your Snipix account"
+        assert "Hi &lt;Ann&gt;," in rendered.html_content
+        assert "Hi <Ann>," in rendered.text_content
+        assert "verify-email?token=abc" in rendered.html_content
+        assert "$" not in rendered.html_content and "$" not in rendered.text_content
+        welcome = templates.render("welcome", name="Ann")
+        assert "http://localhost:3000/dashboard" in welcome.html_content
+        started = time.perf_counter()
+        for _ in range(1000):
+            templates.render("password_reset", name="Ann", url="http://localhost:3000/reset-password?token=x")
+        print(f"✅ Templates render and escape correctly ({(time.perf_counter() - started):.3f}ms per render)")
+
+        # Test backoff schedule
+        outbox = EmailOutbox(pool, "noreply@snipix.test", base_backoff_seconds=30, max_backoff_seconds=600)
+        assert [outbox.backoff_seconds(n) for n in range(1, 7)] == [30, 60, 120, 240, 480, 600]
+        print("✅ Backoff doubles up to the cap")
+
+        smtp.shutdown()
+        print("✅ All email outbox tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Email outbox test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_email_outbox()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for saving a user's filler lexicon and using it in transcription
+"""
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mongomock
+
+import services.database as database_module
+from api.media import get_filler_lexicon, update_filler_lexicon
+from models.schemas import FillerLexicon, TranscriptWord
+from mongomock_async import AsyncDatabase
+from services.auth_cache import user_cache
+from services.media_service import media_service
+
+
+def make_word(text, start, end, confidence=0.9):
+    return TranscriptWord(text=text, start=start, end=end, confidence=confidence)
+
+
+def test_filler_lexicon():
+    """Test that a saved lexicon reads back and drives detection"""
+    print("🚀 Testing Filler Lexicon...")
+
+    original_db = database_module.async_db
+    try:
+        database_module.async_db = AsyncDatabase(mongomock.MongoClient().snipix_test)
+        user_cache.clear()
+        asyncio.run(run_lexicon_checks())
+        print("✅ All filler lexicon tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Filler lexicon test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db = original_db
+
+
+async def run_lexicon_checks():
+    now = datetime.utcnow()
+    # Users are stored with ObjectId keys while tokens carry the id as a string
+    result = await database_module.async_db.users.insert_one({
+        "email": "lexicon@example.com", "name": "Lexicon User", "preferences": {},
+        "created_at": now, "updated_at": now
+    })
+    user_id = str(result.inserted_id)
+
+    # Test the default lexicon before anything is saved
+    print("📚 Testing default lexicon...")
+    default = (await get_filler_lexicon(user_id=user_id)).data
+    assert "um" in default.fillers
+    print("✅ Defaults returned when no lexicon is saved")
+
+    # Test save and read back
+    print("💾 Testing save and read back...")
+    lexicon = FillerLexicon(fillers=["i like"], contextual_fillers=[], pause_threshold=2.0)
+    saved = await update_filler_lexicon(lexicon, user_id=user_id)
+    assert saved.success
+    stored = (await get_filler_lexicon(user_id=user_id)).data
+    assert stored.fillers == ["i like"] and stored.pause_threshold == 2.0
+    print("✅ Saved lexicon read back")
+
+    # Test that the lexicon drives detection during transcription
+    print("🔎 Testing lexicon in transcription flagging...")
+    words = [
+        make_word("Um,", 0.0, 0.3), make_word("I", 0.4, 0.5), make_word("like", 0.5, 0.7),
+        make_word("the", 0.8, 0.9), make_word("the", 0.9, 1.0), make_word("w-", 1.1, 1.2),
+        make_word("way", 1.2, 1.4)
+    ]
+    custom = media_service.detect_disfluencies(words, stored.model_dump())
+    assert [word.text for word in custom.words if word.is_filler] == ["I", "like"]
+    default_report = media_service.detect_disfluencies(words)
+    assert [word.text for word in default_report.words if word.is_filler] == ["Um,"]
+    # Repetitions and stutters are reported as their own types, not as fillers
+    assert default_report.counts.get("repetition") == 1 and default_report.counts.get("stutter") == 1
+    print("✅ Saved lexicon used; repetitions and stutters not marked as fillers")
+
+
+if __name__ == "__main__":
+    test_filler_lexicon()
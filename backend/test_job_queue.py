@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test script for the Mongo-backed media job queue and media worker
+"""
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mongomock
+
+import services.job_queue as job_queue_module
+from mongomock_async import AsyncCollection
+from models.schemas import MediaJobStatus, TranscriptWord
+from services.job_queue import JobQueue, JobFailedError, JobTimeoutError, encode_result, decode_result
+from services.media_pool import MediaPool
+from workers.media import MediaWorker
+
+
+def hang_on_probe():
+    """Child initializer: children are spawned, so the patch has to be applied inside each one"""
+    import time
+    from services.media_service import media_service
+    media_service.get_video_info = lambda path: time.sleep(60) if path == "hang" else {"path": path}
+
+
+def test_job_queue():
+    """Test leases, heartbeats, visibility timeout, retries and a worker run"""
+    print("🚀 Testing Media Job Queue...")
+
+    original_get_collection = job_queue_module.get_jobs_collection
+    try:
+        collection = mongomock.MongoClient().snipix_test.jobs
+        job_queue_module.get_jobs_collection = lambda: AsyncCollection(collection)
+        asyncio.run(run_queue_checks(collection))
+        print("✅ All media job queue tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Media job queue test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        job_queue_module.get_jobs_collection = original_get_collection
+
+
+async def run_queue_checks(collection):
+    queue = JobQueue(lease_seconds=30, max_attempts=2, base_backoff_seconds=0)
+
+    # Test claim and lease
+    print("🔒 Testing atomic claim...")
+    job_id = await queue.enqueue("get_video_duration", ["/media/videos/a.mp4"], user_id="user_1")
+    first = await queue.claim("host-a:1:0")
+    assert str(first["_id"]) == job_id and first["attempts"] == 1
+    assert await queue.claim("host-b:2:0") is None
+    assert await queue.heartbeat(first)
+    print("✅ A running job with a live lease is not handed out twice")
+
+    # Test visibility timeout: the lease lapses and another worker takes over
+    print("⏰ Testing visibility timeout...")
+    collection.update_one({"_id": first["_id"]}, {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}})
+    second = await queue.claim("host-b:2:0")
+    assert second is not None and second["attempts"] == 2
+    assert not await queue.heartbeat(first)
+    assert not await queue.complete(first, 1.0)
+    assert await queue.complete(second, 12.5)
+    assert await queue.wait(job_id, timeout=1) == 12.5
+    print("✅ Expired lease re-claimed; the stale worker's result was rejected")
+
+    # Test retries then permanent failure
+    print("🔁 Testing retries...")
+    failing_id = await queue.enqueue("extract_audio", ["/missing.mp4"], user_id="user_1")
+    for attempt in range(2):
+        job = await queue.claim("host-a:1:0")
+        await queue.fail(job, "ffmpeg error")
+    status = await queue.get(failing_id, user_id="user_1")
+    assert status["status"] == MediaJobStatus.FAILED.value and status["attempts"] == 2
+    assert await queue.get(failing_id, user_id="someone_else") is None
+    try:
+        await queue.wait(failing_id, timeout=1)
+        raise AssertionError("failed job did not raise")
+    except JobFailedError as e:
+        assert "ffmpeg error" in str(e)
+    print("✅ Job retried once, then failed for good")
+
+    # Test result encoding round trip
+    words = [TranscriptWord(text="hello", start=0.0, end=0.4, confidence=0.9)]
+    assert decode_result("transcribe_audio", encode_result(words))[0].text == "hello"
+
+    # Test queue position estimates under fair share
+    print("🔢 Testing queue position estimates...")
+    for _ in range(5):
+        await queue.enqueue("transcribe_audio", ["/media/videos/long_audio.wav"], user_id="heavy",
+                            job_class="transcription", cost=2000.0)
+    light_id = await queue.enqueue("transcribe_audio", ["/media/videos/short_audio.wav"], user_id="light",
+                                   job_class="transcription", cost=20.0)
+    light = await queue.get(light_id)
+    position = await queue.estimate_position(light)
+    assert position["jobs_ahead"] == 1 and position["queue_position"] == 2, position
+    schema = queue.to_schema(light, position)
+    assert schema.queue_position == 2 and schema.job_class == "transcription"
+    collection.delete_many({"job_class": "transcription"})
+    print(f"✅ Light user's job is 2nd despite 5 earlier jobs (starts in ~{position['estimated_start_seconds']}s)")
+
+    # Test that a job which keeps killing its worker stops being re-claimed
+    print("💀 Testing attempts cap on lapsed leases...")
+    crashing_id = await queue.enqueue("transcribe_audio", ["/media/videos/crash.wav"], user_id="user_3")
+    for attempt in range(2):
+        job = await queue.claim("host-a:1:0", job_id=job_queue_module._object_id(crashing_id))
+        assert job is not None and job["attempts"] == attempt + 1
+        # The worker dies: no fail(), the lease just lapses
+        collection.update_one({"_id": job["_id"]}, {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}})
+    assert await queue.claim("host-b:2:0") is None
+    assert await queue.reap_expired() == 1
+    crashed = await queue.get(crashing_id)
+    assert crashed["status"] == MediaJobStatus.FAILED.value and crashed["attempts"] == 2
+    print("✅ Lapsed lease on the last attempt is failed, not re-claimed")
+
+    # Test that a caller giving up abandons the job
+    print("⌛ Testing wait timeout...")
+    slow_id = await queue.enqueue("transcribe_audio", ["/media/videos/slow.wav"], user_id="user_3")
+    try:
+        await queue.wait(slow_id, timeout=0.05, poll_interval=0.01)
+        raise AssertionError("wait did not time out")
+    except JobTimeoutError:
+        pass
+    assert (await queue.get(slow_id))["status"] == MediaJobStatus.ABANDONED.value
+    assert await queue.claim("host-a:1:0") is None
+    print("✅ Timed-out job abandoned and never handed to a worker")
+
+    # Test submitting without waiting: the job id is returned and the result read back through the job
+    print("📮 Testing submit without waiting...")
+    submit_pool = MediaPool(mode="queue", max_workers=2)
+    submitted_id = await submit_pool.submit("transcribe_video", "/media/videos/talk.mp4", user_id="user_4",
+                                            media_seconds=60)
+    submitted = await queue.get(submitted_id, user_id="user_4", include_result=True)
+    assert submitted["job_class"] == "transcription"
+    assert queue.to_schema(submitted, await queue.estimate_position(submitted)).queue_position == 1
+    job = await queue.claim("host-a:1:0", job_id=submitted["_id"])
+    await queue.complete(job, [TranscriptWord(text="hello", start=0.0, end=0.4, confidence=0.9)])
+    finished = queue.to_schema(await queue.get(submitted_id, user_id="user_4", include_result=True))
+    assert finished.status == MediaJobStatus.SUCCEEDED and finished.result[0].text == "hello"
+    print("✅ Submitted job reports its queue position, then its result")
+
+    # Test a worker draining the queue
+    print("⚙️  Testing media worker...")
+    paths = []
+    for _ in range(3):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        paths.append(path)
+        await queue.enqueue("cleanup_temp_files", [[path]], user_id="user_2")
+    worker = MediaWorker(queue, MediaPool(mode="thread", max_workers=2), poll_interval=0.05)
+    run = asyncio.create_task(worker.run())
+    for _ in range(100):
+        if worker.completed == 3:
+            break
+        await asyncio.sleep(0.05)
+    worker.request_stop()
+    await run
+    assert worker.completed == 3, worker.completed
+    assert not any(os.path.exists(path) for path in paths)
+    print(f"✅ Worker completed {worker.completed} jobs and stopped cleanly")
+
+    # Test that a worker losing the lease kills the job instead of running it alongside its new owner
+    print("🔪 Testing lease loss while a job runs...")
+    hung_id = await queue.enqueue("get_video_info", ["hang"], user_id="user_5")
+    worker = MediaWorker(queue, MediaPool(mode="process", max_workers=1, child_initializer=hang_on_probe),
+                         poll_interval=0.05, heartbeat_interval=0.05)
+    run = asyncio.create_task(worker.run())
+    for _ in range(400):
+        hung = await queue.get(hung_id)
+        if hung["status"] == MediaJobStatus.RUNNING.value:
+            break
+        await asyncio.sleep(0.05)
+    collection.update_one({"_id": hung["_id"]}, {"$set": {"worker_id": "host-b:1:0"}})
+    for _ in range(200):
+        if worker.failed == 1:
+            break
+        await asyncio.sleep(0.05)
+    worker.request_stop()
+    await asyncio.wait_for(run, timeout=30)
+    hung = await queue.get(hung_id)
+    assert worker.failed == 1 and worker.completed == 0, (worker.failed, worker.completed)
+    assert hung["status"] == MediaJobStatus.RUNNING.value and hung["worker_id"] == "host-b:1:0", hung
+    print("✅ Job killed once its lease was lost; the new owner's claim was left alone")
+
+
+if __name__ == "__main__":
+    test_job_queue()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the event-loop blocking watchdog
+"""
+import asyncio
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.loop_watchdog import LoopWatchdog
+
+
+def blocking_trim():
+    """Stand-in for a sync ffmpeg call made from a route"""
+    time.sleep(0.4)
+
+
+async def blocking_route():
+    blocking_trim()
+
+
+async def test_loop_watchdog():
+    """Test stall detection, call-site attribution and the quiet path"""
+    print("🚀 Testing Event-Loop Watchdog...")
+
+    try:
+        watchdog = LoopWatchdog(threshold_ms=100)
+        watchdog.start()
+        await asyncio.sleep(0.1)
+
+        # Test the quiet path
+        print("😴 Testing short awaits and brief sync work...")
+        for _ in range(5):
+            time.sleep(0.02)
+            await asyncio.sleep(0.05)
+        assert watchdog.get_report()["total_blocks"] == 0, watchdog.get_report()
+        print("✅ No stalls reported under the threshold")
+
+        # Test stall detection
+        print("🧱 Testing blocking call detection...")
+        for _ in range(2):
+            await blocking_route()
+            await asyncio.sleep(0.15)
+        report = watchdog.get_report()
+        watchdog.stop()
+        assert report["total_blocks"] == 2, report
+        site = report["sites"][0]
+        assert site["call_site"].startswith("test_loop_watchdog.py:") and site["call_site"].endswith("blocking_trim"), site
+        assert site["count"] == 2 and site["max_ms"] >= 300 and site["samples"] >= 2, site
+        assert any(frame.endswith("in blocking_route") for frame in site["stack"])
+        assert not watchdog.running
+        print(f"✅ {site['count']} stalls at {site['call_site']} (max {site['max_ms']}ms, {site['samples']} samples)")
+
+        print("✅ All watchdog tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Watchdog test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_loop_watchdog())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the media job pool
+"""
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.media_pool import MediaPool, MediaProcessCrashedError
+
+
+async def run_pool(mode: str):
+    pool = MediaPool(mode=mode, max_workers=2)
+    pool.start()
+    try:
+        paths = []
+        for _ in range(4):
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            paths.append(path)
+        await asyncio.gather(*(pool.run("cleanup_temp_files", [path]) for path in paths))
+        assert not any(os.path.exists(path) for path in paths)
+
+        try:
+            await pool.run("save_uploaded_file", None, "project")
+            raise AssertionError("non-dispatchable operation was accepted")
+        except ValueError:
+            pass
+
+        stats = pool.get_stats()
+        assert stats["completed"] == 4 and stats["pending"] == 0, stats
+        assert stats["operations"]["cleanup_temp_files"]["count"] == 4, stats
+        return stats
+    finally:
+        pool.shutdown()
+
+
+def crash_on_probe():
+    """Child initializer: children are spawned, so the patch has to be applied inside each one"""
+    from services.media_service import media_service
+    media_service.get_video_info = lambda path: os._exit(1) if path == "crash" else {"path": path}
+
+
+async def run_crashing_process_pool():
+    pool = MediaPool(mode="process", max_workers=2, child_initializer=crash_on_probe)
+    pool.start()
+    try:
+        try:
+            await pool.run("get_video_info", "crash")
+            raise AssertionError("crashed job did not fail")
+        except MediaProcessCrashedError:
+            pass
+        # The broken executor was replaced, so later jobs still run
+        results = await asyncio.gather(*(pool.run("get_video_info", f"ok_{i}") for i in range(3)))
+        assert [result["path"] for result in results] == ["ok_0", "ok_1", "ok_2"], results
+        return pool.get_stats()
+    finally:
+        pool.shutdown()
+
+
+def test_media_pool():
+    """Test media operations in thread and process mode"""
+    print("🚀 Testing Media Pool...")
+
+    try:
+        for mode in ("thread", "process"):
+            print(f"⚙️  Testing {mode} mode...")
+            stats = asyncio.run(run_pool(mode))
+            print(f"✅ {mode} mode ran {stats['completed']} jobs (avg {stats['avg_seconds']}s)")
+
+        # Only processes that transcribe load Whisper; the parent must never hold it before spawning or forking
+        from services.media_service import media_service
+        assert not media_service._whisper_loaded
+        print("✅ Whisper model not loaded in the parent process")
+
+        print("💥 Testing a crashed process...")
+        stats = asyncio.run(run_crashing_process_pool())
+        print(f"✅ Crashed job failed alone; pool replaced and ran {stats['completed']} more jobs")
+
+        try:
+            MediaPool(mode="gpu")
+            raise AssertionError("unknown mode was accepted")
+        except ValueError:
+            print("✅ Unknown execution mode rejected")
+
+        print("✅ All media pool tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Media pool test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_media_pool()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for media job priority classes and per-user fair share
+"""
+import sys
+import os
+from collections import Counter, deque
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.media_scheduler import FairShareScheduler, default_class_caps, estimate_cost, job_class_for
+
+
+def drain(scheduler, queues, picks):
+    """Pick `picks` jobs one at a time, freeing each slot straight away; returns the picked (class, user) list"""
+    order = []
+    for _ in range(picks):
+        heads = {}
+        for (job_class, user_id), waiting in queues.items():
+            if waiting:
+                heads.setdefault(job_class, {})[user_id] = waiting[0]
+        choice = scheduler.pick(heads)
+        if choice is None:
+            break
+        queues[choice].popleft()
+        scheduler.release(choice[0])
+        order.append(choice)
+    return order
+
+
+def test_media_scheduler():
+    """Test fair share between users, priority between classes and per-class caps"""
+    print("🚀 Testing Media Scheduler...")
+
+    try:
+        # Test that one heavy user cannot starve a light one
+        print("⚖️  Testing fair share...")
+        two_hours = estimate_cost("transcribe_audio", 2 * 3600)
+        one_minute = estimate_cost("transcribe_audio", 60)
+        scheduler = FairShareScheduler(default_class_caps(8), quantum=60)
+        queues = {
+            ("transcription", "heavy"): deque([two_hours] * 20),
+            ("transcription", "light"): deque([one_minute])
+        }
+        order = drain(scheduler, queues, 2)
+        assert ("transcription", "light") in order, order
+        print(f"✅ One-minute job ran within the first {order.index(('transcription', 'light')) + 1} picks")
+
+        # Test that run time, not job count, is shared
+        queues = {
+            ("trim", "big"): deque([100.0] * 200),
+            ("trim", "small"): deque([10.0] * 2000)
+        }
+        order = drain(FairShareScheduler(default_class_caps(8), quantum=25), queues, 550)
+        served = Counter()
+        for job_class, user_id in order:
+            served[user_id] += 100.0 if user_id == "big" else 10.0
+        ratio = served["big"] / served["small"]
+        assert 0.8 < ratio < 1.25, served
+        print(f"✅ Run time split {served['big']:.0f}s / {served['small']:.0f}s between users")
+
+        # Test class priority and caps
+        print("🏁 Testing priority classes and caps...")
+        scheduler = FairShareScheduler({"preview": 2, "trim": 1, "transcription": 1, "proxy": 1})
+        heads = {"proxy": {"a": 1.0}, "transcription": {"a": 1.0}, "trim": {"a": 1.0}, "preview": {"b": 1.0}}
+        assert scheduler.pick(heads) == ("preview", "b")
+        assert scheduler.pick(heads) == ("preview", "b")
+        assert scheduler.pick(heads) == ("trim", "a")
+        assert scheduler.pick(heads) == ("transcription", "a")
+        assert scheduler.pick(heads) == ("proxy", "a")
+        assert scheduler.pick(heads) is None
+        scheduler.release("trim")
+        assert scheduler.pick(heads) == ("trim", "a")
+        capped = FairShareScheduler({"preview": 4, "trim": 4, "transcription": 4, "proxy": 4}, total_cap=1)
+        assert capped.pick(heads) == ("preview", "b") and capped.pick(heads) is None
+        print("✅ Higher classes go first, each class stops at its cap")
+
+        assert job_class_for("generate_thumbnail") == "preview"
+        assert job_class_for("trim_video_segments") == "trim"
+        assert default_class_caps(1) == {"preview": 1, "trim": 1, "transcription": 1, "proxy": 1}
+
+        print("✅ All media scheduler tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Media scheduler test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_media_scheduler()
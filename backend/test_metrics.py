@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the metrics registry and Prometheus exposition
+"""
+import sys
+import os
+import random
+import tracemalloc
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.metrics import MetricsRegistry, OVERFLOW_LABEL
+
+
+def test_metrics():
+    """Test histograms, percentiles, cardinality cap and text format"""
+    print("🚀 Testing Metrics Registry...")
+
+    try:
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ("method", "route", "status"))
+        latency = registry.histogram("request_seconds", "Latency", ("route",), buckets=(0.01, 0.1, 1.0))
+        in_flight = registry.gauge("in_flight", "In flight")
+
+        # Test percentiles
+        print("📊 Testing histogram percentiles...")
+        child = latency.labels("/projects")
+        for _ in range(900):
+            child.observe(random.uniform(0.0, 0.01))
+        for _ in range(100):
+            child.observe(random.uniform(0.1, 1.0))
+        p50, p99 = child.quantile(0.5), child.quantile(0.99)
+        assert 0.0 < p50 <= 0.01, p50
+        assert 0.1 < p99 <= 1.0, p99
+        print(f"✅ p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms")
+
+        # Test bounded memory
+        print("🧠 Testing bounded memory...")
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(200000):
+            child.observe(0.05)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        assert growth < 64 * 1024, growth
+        capped = registry.counter("capped_total", "Capped", ("path",), max_series=10)
+        for i in range(1000):
+            capped.labels(f"/raw/{i}").inc()
+        assert len(capped.series()) == 11
+        assert capped.labels(OVERFLOW_LABEL).get() == 990
+        print(f"✅ 200k observations grew memory by {growth} bytes; series capped at {len(capped.series())}")
+
+        # Test text exposition
+        print("📝 Testing Prometheus text format...")
+        requests.labels("GET", "/projects/{project_id}", "404").inc()
+        in_flight.set(3)
+        text = registry.render()
+        assert 'requests_total{method="GET",route="/projects/{project_id}",status="404"} 1' in text
+        assert 'request_seconds_bucket{route="/projects",le="+Inf"} 201000' in text
+        assert 'request_seconds_count{route="/projects"} 201000' in text
+        assert "# TYPE request_seconds histogram" in text
+        assert "in_flight 3" in text
+        print("✅ Exposition format is valid")
+
+        print("✅ All metrics tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Metrics test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_metrics()
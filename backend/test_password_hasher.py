@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the async bcrypt password hasher
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.password_hasher import PasswordHasher
+from utils.password_utils import password_utils
+
+
+async def test_password_hasher():
+    """Test async hashing, cost upgrades and loop responsiveness"""
+    print("🚀 Testing Password Hasher...")
+
+    try:
+        hasher = PasswordHasher(rounds=10, max_workers=2)
+
+        # Test hash and verify
+        print("🔐 Testing hash/verify...")
+        hashed = await hasher.hash_password("Secret123!")
+        assert hasher.get_cost(hashed) == 10, hashed
+        assert await hasher.verify_password("Secret123!", hashed)
+        assert not await hasher.verify_password("wrong", hashed)
+        print("✅ Hash and verify work")
+
+        # Test cost upgrade on login
+        print("⬆️ Testing cost factor upgrade...")
+        old_hash = password_utils.hash_password("Secret123!", rounds=8)
+        assert hasher.needs_rehash(old_hash)
+        ok, new_hash = await hasher.verify_and_upgrade("Secret123!", old_hash)
+        assert ok and new_hash and hasher.get_cost(new_hash) == 10
+        ok, newer_hash = await hasher.verify_and_upgrade("Secret123!", new_hash)
+        assert ok and newer_hash is None
+        ok, upgraded = await hasher.verify_and_upgrade("wrong", old_hash)
+        assert not ok and upgraded is None
+        print("✅ Old hashes are upgraded, current ones left alone")
+
+        # Test that the event loop keeps ticking during a burst of logins
+        print("⏱️ Testing loop responsiveness during a login burst...")
+        max_lag = 0.0
+        running = True
+
+        async def ticker():
+            nonlocal max_lag
+            while running:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.perf_counter() - started - 0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*[hasher.verify_password("Secret123!", hashed) for _ in range(8)])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        running = False
+        await tick_task
+        assert all(results)
+        stats = hasher.get_stats()
+        print(f"✅ 8 verifies in {elapsed_ms:.0f}ms, max loop lag {max_lag * 1000:.1f}ms, "
+              f"peak queue {stats['peak_queued']}")
+        assert max_lag < 0.05, max_lag
+        assert stats["queued"] == 0 and stats["active"] == 0
+
+        hasher.shutdown()
+        print("✅ All password hasher tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Password hasher test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_password_hasher())
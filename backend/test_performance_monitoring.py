@@ -62,8 +62,8 @@ async def test_performance_monitoring():
         detailed = performance_monitor.get_detailed_metrics()
         print(f"✅ Detailed metrics:")
         print(f"   Monitoring active: {detailed['monitoring_active']}")
-        print(f"   Memory samples: {len(detailed['metrics']['memory_usage'])}")
-        print(f"   CPU samples: {len(detailed['metrics']['cpu_usage'])}")
+        print(f"   System samples: {detailed['system_sampler']['samples']}")
+        print(f"   Latest sample: {detailed['system_sampler']['latest']}")
         
         # Test database performance
         print("🗄️ Testing database performance...")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-demand CPU and memory profilers
+"""
+import asyncio
+import sys
+import os
+import threading
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.profiler import SamplingProfiler, MemoryProfiler, ProfilerBusyError
+
+leaked = []
+
+
+def hot_function(stop):
+    """CPU-bound work the sampler should find"""
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+async def leaky_handler():
+    """Grows a module-level list, like an unbounded metrics history"""
+    for _ in range(200):
+        leaked.append([0] * 1000)
+        await asyncio.sleep(0.001)
+
+
+async def test_profiler():
+    """Test CPU sampling, output formats, busy guard and tracemalloc diffs"""
+    print("🚀 Testing Profilers...")
+
+    try:
+        # Test CPU sampling
+        print("🔥 Testing sampling profiler...")
+        profiler = SamplingProfiler()
+        stop = threading.Event()
+        worker = threading.Thread(target=hot_function, args=(stop,), name="hot-worker")
+        worker.start()
+        task = asyncio.create_task(profiler.profile(0.5, interval=0.005))
+        await asyncio.sleep(0.05)
+        try:
+            await profiler.profile(0.1)
+            raise AssertionError("second profile should be rejected")
+        except ProfilerBusyError:
+            pass
+        profile = await task
+        stop.set()
+        worker.join()
+        assert profile["samples"] > 20, profile["samples"]
+        collapsed = SamplingProfiler.to_collapsed(profile)
+        hot_lines = [line for line in collapsed.splitlines() if line.startswith("hot-worker;") and "hot_function" in line]
+        assert hot_lines, collapsed[:500]
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+        speedscope = SamplingProfiler.to_speedscope(profile)
+        assert speedscope["profiles"][0]["name"] == "hot-worker"
+        frame_count = len(speedscope["shared"]["frames"])
+        assert all(index < frame_count for thread in speedscope["profiles"] for stack in thread["samples"] for index in stack)
+        print(f"✅ {profile['samples']} samples, {len(hot_lines)} hot stacks, {frame_count} frames")
+
+        # Test tracemalloc diff
+        print("🧠 Testing tracemalloc snapshot diff...")
+        memory = MemoryProfiler()
+        growth = asyncio.create_task(leaky_handler())
+        report = await memory.diff(0.5, limit=5)
+        await growth
+        top = report["top"][0]
+        assert top["location"].startswith("test_profiler.py:"), report["top"]
+        assert top["size_diff_kb"] > 500, top
+        print(f"✅ Largest growth {top['size_diff_kb']} KB at {top['location']}")
+
+        print("✅ All profiler tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Profiler test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_profiler())
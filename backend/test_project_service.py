@@ -48,6 +48,20 @@ async def test_project_service():
         print("📋 Testing project listing...")
         projects = await project_service.get_projects(test_user_id)
         print(f"✅ Found {len(projects)} projects")
+
+        # Test cursor-based project listing
+        print("📋 Testing cursor pagination...")
+        page = await project_service.get_projects_page(test_user_id, limit=1)
+        pages = 1 if page.items else 0
+        seen_ids = [item.id for item in page.items]
+        while page.next_cursor:
+            page = await project_service.get_projects_page(test_user_id, limit=1, cursor=page.next_cursor)
+            pages += 1 if page.items else 0
+            seen_ids.extend(item.id for item in page.items)
+        if len(seen_ids) == len(set(seen_ids)):
+            print(f"✅ Walked {pages} pages covering {len(seen_ids)} projects without duplicates")
+        else:
+            print("❌ Cursor pagination returned duplicate projects")
         
         # Test updating the project
         print("✏️ Testing project update...")
@@ -87,6 +101,54 @@ async def test_project_service():
         traceback.print_exc()
 
 
+def test_project_pages_without_updated_at():
+    """Test that cursor pagination walks past projects that have no updated_at"""
+    print("📄 Testing project pages with missing updated_at (no database)...")
+
+    import mongomock
+    from datetime import datetime, timedelta
+    from bson import ObjectId
+    import services.database as database_module
+    from mongomock_async import AsyncDatabase
+
+    original_db, original_available = database_module.async_db, database_module.db_available
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+        database_module.db_available = True
+        user_id = str(ObjectId())
+        now = datetime.now()
+        for index in range(5):
+            project = {"name": f"Project {index}", "user_id": user_id, "is_deleted": False, "collaborators": []}
+            # Every other project predates updated_at
+            if index % 2 == 0:
+                project["updated_at"] = now - timedelta(minutes=index)
+            database.projects.insert_one(project)
+
+        async def walk():
+            seen, cursor = [], None
+            while True:
+                page = await project_service.get_projects_page(user_id, limit=2, cursor=cursor)
+                seen.extend(item.id for item in page.items)
+                if not page.next_cursor:
+                    return seen
+                cursor = page.next_cursor
+
+        seen_ids = asyncio.run(walk())
+        if len(seen_ids) == 5 and len(set(seen_ids)) == 5:
+            print("✅ Walked every project once, including those without updated_at")
+        else:
+            print(f"❌ Cursor pagination returned {seen_ids}")
+
+    except Exception as e:
+        print(f"❌ Project pagination test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db, database_module.db_available = original_db, original_available
+
+
 if __name__ == "__main__":
+    test_project_pages_without_updated_at()
     asyncio.run(test_project_service())
 
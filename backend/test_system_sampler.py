@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the process resource sampler
+"""
+import asyncio
+import sys
+import os
+import gc
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.system_sampler import SampleRing, SystemSampler
+
+
+async def test_system_sampler():
+    """Test ring wrap-around, downsampling, loop lag and GC pause capture"""
+    print("🚀 Testing System Sampler...")
+
+    try:
+        # Test ring buffer
+        print("💍 Testing fixed-size ring buffer...")
+        ring = SampleRing(capacity=100, fields=("value",))
+        for i in range(250):
+            ring.append(1000.0 + i, (float(i),))
+        rows = ring.rows()
+        assert len(ring) == 100 and rows[0, 1] == 150 and rows[-1, 1] == 249
+        assert ring.latest()["value"] == 249
+        print(f"✅ Kept the newest {len(ring)} of 250 samples in {ring.nbytes} bytes")
+
+        # Test downsampling
+        print("📉 Testing min/max/avg downsampling...")
+        history = ring.downsample(window_seconds=100, points=10, now=1250.0)
+        series = history["series"]["value"]
+        assert len(history["timestamps"]) == 10
+        assert series["min"][0] == 150 and series["max"][0] == 159 and series["avg"][0] == 154.5
+        assert series["max"][-1] == 249
+        empty = ring.downsample(window_seconds=10, points=5, now=5000.0)
+        assert empty["timestamps"] == []
+        print(f"✅ 100 samples folded into {len(history['timestamps'])} buckets")
+
+        # Test live sampling
+        print("⏱️ Testing loop lag and GC pause capture...")
+        sampler = SystemSampler(interval=3600, history_seconds=3600 * 24, lag_probe_interval=0.05)
+        sampler.start()
+        await asyncio.sleep(0.1)
+        time.sleep(0.3)  # Block the loop
+        await asyncio.sleep(0.1)
+        garbage = [[i] for i in range(100000)]
+        gc.collect()
+        del garbage
+        sample = sampler.sample()
+        sampler.stop()
+        assert sample["loop_lag_ms"] >= 200, sample
+        assert sample["gc_collections"] >= 1 and sample["gc_pause_ms"] > 0, sample
+        assert sample["rss_mb"] > 0 and sample["threads"] >= 1
+        assert not sampler.running
+        print(f"✅ Sample: {sample}")
+
+        print("✅ All system sampler tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ System sampler test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(test_system_sampler())
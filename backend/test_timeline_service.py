@@ -11,7 +11,7 @@ from bson import ObjectId
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from services.database import init_db, get_users_collection, get_projects_collection
-from services.timeline_service import timeline_service
+from services.timeline_service import timeline_service, build_timeline_stats
 from models.schemas import TimelineStateCreate, TimelineState, Layer, Clip, ClipType, LayerType
 
 
@@ -163,6 +163,18 @@ async def test_timeline_service():
         print("📋 Testing timeline history...")
         history = await timeline_service.get_timeline_history(project_id, user_id)
         print(f"✅ Found {len(history)} timeline states in history")
+
+        # Test lightweight history summaries with keyset pagination
+        print("📋 Testing timeline history summary...")
+        first_page = await timeline_service.get_timeline_history_summary(project_id, user_id, limit=1)
+        if first_page.items and first_page.next_before_version is not None:
+            second_page = await timeline_service.get_timeline_history_summary(
+                project_id, user_id, limit=1, before_version=first_page.next_before_version
+            )
+            print(f"✅ Summary pages: v{first_page.items[0].version} then "
+                  f"{[item.version for item in second_page.items]} (stats: {first_page.items[0].stats})")
+        else:
+            print("❌ Failed to page timeline history summary")
         
         # Test getting specific version
         print("🔍 Testing specific version retrieval...")
@@ -193,7 +205,42 @@ async def test_timeline_service():
             print(f"✅ Updated timeline state: {updated_state.description}")
         else:
             print("❌ Failed to update timeline state")
-        
+
+        # Test partial timeline operations
+        print("🧩 Testing timeline operations...")
+        from models.schemas import TimelineOperationsRequest, TimelineOperation, TimelineOperationType
+        operations = TimelineOperationsRequest(
+            operations=[
+                TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_1", clip_id="clip_1",
+                                  start_time=2.0, end_time=12.0),
+                TimelineOperation(type=TimelineOperationType.ADD_LAYER,
+                                  layer=Layer(id="layer_2", name="Audio Layer", type=LayerType.AUDIO, order=1)),
+                TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_1", clip_id="clip_1",
+                                  target_layer_id="layer_2", start_time=2.0, end_time=12.0),
+                TimelineOperation(type=TimelineOperationType.TRIM_CLIP, layer_id="layer_2", clip_id="clip_1",
+                                  start_time=2.0, end_time=11.0, original_start_time=1.0),
+                TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_2", clip_id="clip_1",
+                                  target_layer_id="layer_1", start_time=2.0, end_time=11.0),
+                TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_1", clip_id="clip_1",
+                                  target_layer_id="layer_2", start_time=2.0, end_time=11.0),
+                TimelineOperation(type=TimelineOperationType.SET_PLAYHEAD, playhead_time=3.5)
+            ],
+            change_summary="Moved clip to audio layer"
+        )
+
+        result = await timeline_service.apply_timeline_operations(timeline_state_2.id, operations, user_id)
+        if result:
+            print(f"✅ Applied {len(result.changes)} operations to {result.timeline_id}")
+            patched_state = await timeline_service.get_timeline_state_by_id(timeline_state_2.id, user_id)
+            layers = {layer.id: layer for layer in patched_state.timeline_state.layers}
+            moved = layers["layer_2"].clips[0] if layers.get("layer_2") and layers["layer_2"].clips else None
+            if moved and moved.start_time == 2.0 and moved.original_start_time == 1.0 and not layers["layer_1"].clips:
+                print(f"✅ Clip moved to layer_2 at {moved.start_time}s, playhead {patched_state.timeline_state.playhead_time}")
+            else:
+                print("❌ Timeline operations did not produce the expected state")
+        else:
+            print("❌ Failed to apply timeline operations")
+
         print("✅ All timeline service tests completed successfully!")
         
     except Exception as e:
@@ -202,6 +249,115 @@ async def test_timeline_service():
         traceback.print_exc()
 
 
+def test_timeline_operation_batch():
+    """Test that operations in one batch see the layers and clips earlier ones changed"""
+    print("🧮 Testing timeline operation batches (no database)...")
+
+    try:
+        from datetime import datetime
+        from models.schemas import TimelineOperation, TimelineOperationType
+        layer_clips = {"layer_1": {"clip_1": {"id": "clip_1", "type": "video", "start_time": 0.0, "end_time": 10.0,
+                                              "duration": 10.0, "source_path": "/media/videos/test.mp4"}}}
+        operations = [
+            TimelineOperation(type=TimelineOperationType.ADD_LAYER,
+                              layer=Layer(id="layer_2", name="Audio Layer", type=LayerType.AUDIO, order=1)),
+            TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_1", clip_id="clip_1",
+                              target_layer_id="layer_2", start_time=2.0, end_time=12.0),
+            TimelineOperation(type=TimelineOperationType.TRIM_CLIP, layer_id="layer_2", clip_id="clip_1",
+                              start_time=2.0, end_time=11.0, original_start_time=1.0),
+            TimelineOperation(type=TimelineOperationType.MOVE_CLIP, layer_id="layer_2", clip_id="clip_1",
+                              target_layer_id="layer_1", start_time=3.0, end_time=12.0)
+        ]
+        updates = []
+        for operation in operations:
+            operation_updates, _ = timeline_service._build_operation_updates(operation, layer_clips, datetime.now())
+            updates.extend(operation_updates)
+
+        first_push = updates[2][0]["$push"]["timeline_state.layers.$[layer].clips"]
+        last_push = updates[-1][0]["$push"]["timeline_state.layers.$[layer].clips"]
+        if (first_push["start_time"] == 2.0 and "original_start_time" not in first_push
+                and last_push["start_time"] == 3.0 and last_push["original_start_time"] == 1.0
+                and last_push["source_path"] == "/media/videos/test.mp4"
+                and list(layer_clips["layer_1"]) == ["clip_1"] and not layer_clips["layer_2"]):
+            print("✅ Clip moved into a new layer, trimmed and moved back within one batch")
+        else:
+            print(f"❌ Unexpected batch updates: {first_push} / {last_push}")
+
+        # Every write is guarded on the revision the batch was built from, so a stale batch changes nothing
+        print("🔒 Testing revision-guarded batches...")
+        import mongomock
+        collection = mongomock.MongoClient().snipix_test.timeline_states
+        timeline_id = collection.insert_one({"revision": 3, "timeline_state": {"playhead_time": 0.0, "layers": []}}).inserted_id
+        batch = [({"$set": {"timeline_state.playhead_time": 5.0}}, None),
+                 ({"$push": {"timeline_state.layers": {"id": "layer_3"}}}, None)]
+        result = collection.bulk_write(timeline_service._guarded_requests(str(timeline_id), 2, batch), ordered=True)
+        unchanged = collection.find_one({"_id": timeline_id})
+        applied = collection.bulk_write(timeline_service._guarded_requests(str(timeline_id), 3, batch), ordered=True)
+        updated = collection.find_one({"_id": timeline_id})
+        # A second batch built from the same revision loses to the first
+        lost = collection.bulk_write(timeline_service._guarded_requests(str(timeline_id), 3, batch), ordered=True)
+        legacy = timeline_service._guarded_requests(str(timeline_id), 0, batch)
+        if (result.matched_count == 0 and unchanged["timeline_state"] == {"playhead_time": 0.0, "layers": []}
+                and applied.matched_count == 2 and updated["revision"] == 4 and lost.matched_count == 0
+                and updated["timeline_state"] == {"playhead_time": 5.0, "layers": [{"id": "layer_3"}]}
+                and collection.find_one({"_id": timeline_id}) == updated
+                and legacy[0]._filter["revision"] == {"$in": [None, 0]} and legacy[1]._filter["revision"] == 1):
+            print("✅ Stale batch changed nothing; current batch applied and advanced the revision")
+        else:
+            print(f"❌ Unexpected guarded batch result: {unchanged} / {updated}")
+
+    except Exception as e:
+        print(f"❌ Timeline operation batch test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+def test_timeline_stats_backfill():
+    """Test that timeline states saved before stats existed get them backfilled"""
+    print("📊 Testing timeline stats backfill (no database)...")
+
+    import mongomock
+    import services.database as database_module
+    from mongomock_async import AsyncDatabase
+    from migrations.migrate_user_data import DataMigration
+
+    original_db = database_module.async_db
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+        database.timeline_states.insert_many([
+            {"project_id": "p1", "version": 1, "timeline_state": {"duration": 5.0, "layers": [
+                {"id": "layer_1", "clips": [{"id": "clip_1", "end_time": 8.0}, {"id": "clip_2", "end_time": 3.0}]},
+                {"id": "layer_2", "clips": []}
+            ]}},
+            {"project_id": "p1", "version": 2, "timeline_state": {"duration": 5.0, "layers": []},
+             "stats": {"clip_count": 0, "layer_count": 0, "duration": 5.0}}
+        ])
+
+        result = asyncio.run(DataMigration().backfill_timeline_stats())
+        backfilled = database.timeline_states.find_one({"version": 1})["stats"]
+        if result == {"migrated": 1, "errors": 0} and backfilled == {"clip_count": 2, "layer_count": 2, "duration": 8.0}:
+            print(f"✅ Backfilled stats {backfilled}; documents that already had stats were left alone")
+        else:
+            print(f"❌ Unexpected backfill result: {result} / {backfilled}")
+
+        # Recomputed rather than $max-ed, so a trim can shorten the duration again
+        trimmed = build_timeline_stats([[6.0, 3.0], []], 5.0)
+        if trimmed["duration"] == 6.0 and build_timeline_stats([[2.0]], 5.0)["duration"] == 5.0:
+            print("✅ Duration follows the last clip end, never below the timeline duration")
+        else:
+            print(f"❌ Unexpected stats: {trimmed}")
+
+    except Exception as e:
+        print(f"❌ Timeline stats backfill test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db = original_db
+
+
 if __name__ == "__main__":
+    test_timeline_operation_batch()
+    test_timeline_stats_backfill()
     asyncio.run(test_timeline_service())
 
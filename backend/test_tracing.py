@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for request tracing
+"""
+import sys
+import os
+import time
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from middleware.tracing import parse_traceparent
+from utils.error_handlers import ErrorContext
+from utils.tracing import Tracer, span, record_span, current_span_id, to_otlp
+
+
+def test_tracing():
+    """Test span nesting, slow-trace retention and OTLP export shape"""
+    print("🚀 Testing Request Tracing...")
+
+    try:
+        tracer = Tracer(slow_request_ms=20, buffer_size=2)
+
+        # Test nesting
+        print("🌳 Testing span nesting...")
+        trace, tokens = tracer.start_trace("GET /projects/{project_id}", **{"http.method": "GET"})
+        with ErrorContext("get_project", "user-1"):
+            operation_span_id = current_span_id()
+            record_span(trace, current_span_id(), "mongodb.find", time.time_ns() - 1_000_000, time.time_ns(),
+                        **{"db.collection": "projects"})
+            with span("ffmpeg.trim_video") as child:
+                assert child.parent_id == operation_span_id
+                time.sleep(0.025)
+        trace.root.set_attribute("http.status_code", 200)
+        tracer.finish_trace(trace, tokens)
+        assert current_span_id() is None
+        names = {recorded.name: recorded for recorded in trace.spans}
+        assert names["get_project"].parent_id == trace.root.span_id
+        assert names["mongodb.find"].parent_id == operation_span_id
+        print(f"✅ {len(trace.spans)} spans: {sorted(names)}")
+
+        # Test retention
+        print("🗂️ Testing slow-trace ring buffer...")
+        fast, fast_tokens = tracer.start_trace("GET /health")
+        fast.root.set_attribute("http.status_code", 200)
+        tracer.finish_trace(fast, fast_tokens)
+        failed, failed_tokens = tracer.start_trace("POST /media/trim")
+        tracer.finish_trace(failed, failed_tokens, RuntimeError("ffmpeg exited 1"))
+        kept = [summary["trace_id"] for summary in tracer.get_traces()]
+        assert fast.trace_id not in kept and failed.trace_id in kept and trace.trace_id in kept
+        assert tracer.get_trace(trace.trace_id)["name"] == "GET /projects/{project_id}"
+        with span("outside-request") as orphan:
+            assert orphan is None
+        print(f"✅ Kept {tracer.get_stats()['kept']} of {tracer.get_stats()['completed']} traces")
+
+        # Test export format
+        print("📤 Testing OTLP export...")
+        otlp = to_otlp(trace)
+        spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert len(spans) == len(trace.spans) and all(len(item["traceId"]) == 32 for item in spans)
+        assert all("parentSpanId" in item for item in spans if item["spanId"] != trace.root.span_id)
+        trace_id, parent_id = parse_traceparent(f"00-{trace.trace_id}-{trace.root.span_id}-01")
+        assert (trace_id, parent_id) == (trace.trace_id, trace.root.span_id)
+        assert parse_traceparent("garbage") == (None, None)
+        print("✅ OTLP payload and traceparent parsing are valid")
+
+        print("✅ All tracing tests completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Tracing test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    test_tracing()
@@ -174,14 +174,43 @@ async def test_transcription_service():
             edited_text="Hello world!"
         )
         
-        updated_segment_transcription = await transcription_service.update_transcription_segment(
+        returned_segment = await transcription_service.update_transcription_segment(
             project_id, "segment_1", updated_segment, user_id
         )
-        if updated_segment_transcription:
-            print(f"✅ Updated segment: {updated_segment_transcription.segments[0].text}")
+        if returned_segment:
+            print(f"✅ Updated segment: {returned_segment.text}")
         else:
             print("❌ Failed to update segment")
         
+        # Test viewport range query over stored segments
+        print("🔎 Testing segment range query...")
+        window_segments = await transcription_service.get_transcription_segments(project_id, user_id, 0.5, 1.0)
+        outside_segments = await transcription_service.get_transcription_segments(project_id, user_id, 5.0, 10.0)
+        if window_segments is not None and len(window_segments) == 1 and outside_segments == []:
+            print(f"✅ Range query returned {len(window_segments)} segment in window, none outside")
+        else:
+            print("❌ Segment range query returned unexpected results")
+        
+        # Test word-level range and id lookups
+        print("🔎 Testing word range index...")
+        range_words = await transcription_service.get_transcript_words_in_range(project_id, user_id, 0.0, 0.4)
+        looked_up = await transcription_service.get_transcript_words_by_id(
+            project_id, [f"{word2.start}-{word2.end}"], user_id
+        )
+        if range_words and looked_up and looked_up[0].text == word2.text:
+            print(f"✅ Word range returned {len(range_words)} words, id lookup resolved '{looked_up[0].text}'")
+        else:
+            print("❌ Word range index returned unexpected results")
+        
+        # Test full-text search across the user's transcripts
+        print("🔎 Testing transcript search...")
+        search_results = await transcription_service.search_transcripts(user_id, "world", limit=5)
+        matching = [hit for hit in search_results.hits if hit.project_id == project_id]
+        if matching and matching[0].highlights:
+            print(f"✅ Search found '{matching[0].snippet}' at {matching[0].start_time}s")
+        else:
+            print("❌ Transcript search returned no hits")
+        
         # Test getting final transcription
         print("🔍 Testing final transcription retrieval...")
         final_transcription = await transcription_service.get_transcription(project_id, user_id)
@@ -200,6 +229,160 @@ async def test_transcription_service():
         traceback.print_exc()
 
 
+def legacy_segment(segment_id, start_time, text):
+    """Segment as embedded in transcriptions written before segment storage"""
+    return {
+        "id": segment_id,
+        "start_time": start_time,
+        "end_time": start_time + 1.0,
+        "text": text,
+        "words": [{"text": text, "start": start_time, "end": start_time + 1.0, "confidence": 0.9,
+                   "is_filler": False, "speaker_id": "speaker_1"}],
+        "speaker_id": "speaker_1",
+        "confidence": 0.9,
+        "is_edited": False
+    }
+
+
+def test_legacy_segment_migration():
+    """Test that legacy embedded segments reach the searchable segments collection"""
+    print("🗄️ Testing legacy segment migration (no database)...")
+
+    import mongomock
+    import services.database as database_module
+    from mongomock_async import AsyncDatabase
+    from migrations.migrate_user_data import DataMigration
+    from services.transcription_service import TranscriptionService
+
+    original_db, original_available = database_module.async_db, database_module.db_available
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+        database_module.db_available = True
+        user_id = "user_1"
+        project_ids = [str(database.projects.insert_one({
+            "name": name, "user_id": user_id, "collaborators": [], "is_deleted": False
+        }).inserted_id) for name in ("Backfilled", "Edited")]
+        for project_id in project_ids:
+            database.transcriptions.insert_one({
+                "project_id": project_id,
+                "segments": [legacy_segment("segment_1", 0.0, "hello"), legacy_segment("segment_2", 1.0, "world")]
+            })
+
+        # A write to a legacy transcription moves its segments out before applying the edit
+        service = TranscriptionService()
+        edited = TranscriptSegment(**{**legacy_segment("segment_1", 0.0, "hello"), "text": "hi", "is_edited": True})
+        returned = asyncio.run(service.update_transcription_segment(project_ids[1], "segment_1", edited, user_id))
+        removed = asyncio.run(service.delete_transcription_segment(project_ids[1], "segment_2", user_id))
+        stored = list(database.transcription_segments.find({"project_id": project_ids[1]}))
+        transcription = database.transcriptions.find_one({"project_id": project_ids[1]})
+        if (returned.text == "hi" and removed.text == "world" and [doc["text"] for doc in stored] == ["hi"]
+                and transcription["segment_storage"] and "segments" not in transcription):
+            print("✅ Segment edit and delete migrated the legacy transcription first")
+        else:
+            print(f"❌ Unexpected state after editing a legacy transcription: {stored} / {transcription}")
+
+        # The migration backfills transcriptions nobody has written to since
+        result = asyncio.run(DataMigration().migrate_segment_storage())
+        stored = list(database.transcription_segments.find({"project_id": project_ids[0]}).sort("start_time", 1))
+        transcription = database.transcriptions.find_one({"project_id": project_ids[0]})
+        if (result == {"migrated": 1, "errors": 0} and [doc["text"] for doc in stored] == ["hello", "world"]
+                and transcription["segment_storage"] and "segments" not in transcription):
+            print(f"✅ Backfill moved {len(stored)} segments; already migrated transcriptions were left alone")
+        else:
+            print(f"❌ Unexpected backfill result: {result} / {stored}")
+
+    except Exception as e:
+        print(f"❌ Legacy segment migration test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db, database_module.db_available = original_db, original_available
+
+
+def test_segment_replace():
+    """Test that replacing all segments never leaves a transcription empty or mixed"""
+    print("🔁 Testing segment replace (no database)...")
+
+    import mongomock
+    import services.database as database_module
+    from mongomock_async import AsyncDatabase
+    from models.schemas import TranscriptionUpdate
+    from services.transcription_service import TranscriptionService
+    from utils.error_handlers import OperationError
+
+    original_db, original_available = database_module.async_db, database_module.db_available
+    try:
+        database = mongomock.MongoClient().snipix_test
+        database_module.async_db = AsyncDatabase(database)
+        database_module.db_available = True
+        database.transcription_segments.create_index([("project_id", 1), ("generation", 1), ("id", 1)], unique=True)
+        user_id = "user_1"
+        project_id = str(database.projects.insert_one({
+            "name": "Replaced", "user_id": user_id, "collaborators": [], "is_deleted": False
+        }).inserted_id)
+        database.transcriptions.insert_one({
+            "project_id": project_id,
+            "segments": [legacy_segment("segment_1", 0.0, "hello"), legacy_segment("segment_2", 1.0, "world")]
+        })
+        service = TranscriptionService()
+
+        def stored_texts():
+            transcription = database.transcriptions.find_one({"project_id": project_id})
+            current = database.transcription_segments.find(
+                {"project_id": project_id, "generation": transcription.get("segment_generation")}
+            ).sort("start_time", 1)
+            return [doc["text"] for doc in current], database.transcription_segments.count_documents({})
+
+        # Same ids as the stored set, so the unique index would reject a delete-less overwrite
+        replacement = [TranscriptSegment(**legacy_segment("segment_1", 0.0, "hi")),
+                       TranscriptSegment(**legacy_segment("segment_2", 1.0, "there"))]
+        asyncio.run(service.update_transcription(project_id, TranscriptionUpdate(segments=replacement), user_id))
+        texts, total = stored_texts()
+        if texts == ["hi", "there"] and total == 2:
+            print("✅ Replace switched to the new generation and removed the old one")
+        else:
+            print(f"❌ Unexpected segments after replace: {texts} ({total} stored)")
+
+        # Duplicate ids are rejected before anything is written
+        duplicates = [TranscriptSegment(**legacy_segment("segment_9", 0.0, "a")),
+                      TranscriptSegment(**legacy_segment("segment_9", 1.0, "b"))]
+        try:
+            asyncio.run(service.update_transcription(project_id, TranscriptionUpdate(segments=duplicates), user_id))
+            print("❌ Duplicate segment ids were accepted")
+        except Exception as e:
+            texts, total = stored_texts()
+            if "Duplicate segment ids" in str(e) and texts == ["hi", "there"] and total == 2:
+                print("✅ Duplicate segment ids rejected; stored segments untouched")
+            else:
+                print(f"❌ Unexpected duplicate handling: {e} / {texts}")
+
+        # A replace that loses the race to another one leaves the winner's segments alone
+        stale = database.transcriptions.find_one({"project_id": project_id})
+        asyncio.run(service._replace_segments(
+            database.transcriptions.find_one({"project_id": project_id}),
+            [TranscriptSegment(**legacy_segment("segment_1", 0.0, "winner"))]
+        ))
+        try:
+            asyncio.run(service._replace_segments(stale, [TranscriptSegment(**legacy_segment("segment_1", 0.0, "loser"))]))
+            print("❌ Stale replace was applied")
+        except OperationError:
+            texts, total = stored_texts()
+            if texts == ["winner"] and total == 1:
+                print("✅ Concurrent replace lost cleanly; no mixed or orphaned segments")
+            else:
+                print(f"❌ Unexpected segments after concurrent replace: {texts} ({total} stored)")
+
+    except Exception as e:
+        print(f"❌ Segment replace test failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        database_module.async_db, database_module.db_available = original_db, original_available
+
+
 if __name__ == "__main__":
+    test_legacy_segment_migration()
+    test_segment_replace()
     asyncio.run(test_transcription_service())
 
@@ -0,0 +1,62 @@
+"""
+ETag helpers for conditional GET requests
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Response
+
+# Suffixes the compression middleware appends to ETags of encoded representations
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the values that identify a representation (ids, versions, timestamps)"""
+    digest = hashlib.sha1()
+    for part in parts:
+        value = part.isoformat() if isinstance(part, datetime) else str(part)
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_variant(etag: str, encoding: str) -> str:
+    """Strong ETag of the representation encoded with gzip or br"""
+    return f'{etag[:-1]}-{"gzip" if encoding == "gzip" else "br"}"'
+
+
+def _normalize(tag: str) -> str:
+    """Weak comparison form: drop W/ and any content-coding suffix inside the quotes"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            tag = tag[:-len(suffix)]
+            break
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches the current ETag"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _normalize(etag)
+    return any(_normalize(candidate) == current for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the validator"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> Response:
+    """Attach the validator; no-cache makes clients revalidate instead of reusing stale state"""
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,18 @@
+"""
+Email normalization and indexed lookup helpers
+"""
+from typing import Any, Dict
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form stored in users.email_lower"""
+    return (email or "").strip().lower()
+
+
+def email_query(email: str) -> Dict[str, Any]:
+    """Case-insensitive user lookup by email on the unique email_lower index.
+
+    The exact-match branch (on the unique email index) covers users created before email_lower was
+    backfilled by migrations/migrate_user_data.py; both branches are index seeks, never a scan.
+    """
+    return {"$or": [{"email_lower": normalize_email(email)}, {"email": email}]}
@@ -7,6 +7,9 @@ from typing import Any, Callable, Optional, TypeVar, Union
 from functools import wraps
 from datetime import datetime
 import traceback
+from contextvars import ContextVar
+
+from utils.tracing import span
 
 from pymongo.errors import (
     ConnectionFailure,
@@ -139,6 +142,11 @@ def retry_database_operation(
     return decorator
 
 
+# Name of the innermost ErrorContext operation; lets database command monitoring attribute
+# queries to the service method that issued them (Motor copies the context into its threads)
+current_operation: ContextVar[Optional[str]] = ContextVar("current_operation", default=None)
+
+
 class ErrorContext:
     """Context manager for error handling with logging"""
     
@@ -147,14 +155,27 @@ class ErrorContext:
         self.user_id = user_id
         self.start_time = None
         self.context = {}
+        self._operation_token = None
+        # Spans are kept in a shared buffer, so they never carry the user id
+        self._span = span(operation)
     
     def __enter__(self):
         self.start_time = datetime.now()
+        self._operation_token = current_operation.set(self.operation)
+        self._span.__enter__()
         logger.info(f"Starting operation: {self.operation}")
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         duration = (datetime.now() - self.start_time).total_seconds() if self.start_time else 0
+        if self._operation_token is not None:
+            try:
+                current_operation.reset(self._operation_token)
+            except ValueError:
+                # Exited in a different context than it was entered in
+                pass
+            self._operation_token = None
+        self._span.__exit__(exc_type, exc_val, exc_tb)
         
         if exc_type is None:
             logger.info(f"Operation completed: {self.operation} (duration: {duration:.3f}s)")
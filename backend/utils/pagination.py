@@ -0,0 +1,56 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+    pass
+
+
+def encode_cursor(sort_value: Optional[datetime], document_id: Any) -> str:
+    """Encode the (sort value, _id) of the last item on a page into an opaque cursor (None if the field is missing)"""
+    payload = json.dumps(
+        {"t": sort_value.isoformat() if sort_value is not None else None, "i": str(document_id)},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    """Decode an opaque cursor back into its (sort value, _id) pair"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        return sort_value, ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {e}")
+
+
+def keyset_filter(field: str, cursor: Optional[str], descending: bool = True) -> Dict[str, Any]:
+    """Build the filter that seeks past the cursor position for a (field, _id) sort"""
+    if not cursor:
+        return {}
+
+    sort_value, document_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    # Documents missing the field sort below every value (last when descending, first when ascending),
+    # and range operators never match them, so they are sought explicitly
+    if sort_value is None:
+        missing = {field: None, "_id": {op: document_id}}
+        return missing if descending else {"$or": [missing, {field: {"$ne": None}}]}
+    branches = [
+        {field: {op: sort_value}},
+        {field: sort_value, "_id": {op: document_id}}
+    ]
+    if descending:
+        branches.append({field: None})
+    return {"$or": branches}
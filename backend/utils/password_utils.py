@@ -14,11 +14,11 @@ class PasswordUtils:
     """Utilities for password hashing and validation"""
     
     @staticmethod
-    def hash_password(password: str) -> str:
+    def hash_password(password: str, rounds: int = 12) -> str:
         """Hash password using bcrypt with salt"""
         try:
             # Generate salt and hash password
-            salt = bcrypt.gensalt(rounds=12)  # 12 rounds for good security
+            salt = bcrypt.gensalt(rounds=rounds)  # 12 rounds for good security
             hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
             return hashed.decode('utf-8')
         except Exception as e:
@@ -0,0 +1,65 @@
+"""
+Fast JSON responses for large read endpoints
+"""
+from typing import Any, Dict, Optional, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def trusted_document(model_class: Type[BaseModel], document: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored document like model_class.model_dump(by_alias=True) without validating it.
+
+    Only for documents this service wrote from validated models: top-level fields are filtered to the
+    model's fields and missing ones filled with defaults; nested values are passed through as stored.
+    """
+    shaped = {}
+    for name, field in model_class.model_fields.items():
+        key = field.alias or name
+        if key in document:
+            shaped[key] = document[key]
+        elif name in document:
+            shaped[key] = document[name]
+        else:
+            default = field.get_default(call_default_factory=True)
+            shaped[key] = None if default is PydanticUndefined else default
+    return shaped
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; Pydantic models are dumped once in Rust and never re-validated"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def fast_api_response(data: Any = None, message: Optional[str] = None, status_code: int = 200) -> ORJSONResponse:
+    """ApiResponse-shaped body that bypasses FastAPI's response_model validation and jsonable_encoder.
+
+    Returning a Response from an endpoint skips response_model processing, so `data` must already be
+    a validated model (or plain JSON-compatible data); response_model stays on the route for the schema.
+    """
+    return ORJSONResponse(
+        content={
+            "success": True,
+            "data": data,
+            "message": message,
+            "error": None
+        },
+        status_code=status_code
+    )
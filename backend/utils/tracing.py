@@ -0,0 +1,316 @@
+"""
+Lightweight request tracing: contextvar-propagated spans, a ring buffer of slow traces,
+and optional OTLP-compatible JSON export
+"""
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SERVICE_NAME = "snipix-api"
+
+
+class Span:
+    """One timed unit of work inside a trace"""
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes",
+                 "status", "status_message")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_offset_ms": round((self.start_ns - self.trace.root.start_ns) / 1_000_000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.status_message if self.status == STATUS_ERROR else None
+        }
+
+
+class Trace:
+    """All spans recorded for one request; span count is capped so a hot loop can't grow it unbounded"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None, max_spans: int = 2000):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.root = Span(self, name, parent_id, kind=SPAN_KIND_SERVER, attributes=attributes)
+        self.spans.append(self.root)
+
+    def add_span(self, span: Span) -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start_time": self.root.start_ns / 1_000_000_000,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "status_code": self.root.attributes.get("http.status_code"),
+            "span_count": len(self.spans),
+            "dropped_spans": self.dropped_spans
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.summary()
+        data["spans"] = [span.to_dict() for span in sorted(self.spans, key=lambda span: span.start_ns)]
+        return data
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being handled, if any"""
+    return _current_trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def current_span_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.span_id if span else None
+
+
+class span:
+    """Open a child span of the current span for the duration of a with block.
+
+    Does nothing outside a traced request, so it is safe in scripts and background tasks.
+    """
+    __slots__ = ("name", "kind", "attributes", "_span", "_token")
+
+    def __init__(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self._span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        trace = _current_trace.get()
+        if trace is None:
+            return None
+        parent = _current_span.get()
+        child = Span(trace, self.name, parent.span_id if parent else trace.root.span_id, self.kind, self.attributes)
+        if trace.add_span(child):
+            self._span = child
+            self._token = _current_span.set(child)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._span is None:
+            return False
+        if exc_val is not None:
+            self._span.set_error(exc_val)
+        self._span.end()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in a different context than it was entered in
+            pass
+        return False
+
+
+def record_span(trace: Optional[Trace], parent_id: Optional[str], name: str, start_ns: int, end_ns: int,
+                kind: int = SPAN_KIND_CLIENT, error: Optional[str] = None, **attributes: Any):
+    """Add an already-finished span (e.g. from a driver callback that only knows the duration)"""
+    if trace is None:
+        return
+    recorded = Span(trace, name, parent_id or trace.root.span_id, kind, attributes, start_ns=start_ns)
+    recorded.end(end_ns)
+    if error:
+        recorded.status = STATUS_ERROR
+        recorded.status_message = error
+    trace.add_span(recorded)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for one trace"""
+    spans = []
+    for recorded in trace.spans:
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": recorded.span_id,
+            "name": recorded.name,
+            "kind": recorded.kind,
+            "startTimeUnixNano": str(recorded.start_ns),
+            "endTimeUnixNano": str(recorded.end_ns or recorded.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in recorded.attributes.items()],
+            "status": {"code": recorded.status}
+        }
+        if recorded.parent_id:
+            otlp_span["parentSpanId"] = recorded.parent_id
+        if recorded.status_message:
+            otlp_span["status"]["message"] = recorded.status_message
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "snipix.tracing"}, "spans": spans}]
+        }]
+    }
+
+
+class Tracer:
+    """Starts request traces and keeps the slow/failed ones in a fixed-size ring buffer"""
+
+    def __init__(self, slow_request_ms: float = 500.0, buffer_size: int = 100, export_path: Optional[str] = None):
+        self.slow_request_ms = slow_request_ms
+        self.export_path = export_path
+        self.traces: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._export_executor: Optional[ThreadPoolExecutor] = None
+        self.completed = 0
+        self.kept = 0
+
+    def start_trace(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                    **attributes: Any):
+        """Begin a trace in the current context; returns (trace, token) for finish_trace"""
+        trace = Trace(name, trace_id, parent_id, attributes)
+        return trace, (_current_trace.set(trace), _current_span.set(trace.root))
+
+    def finish_trace(self, trace: Trace, tokens, error: Optional[BaseException] = None):
+        """End the root span and keep the trace if it was slow or failed"""
+        if error is not None:
+            trace.root.set_error(error)
+        trace.root.end()
+        trace_token, span_token = tokens
+        try:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+        except ValueError:
+            pass
+
+        status_code = trace.root.attributes.get("http.status_code") or 0
+        keep = trace.root.duration_ms >= self.slow_request_ms or status_code >= 500 or error is not None
+        with self._lock:
+            self.completed += 1
+            if keep:
+                self.kept += 1
+                self.traces.append(trace)
+        if keep and self.export_path:
+            self._export(trace)
+
+    def _export(self, trace: Trace):
+        if self._export_executor is None:
+            self._export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        self._export_executor.submit(self._write_export, to_otlp(trace))
+
+    def _write_export(self, payload: Dict[str, Any]):
+        try:
+            directory = os.path.dirname(self.export_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.export_path, "a", encoding="utf-8") as export_file:
+                export_file.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        except Exception as e:
+            logger.warning(f"Failed to export trace: {e}")
+
+    def get_traces(self, limit: int = 50, min_duration_ms: float = 0.0) -> List[Dict[str, Any]]:
+        """Summaries of kept traces, slowest first"""
+        with self._lock:
+            traces = list(self.traces)
+        summaries = [trace.summary() for trace in traces if trace.root.duration_ms >= min_duration_ms]
+        summaries.sort(key=lambda summary: summary["duration_ms"], reverse=True)
+        return summaries[:limit]
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Full span list of a kept trace"""
+        with self._lock:
+            traces = list(self.traces)
+        for trace in traces:
+            if trace.trace_id == trace_id:
+                return trace.to_dict()
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "kept": self.kept,
+                "buffered": len(self.traces),
+                "buffer_size": self.traces.maxlen,
+                "slow_request_ms": self.slow_request_ms,
+                "export_path": self.export_path
+            }
+
+    def clear(self):
+        with self._lock:
+            self.traces.clear()
+
+
+# Global tracer instance
+tracer = Tracer(
+    slow_request_ms=settings.tracing_slow_request_ms,
+    buffer_size=settings.tracing_buffer_size,
+    export_path=settings.tracing_export_path
+)
@@ -0,0 +1,3 @@
+"""
+Standalone background workers (run from the backend directory with `python -m workers.<name>`)
+"""
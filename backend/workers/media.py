@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Media worker: claims jobs from the Mongo `jobs` collection and runs them with MediaService.
+
+    python -m workers.media --concurrency 4 --execution process
+
+Jobs are picked by priority class (preview > trim > transcription > proxy, each capped by CPU count)
+and by per-user fair share, not strictly oldest first. Run any number of these, on any host that mounts the same MEDIA_DIR and reaches the same MongoDB.
+Point the API at them with MEDIA_EXECUTION=queue. SIGTERM/SIGINT stop claiming new jobs and wait
+for running ones; a worker killed outright leaves its jobs to be re-claimed when their leases lapse
+(a job whose last allowed attempt dies with its worker is failed instead). A worker that loses a
+job's lease while running it (stalled heartbeats) kills it in process execution, since it is re-claimed.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config.settings import settings
+from services.database import init_db, close_db, is_db_available
+from services.job_queue import JobQueue, job_queue
+from services.media_pool import ALLOWED_OPERATIONS, MediaPool
+from services.media_scheduler import PRIORITY_CLASSES, create_scheduler
+
+logger = logging.getLogger("workers.media")
+
+
+class MediaWorker:
+    """One claim loop per pool slot; the pool's FairShareScheduler decides which queued job each takes.
+
+    A free slot looks at the oldest claimable job of every (class, user) pair, lets the scheduler
+    pick one (highest class under its cap, then deficit round-robin between users) and claims that
+    job by id. If another worker got it first the slot simply picks again.
+    """
+
+    def __init__(self, queue: JobQueue, pool: MediaPool, poll_interval: float = 1.0,
+                 heartbeat_interval: float = 15.0):
+        self.queue = queue
+        self.pool = pool
+        self.scheduler = pool.scheduler
+        self.concurrency = pool.max_workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping: Optional[asyncio.Event] = None
+        self._pick_lock: Optional[asyncio.Lock] = None
+        self.completed = 0
+        self.failed = 0
+
+    def request_stop(self):
+        if self._stopping is not None and not self._stopping.is_set():
+            logger.info("Stopping: finishing running jobs, not claiming new ones")
+            self._stopping.set()
+
+    async def run(self):
+        self._stopping = asyncio.Event()
+        self._pick_lock = asyncio.Lock()
+        self.pool.start()
+        logger.info(f"Media worker {self.worker_id} started ({self.concurrency} slots, {self.pool.mode} execution)")
+        try:
+            await asyncio.gather(*(self._slot(index) for index in range(self.concurrency)))
+        finally:
+            self.pool.shutdown()
+            logger.info(f"Media worker stopped ({self.completed} jobs completed, {self.failed} failed)")
+
+    async def _slot(self, index: int):
+        slot_id = f"{self.worker_id}:{index}"
+        while not self._stopping.is_set():
+            try:
+                claimed = await self._next_job(slot_id)
+            except Exception as e:
+                logger.error(f"Failed to claim a media job: {e}")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_class, job = claimed
+            try:
+                await self._execute(job)
+            finally:
+                self.scheduler.release(job_class)
+
+    async def _next_job(self, slot_id: str, attempts: int = 3) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Claim the job the scheduler picks; None when nothing is due or every class is at its cap"""
+        async with self._pick_lock:
+            await self.queue.reap_expired()
+            for _ in range(attempts):
+                if not self.scheduler.has_capacity():
+                    return None
+                heads: Dict[str, Dict[str, float]] = {}
+                job_ids = {}
+                for head in await self.queue.candidates():
+                    job_class = head["_id"].get("job_class")
+                    job_class = job_class if job_class in PRIORITY_CLASSES else "proxy"
+                    user_id = head["_id"].get("user_id") or ""
+                    heads.setdefault(job_class, {})[user_id] = head.get("cost") or 1.0
+                    job_ids[(job_class, user_id)] = head["job_id"]
+                choice = self.scheduler.pick(heads)
+                if choice is None:
+                    return None
+                job = await self.queue.claim(slot_id, job_id=job_ids[choice])
+                if job is not None:
+                    return choice[0], job
+                # Another worker claimed it between the read and the claim
+                self.scheduler.release(choice[0])
+        return None
+
+    async def _heartbeat(self, job: Dict[str, Any]):
+        """Keep the job's lease alive; returns only once the lease is lost"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await self.queue.heartbeat(job):
+                    return
+            except Exception as e:
+                # Keep trying; the lease only lapses after lease_seconds without a heartbeat
+                logger.warning(f"Heartbeat for media job {job['_id']} failed: {e}")
+
+    async def _execute(self, job: Dict[str, Any]):
+        operation = job["operation"]
+        logger.info(f"Running media job {job['_id']} ({operation}, attempt {job['attempts']})")
+        if operation not in ALLOWED_OPERATIONS:
+            await self.queue.fail(job, f"Unknown media operation {operation!r}", retry=False)
+            self.failed += 1
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        execution = asyncio.create_task(
+            self.pool.execute(operation, tuple(job.get("args", [])), job.get("kwargs", {}))
+        )
+        try:
+            await asyncio.wait({heartbeat, execution}, return_when=asyncio.FIRST_COMPLETED)
+            if not execution.done():
+                await self._abandon(job, execution)
+                return
+            result = execution.result()
+        except Exception as e:
+            await self.queue.fail(job, f"{type(e).__name__}: {e}")
+            self.failed += 1
+            return
+        finally:
+            heartbeat.cancel()
+            execution.cancel()
+        if await self.queue.complete(job, result):
+            self.completed += 1
+
+    async def _abandon(self, job: Dict[str, Any], execution: asyncio.Task):
+        """Stop a job whose lease was lost: it is re-claimed elsewhere, so it must not keep running here"""
+        if self.pool.mode == "process":
+            # Other jobs on the pool fail with it and are retried through the queue
+            logger.warning(f"Lost the lease on media job {job['_id']}; killing the media processes running it")
+            self.pool.kill_processes()
+        else:
+            logger.warning(f"Lost the lease on media job {job['_id']}; its thread cannot be interrupted, "
+                           f"so it runs to the end and its result is discarded")
+        execution.cancel()
+        await asyncio.wait({execution})
+        self.failed += 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=settings.media_workers or None,
+                        help="total jobs run at once (default: MEDIA_WORKERS, else the sum of the per-class caps)")
+    parser.add_argument("--execution", choices=("thread", "process"),
+                        default="process" if settings.media_execution == "process" else "thread",
+                        help="run jobs in threads, or in spawned processes that each load their own Whisper "
+                             "model (one per slot) and can be killed when a job's lease is lost")
+    parser.add_argument("--poll-interval", type=float, default=settings.media_job_poll_interval_seconds,
+                        help="seconds between claim attempts when the queue is empty")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
+    # In process mode this spawns the children and each loads its own Whisper model (one per slot,
+    # so size --concurrency to RAM); doing it first fails fast before connecting to Mongo
+    pool = MediaPool(mode=args.execution, scheduler=create_scheduler(args.concurrency))
+    pool.start()
+
+    await init_db()
+    if not is_db_available():
+        pool.shutdown()
+        raise SystemExit("❌ MongoDB is not reachable; the media worker needs the jobs collection")
+
+    worker = MediaWorker(
+        job_queue, pool, poll_interval=args.poll_interval,
+        heartbeat_interval=settings.media_job_heartbeat_seconds
+    )
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.request_stop)
+    try:
+        await worker.run()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())